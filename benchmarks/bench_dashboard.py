@@ -0,0 +1,223 @@
+"""
+SK data-layer and page-render benchmarks.
+
+    python benchmarks/bench_dashboard.py                         # 1k / 10k / 100k trades
+    python benchmarks/bench_dashboard.py --sizes 5000 --out bench_report.json
+
+Every size runs in its own subprocess against a scratch trades.db filled by a seeded
+generator (trades spread over several years and symbols, 1-8 entries each, ~2% soft-deleted),
+so the connection pool and journal caches start cold. Each timing is reported cold
+(caches cleared before every sample) and warm (cache hit), plus a full headless page run via
+Streamlit's AppTest. The JSON report is meant to be kept per version and diffed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "sk_dashboard.py")
+
+DEFAULT_SIZES = "1000,10000,100000"
+SYMBOLS = ["XAUUSD", "XAUUSD", "XAUUSD", "EURUSD", "GBPUSD", "USDJPY", "US30", "NAS100"]
+FIRST_DAY = date(2019, 1, 1)
+LAST_DAY = date(2026, 12, 31)
+
+
+# =========================
+# Synthetic journal
+# =========================
+def generate(db_path: str, trades: int, seed: int, max_entries: int = 8) -> int:
+    rng = random.Random(seed)
+    days = [
+        FIRST_DAY + timedelta(days=i)
+        for i in range((LAST_DAY - FIRST_DAY).days + 1)
+        if (FIRST_DAY + timedelta(days=i)).weekday() < 5
+    ]
+    created = datetime(2026, 1, 1).isoformat(timespec="seconds")
+
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    first_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0] + 1
+    trade_rows = []
+    entry_rows = []
+    for tid in range(first_id, first_id + trades):
+        deleted = created if rng.random() < 0.02 else None
+        trade_rows.append(
+            (tid, rng.choice(days).isoformat(), rng.choice(SYMBOLS), rng.choice(["Buy", "Sell"]), 0.01, created, None, deleted)
+        )
+        drift = rng.gauss(0.5, 6.0)
+        for n in range(1, rng.randint(1, max_entries) + 1):
+            entry_rows.append((tid, n, round((drift + rng.gauss(0, 8.0)) * 100)))
+
+    cur.executemany("INSERT INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?)", trade_rows)
+    cur.executemany("INSERT INTO trade_entries (trade_id, entry_no, pnl_cents) VALUES (?, ?, ?)", entry_rows)
+    conn.commit()
+    conn.close()
+    return len(entry_rows)
+
+
+# =========================
+# Timing
+# =========================
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"min_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3)}
+
+
+def cold_and_warm(fn: Callable[[], object], clear: Callable[[], object], repeat: int) -> Dict[str, Dict[str, float]]:
+    return {"cold": measure(fn, repeat, setup=clear), "warm": measure(fn, repeat)}
+
+
+def run_child(trades: int, seed: int, repeat: int) -> dict:
+    # cwd is a scratch dir and SK_DB_PATH points at it; the page run below shares this process's journal
+    sys.path.insert(0, REPO_ROOT)
+    import logging
+
+    logging.disable(logging.WARNING)  # bare-mode "missing ScriptRunContext" noise
+    from sk import open_journal
+    from sk.db import DEFAULT_DB_PATH
+    from streamlit.testing.v1 import AppTest
+
+    journal = open_journal(DEFAULT_DB_PATH)
+    started = time.perf_counter()
+    entries = generate(DEFAULT_DB_PATH, trades, seed)
+    journal.rebuild_rollups()
+    generate_s = time.perf_counter() - started
+
+    with journal.read() as conn:
+        month = conn.execute("SELECT month FROM monthly_pnl ORDER BY trades DESC, month LIMIT 1").fetchone()[0]
+        day = conn.execute("SELECT trade_date FROM daily_pnl ORDER BY trades DESC, trade_date LIMIT 1").fetchone()[0]
+        sample_ids = [r[0] for r in conn.execute("SELECT id FROM trades ORDER BY RANDOM() LIMIT 100")]
+    month_start = date(int(month[:4]), int(month[5:7]), 1)
+    clear = journal.clear_cache
+
+    timings = {
+        "fetch_trades": cold_and_warm(journal.fetch_trades, clear, repeat),
+        "fetch_entries_x100": cold_and_warm(lambda: [journal.fetch_entries(t) for t in sample_ids], clear, repeat),
+        "entries_for_100": cold_and_warm(lambda: journal.entries_for(sample_ids), clear, repeat),
+        "build_daily_map": cold_and_warm(lambda: journal.build_daily_map(month), clear, repeat),
+        "month_stats": cold_and_warm(lambda: journal.month_stats(month), clear, repeat),
+        "day_details": cold_and_warm(lambda: journal.day_details(day), clear, repeat),
+    }
+
+    def page_run() -> None:
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+        at.session_state["cal_month"] = month_start
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    timings["page_run"] = cold_and_warm(page_run, clear, max(1, repeat // 2))
+
+    return {
+        "trades": trades,
+        "entries": entries,
+        "db_bytes": os.path.getsize(DEFAULT_DB_PATH),
+        "busiest_month": month,
+        "busiest_day": day,
+        "generate_s": round(generate_s, 3),
+        "timings": timings,
+    }
+
+
+# =========================
+# Driver
+# =========================
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_size(trades: int, seed: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="sk_bench_") as scratch:
+        env = dict(os.environ, SK_DB_PATH=os.path.join(scratch, "trades.db"))
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--trades", str(trades), "--seed", str(seed), "--repeat", str(repeat)],
+            cwd=scratch,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        raise SystemExit(f"benchmark for {trades} trades failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_summary(results: List[dict]) -> None:
+    names = list(results[0]["timings"]) if results else []
+    print(f"{'benchmark':<20}" + "".join(f"{r['trades']:>12,} cold/warm ms".rjust(30) for r in results))
+    for name in names:
+        cells = []
+        for r in results:
+            t = r["timings"][name]
+            cells.append(f"{t['cold']['median_ms']:>12.2f} / {t['warm']['median_ms']:<10.2f}".rjust(30))
+        print(f"{name:<20}" + "".join(cells))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated trade counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="samples per timing (median reported)")
+    parser.add_argument("--out", default="bench_report.json", help="JSON report path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--trades", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.trades, args.seed, args.repeat)))
+        return
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"benchmarking {size:,} trades ...", file=sys.stderr)
+        results.append(run_size(size, args.seed, args.repeat))
+
+    try:
+        import streamlit
+
+        streamlit_version = streamlit.__version__
+    except ImportError:
+        streamlit_version = None
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "streamlit": streamlit_version,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_summary(results)
+    print(f"report written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
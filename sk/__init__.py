@@ -0,0 +1,36 @@
+"""
+SK core: storage, aggregation and formatting for the SK trading journal, importable without
+Streamlit (pandas is only loaded by the analytics views).
+
+    from sk import open_journal
+    journal = open_journal("trades.db")
+    journal.month_stats("2026-10")    # (trades, profit, loss, net), money in integer cents
+"""
+
+from sk.accounts import DEFAULT_ACCOUNT, create_account, list_accounts, open_account
+from sk.db import DEFAULT_DB_PATH, DatabaseBusy, SchemaUpgradeError
+from sk.fmt import MONEY_SCALE, format_cents, format_money, from_cents, pnl_class, ratio_text, safe_float, to_cents
+from sk.journal import Journal, open_journal
+from sk.rollups import month_bounds, month_key
+
+__all__ = [
+    "DEFAULT_ACCOUNT",
+    "DEFAULT_DB_PATH",
+    "DatabaseBusy",
+    "Journal",
+    "MONEY_SCALE",
+    "SchemaUpgradeError",
+    "create_account",
+    "format_cents",
+    "format_money",
+    "from_cents",
+    "list_accounts",
+    "month_bounds",
+    "month_key",
+    "open_account",
+    "open_journal",
+    "pnl_class",
+    "ratio_text",
+    "safe_float",
+    "to_cents",
+]
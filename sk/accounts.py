@@ -0,0 +1,60 @@
+"""
+SK accounts: one trades database per funded account.
+
+The default account is the original database ($SK_DB_PATH, else ./trades.db); every other
+account is <name>.db in $SK_ACCOUNTS_DIR (default: an accounts/ folder next to it). Each file
+gets its own Journal, so the pool, data versions and read cache of one account never see
+another account's trades or writes.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import List
+
+from sk.db import DEFAULT_DB_PATH
+from sk.journal import Journal, open_journal
+
+DEFAULT_ACCOUNT = "main"
+ACCOUNTS_DIR = os.environ.get("SK_ACCOUNTS_DIR", os.path.join(os.path.dirname(DEFAULT_DB_PATH), "accounts"))
+
+# also the file name, so kept to characters that are safe on every filesystem
+_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]{0,39}")
+
+
+def account_path(name: str) -> str:
+    if name == DEFAULT_ACCOUNT:
+        return DEFAULT_DB_PATH
+    if not _NAME_RE.fullmatch(name):
+        raise ValueError(f"invalid account name {name!r}: use up to 40 letters, digits, '-' or '_'")
+    return os.path.join(ACCOUNTS_DIR, f"{name}.db")
+
+
+def list_accounts() -> List[str]:
+    names = []
+    if os.path.isdir(ACCOUNTS_DIR):
+        names = sorted(
+            f[:-3] for f in os.listdir(ACCOUNTS_DIR) if f.endswith(".db") and _NAME_RE.fullmatch(f[:-3]) and f[:-3] != DEFAULT_ACCOUNT
+        )
+    return [DEFAULT_ACCOUNT] + names
+
+
+def existing_account_path(name: str) -> str:
+    # unknown names fail instead of silently creating an empty database
+    path = account_path(name)
+    if name != DEFAULT_ACCOUNT and not os.path.exists(path):
+        raise ValueError(f"unknown account {name!r} (accounts: {', '.join(list_accounts())})")
+    return path
+
+
+def open_account(name: str) -> Journal:
+    return open_journal(existing_account_path(name))
+
+
+def create_account(name: str) -> Journal:
+    path = account_path(name)
+    if name == DEFAULT_ACCOUNT or os.path.exists(path):
+        raise ValueError(f"account {name!r} already exists")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return open_journal(path)
@@ -0,0 +1,78 @@
+"""
+SK analytics: vectorized performance metrics over a trades DataFrame.
+
+Input frame: one row per trade with at least `trade_date` (YYYY-MM-DD) and `total`
+(the sum of the trade's entry P/L), ordered by trade_date, id -- the shape
+Journal.analytics_report() loads. Money is in integer cents, both in the input totals
+and in every money metric returned. Nothing here touches SQLite or Streamlit; this is
+the only core module that imports pandas, and it is imported on first use.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def equity_curve(trades: pd.DataFrame) -> pd.DataFrame:
+    # Daily net P/L, cumulative equity and drawdown from the running peak (equity starts at 0).
+    if trades.empty:
+        return pd.DataFrame(columns=["net", "equity", "peak", "drawdown"], index=pd.DatetimeIndex([], name="date"))
+    daily = trades.groupby("trade_date", sort=True)["total"].sum()
+    daily.index = pd.to_datetime(daily.index)
+    daily.index.name = "date"
+    equity = daily.cumsum()
+    peak = equity.cummax().clip(lower=0.0)
+    return pd.DataFrame({"net": daily, "equity": equity, "peak": peak, "drawdown": equity - peak})
+
+
+def max_drawdown(totals: pd.Series) -> float:
+    # Trade-by-trade, so an intraday give-back between trades on one day still counts.
+    if totals.empty:
+        return 0.0
+    equity = totals.cumsum()
+    return float((equity - equity.cummax().clip(lower=0.0)).min())
+
+
+def longest_streaks(totals: pd.Series) -> Dict[str, int]:
+    # Runs of consecutive winning / losing trades; a flat trade ends both.
+    if totals.empty:
+        return {"win": 0, "loss": 0}
+    sign = np.sign(totals.to_numpy())
+    run_id = np.concatenate(([0], np.cumsum(sign[1:] != sign[:-1])))
+    runs = pd.DataFrame({"sign": sign, "run": run_id}).groupby("run")["sign"].agg(["first", "size"])
+    win = runs.loc[runs["first"] > 0, "size"]
+    loss = runs.loc[runs["first"] < 0, "size"]
+    return {"win": int(win.max()) if not win.empty else 0, "loss": int(loss.max()) if not loss.empty else 0}
+
+
+def performance_metrics(trades: pd.DataFrame) -> Dict[str, Optional[float]]:
+    totals = trades["total"].astype(float) if not trades.empty else pd.Series(dtype=float)
+    wins = totals[totals > 0]
+    losses = totals[totals < 0]
+    count = int(totals.size)
+    gross_profit = float(wins.sum())
+    gross_loss = float(losses.sum())
+
+    if gross_loss < 0:
+        profit_factor: Optional[float] = gross_profit / -gross_loss
+    else:
+        profit_factor = float("inf") if gross_profit > 0 else None
+
+    streaks = longest_streaks(totals)
+    return {
+        "trades": count,
+        "net": float(totals.sum()),
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "win_rate": (wins.size / count) if count else None,
+        "profit_factor": profit_factor,
+        "avg_win": float(wins.mean()) if not wins.empty else None,
+        "avg_loss": float(losses.mean()) if not losses.empty else None,
+        "expectancy": float(totals.mean()) if count else None,
+        "max_drawdown": max_drawdown(totals),
+        "longest_win_streak": streaks["win"],
+        "longest_loss_streak": streaks["loss"],
+    }
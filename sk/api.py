@@ -0,0 +1,249 @@
+"""
+SK API: a local, read-only JSON view of the journal over HTTP (standard library only).
+
+    GET /api/accounts
+    GET /api/months/2026-10              month KPIs, as Journal.month_stats()
+    GET /api/months/2026-10/days         the daily map, as Journal.build_daily_map()
+    GET /api/days/2026-10-07             that day's trades with their entries
+    GET /api/trades?from=&to=&symbol=&direction=&limit=&after=DATE,ID   newest first, keyset-paged
+
+Every endpoint takes ?account=NAME (default: the main database). Money is integer cents.
+Responses carry an ETag derived from the journal's data versions for what the endpoint
+reads; a poll with a matching If-None-Match gets 304 before any query runs.
+
+Started inside the dashboard process ($SK_API_PORT) the API shares its Journals, so its caches
+and versions too. Every request first runs Journal.sync(), so writes made by another process
+(a second dashboard, an import) change the ETags as well.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import secrets
+import threading
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from sk.accounts import DEFAULT_ACCOUNT, existing_account_path, list_accounts
+from sk.db import DEFAULT_DB_PATH
+from sk.journal import PAGE_SIZE, Journal, open_journal
+
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_MAX_PAGE = 500
+
+Query = Dict[str, List[str]]
+# a route returns the data version of what it reads and a loader for the payload
+Route = Callable[[Journal, "re.Match[str]", Query], Tuple[tuple, Callable[[], object]]]
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _one(query: Query, name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _date(text: Optional[str], fmt: str = "%Y-%m-%d") -> Optional[str]:
+    if text is None:
+        return None
+    try:
+        return datetime.strptime(text, fmt).strftime(fmt)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"bad date {text!r}") from None
+
+
+def _bucket(b: Dict[str, int]) -> dict:
+    return {"trades": b["trades"], "profit_cents": b["profit"], "loss_cents": b["loss"], "net_cents": b["net"]}
+
+
+def _trade(t: dict, total: int) -> dict:
+    out = {k: v for k, v in t.items() if k != "total"}
+    out["total_cents"] = total
+    return out
+
+
+# =========================
+# Routes
+# =========================
+def _accounts(journal: Journal, m: "re.Match[str]", q: Query) -> Tuple[tuple, Callable[[], object]]:
+    names = list_accounts()
+    return tuple(names), lambda: {"accounts": names}
+
+
+def _month(journal: Journal, m: "re.Match[str]", q: Query) -> Tuple[tuple, Callable[[], object]]:
+    month = _date(m.group(1), "%Y-%m")
+
+    def load() -> dict:
+        trades, profit, loss, net = journal.month_stats(month)
+        return {"month": month, "trades": trades, "profit_cents": profit, "loss_cents": loss, "net_cents": net}
+
+    return journal.versions.month(month), load
+
+
+def _month_days(journal: Journal, m: "re.Match[str]", q: Query) -> Tuple[tuple, Callable[[], object]]:
+    month = _date(m.group(1), "%Y-%m")
+
+    def load() -> dict:
+        daily = journal.build_daily_map(month)
+        return {"month": month, "days": {d: {"trades": v["trades"], "pnl_cents": v["pnl"]} for d, v in sorted(daily.items())}}
+
+    return journal.versions.month(month), load
+
+
+def _day(journal: Journal, m: "re.Match[str]", q: Query) -> Tuple[tuple, Callable[[], object]]:
+    day = _date(m.group(1))
+
+    def load() -> dict:
+        details = journal.day_details(day)
+        trades = []
+        for t in details["trades"]:
+            trade = _trade(t, details["totals"].get(t["id"], 0))
+            trade["entries"] = details["entries"][t["id"]]
+            trades.append(trade)
+        return {"day": day, **_bucket(details["day"]), "items": trades}
+
+    # every read behind day_details is versioned by the day's month
+    return journal.versions.month(day[:7]), load
+
+
+def _trades(journal: Journal, m: "re.Match[str]", q: Query) -> Tuple[tuple, Callable[[], object]]:
+    start, end = _date(_one(q, "from")), _date(_one(q, "to"))
+    try:
+        limit = int(_one(q, "limit") or PAGE_SIZE)
+        after_text = _one(q, "after")
+        after = None
+        if after_text:
+            after_date, after_id = after_text.split(",")
+            after = (_date(after_date), int(after_id))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "limit must be a number and after DATE,ID") from None
+    if not 1 <= limit <= API_MAX_PAGE:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"limit must be 1..{API_MAX_PAGE}")
+    symbols = [s.strip().upper() for s in q.get("symbol", []) if s.strip()]
+    direction = _one(q, "direction")
+
+    def load() -> dict:
+        page = journal.trade_page(start=start, end=end, symbols=symbols, direction=direction, after=after, limit=limit)
+        nxt = page["next"]
+        return {"trades": [_trade(t, t["total"]) for t in page["rows"]], "next": f"{nxt[0]},{nxt[1]}" if nxt else None}
+
+    # the same version trade_page caches under
+    version = journal.versions.between(start, end) if start and end else journal.versions.everything()
+    return version, load
+
+
+ROUTES: List[Tuple["re.Pattern[str]", Route]] = [
+    (re.compile(r"/api/accounts"), _accounts),
+    (re.compile(r"/api/months/(\d{4}-\d{2})"), _month),
+    (re.compile(r"/api/months/(\d{4}-\d{2})/days"), _month_days),
+    (re.compile(r"/api/days/(\d{4}-\d{2}-\d{2})"), _day),
+    (re.compile(r"/api/trades"), _trades),
+]
+
+
+# =========================
+# Server
+# =========================
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, default_db: Optional[str] = None, quiet: bool = False) -> None:
+        super().__init__((host, port), ApiHandler)
+        self.default_db = default_db or DEFAULT_DB_PATH
+        self.quiet = quiet
+        # data versions start over in every process: a restarted server must not match old ETags
+        self.instance = secrets.token_hex(8)
+
+    def journal_for(self, account: Optional[str]) -> Journal:
+        try:
+            path = existing_account_path(account) if account and account != DEFAULT_ACCOUNT else self.default_db
+        except ValueError as e:
+            raise ApiError(HTTPStatus.NOT_FOUND, str(e)) from None
+        journal = open_journal(path)
+        journal.sync()
+        return journal
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server: ApiServer
+    server_version = "sk-api/1"
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def _method_not_allowed(self) -> None:
+        self._send(HTTPStatus.METHOD_NOT_ALLOWED, {"error": "read-only API: GET or HEAD only"}, extra={"Allow": "GET, HEAD"})
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _method_not_allowed
+
+    def _handle(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        try:
+            for pattern, route in ROUTES:
+                m = pattern.fullmatch(url.path.rstrip("/"))
+                if m:
+                    break
+            else:
+                raise ApiError(HTTPStatus.NOT_FOUND, f"no endpoint {url.path}")
+            journal = self.server.journal_for(_one(query, "account"))
+            version, load = route(journal, m, query)
+            key = json.dumps([self.server.instance, journal.path, url.path, sorted(query.items()), version], default=str)
+            etag = f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+            if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                self._send(HTTPStatus.NOT_MODIFIED, None, etag=etag, send_body=False)
+                return
+            self._send(HTTPStatus.OK, load(), etag=etag, send_body=send_body)
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)}, send_body=send_body)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        payload: object,
+        etag: Optional[str] = None,
+        send_body: bool = True,
+        extra: Optional[Dict[str, str]] = None,
+    ) -> None:
+        body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        # no-cache: clients may keep the body but must revalidate, which is what makes 304s work
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = API_HOST, port: int = API_PORT, default_db: Optional[str] = None, quiet: bool = False) -> ApiServer:
+    # port 0 picks a free port (server.server_address[1]); serve_forever() or start_in_thread() runs it
+    return ApiServer(host, port, default_db=default_db, quiet=quiet)
+
+
+def start_in_thread(server: ApiServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, name="sk-api", daemon=True)
+    thread.start()
+    return thread
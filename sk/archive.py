@@ -0,0 +1,224 @@
+"""
+SK archive: compaction of soft-deleted trades into a per-database archive file, and restore.
+
+Trades deleted longer ago than the retention move (with their entries, ids unchanged) to
+<db>.archive.db next to the database, e.g. trades.db -> trades.archive.db. Ids come from
+AUTOINCREMENT and are never reused, so a restored trade always gets its own id back.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Iterable, List, Set
+
+from sk import instrument
+from sk.db import BUSY_TIMEOUT_MS, now_iso, with_retry
+from sk.fmt import MONEY_SCALE
+from sk.journal import Journal
+from sk.rollups import refresh_rollups
+
+ARCHIVE_RETENTION_DAYS = 30
+
+TRADE_COLUMNS = "id, trade_date, symbol, direction, base_lot, created_at, locked_at, deleted_at"
+ENTRY_COLUMNS = "id, trade_id, entry_no, pnl_cents, source_ref"
+IN_IDS = "IN (SELECT value FROM json_each(?))"
+
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY,
+        trade_date TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        base_lot REAL,
+        created_at TEXT NOT NULL,
+        locked_at TEXT,
+        deleted_at TEXT,
+        archived_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trade_entries (
+        id INTEGER PRIMARY KEY,
+        trade_id INTEGER NOT NULL,
+        entry_no INTEGER NOT NULL,
+        pnl_cents INTEGER NOT NULL,
+        source_ref TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entries_trade ON trade_entries (trade_id, entry_no)",
+]
+
+
+def archive_path(db_path: str) -> str:
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.archive{ext or '.db'}"
+
+
+def _connect_archive(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(archive_path(db_path), timeout=BUSY_TIMEOUT_MS / 1000)
+    for sql in ARCHIVE_SCHEMA:
+        conn.execute(sql)
+    if "entry_pnl" in [r[1] for r in conn.execute("PRAGMA table_info(trade_entries)")]:
+        # archived before P/L moved to integer cents (sk.db._m005): convert the same way
+        conn.execute("ALTER TABLE trade_entries ADD COLUMN pnl_cents INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"UPDATE trade_entries SET pnl_cents = CAST(ROUND(entry_pnl * {MONEY_SCALE}) AS INTEGER)")
+        conn.execute("ALTER TABLE trade_entries DROP COLUMN entry_pnl")
+    conn.commit()
+    return conn
+
+
+def _file_bytes(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+
+# =========================
+# Compaction
+# =========================
+@instrument.timed
+def compact(journal: Journal, retention_days: int = ARCHIVE_RETENTION_DAYS, dry_run: bool = False) -> dict:
+    # -> counts, the vacuum step taken and the file size before/after (main file + WAL)
+    started = time.perf_counter()
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat(timespec="seconds")
+    bytes_before = _file_bytes(journal.path)
+
+    with journal.write() as conn:
+        cur = conn.cursor()
+        trades = cur.execute(
+            f"SELECT {TRADE_COLUMNS} FROM trades WHERE deleted_at IS NOT NULL AND deleted_at < ? ORDER BY id", (cutoff,)
+        ).fetchall()
+        ids = json.dumps([t[0] for t in trades])
+        entries = cur.execute(f"SELECT {ENTRY_COLUMNS} FROM trade_entries WHERE trade_id {IN_IDS}", (ids,)).fetchall()
+        orphans = cur.execute("SELECT COUNT(*) FROM trade_entries WHERE trade_id NOT IN (SELECT id FROM trades)").fetchone()[0]
+        instrument.add_rows(len(trades) + len(entries))
+
+        if not dry_run:
+            if trades:
+                # the archive commits first: a failure below leaves a copy in both files, never in neither
+                archived_at = now_iso()
+                with closing(_connect_archive(journal.path)) as arc:
+                    with arc:
+                        arc.executemany(
+                            f"INSERT OR REPLACE INTO trades ({TRADE_COLUMNS}, archived_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [t + (archived_at,) for t in trades],
+                        )
+                        arc.executemany(f"INSERT OR REPLACE INTO trade_entries ({ENTRY_COLUMNS}) VALUES (?, ?, ?, ?, ?)", entries)
+                cur.execute(f"DELETE FROM trade_entries WHERE trade_id {IN_IDS}", (ids,))
+                cur.execute(f"DELETE FROM trades WHERE id {IN_IDS}", (ids,))
+            cur.execute("DELETE FROM trade_entries WHERE trade_id NOT IN (SELECT id FROM trades)")
+
+    vacuum = None
+    if not dry_run:
+        # deleted trades are not in the rollups, so only the per-trade cache entries change
+        journal.invalidate(trade_ids=[t[0] for t in trades])
+        vacuum = _vacuum(journal)
+
+    bytes_after = _file_bytes(journal.path)
+    return {
+        "dry_run": dry_run,
+        "cutoff": cutoff,
+        "archived_trades": len(trades),
+        "archived_entries": len(entries),
+        "orphan_entries": orphans,
+        "vacuum": vacuum,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "reclaimed_bytes": bytes_before - bytes_after,
+        "archive": archive_path(journal.path),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _vacuum(journal: Journal) -> str:
+    with journal.pool.maintenance() as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # incremental auto_vacuum only takes effect after one full VACUUM; every later run is incremental
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            with_retry(lambda: conn.execute("VACUUM"), "vacuum")
+            step = "full VACUUM (switched to incremental auto_vacuum)"
+        else:
+            with_retry(lambda: conn.execute("PRAGMA incremental_vacuum").fetchall(), "incremental vacuum")
+            step = "incremental VACUUM"
+        with_retry(lambda: conn.execute("ANALYZE"), "analyze")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return step
+
+
+# =========================
+# Deleted trades + restore
+# =========================
+DELETED_SQL = """
+    SELECT t.id, t.trade_date, t.symbol, t.direction, t.deleted_at, COALESCE(SUM(e.pnl_cents), 0)
+    FROM trades t
+    LEFT JOIN trade_entries e ON e.trade_id = t.id
+    {where}
+    GROUP BY t.id
+    ORDER BY t.deleted_at DESC, t.id DESC
+    LIMIT ?
+"""
+
+
+def _deleted_row(r: tuple, where: str) -> dict:
+    return {"id": r[0], "trade_date": r[1], "symbol": r[2], "direction": r[3], "deleted_at": r[4], "total": r[5], "where": where}
+
+
+def deleted_trades(journal: Journal, limit: int = 200) -> List[dict]:
+    # soft-deleted trades still in the database, then archived ones; newest deletion first
+    with journal.read() as conn:
+        rows = conn.execute(DELETED_SQL.format(where="WHERE t.deleted_at IS NOT NULL"), (limit,)).fetchall()
+    out = [_deleted_row(r, "deleted") for r in rows]
+
+    if os.path.exists(archive_path(journal.path)) and len(out) < limit:
+        with closing(_connect_archive(journal.path)) as arc:
+            rows = arc.execute(DELETED_SQL.format(where=""), (limit - len(out),)).fetchall()
+        out += [_deleted_row(r, "archive") for r in rows]
+    instrument.add_rows(len(out))
+    return out
+
+
+@instrument.timed
+def restore_trades(journal: Journal, trade_ids: Iterable[int]) -> dict:
+    # undeletes trades still in the database and moves archived ones back, as live trades
+    ids = json.dumps(sorted({int(t) for t in trade_ids}))
+    archived: List[tuple] = []
+    entries: List[tuple] = []
+    if os.path.exists(archive_path(journal.path)):
+        with closing(_connect_archive(journal.path)) as arc:
+            archived = arc.execute(f"SELECT {TRADE_COLUMNS} FROM trades WHERE id {IN_IDS}", (ids,)).fetchall()
+            entries = arc.execute(f"SELECT {ENTRY_COLUMNS} FROM trade_entries WHERE trade_id {IN_IDS}", (ids,)).fetchall()
+
+    with journal.write() as conn:
+        cur = conn.cursor()
+        rows = cur.execute(
+            f"UPDATE trades SET deleted_at = NULL WHERE id {IN_IDS} AND deleted_at IS NOT NULL RETURNING id, trade_date", (ids,)
+        ).fetchall()
+        moved: Set[int] = set()
+        for t in archived:
+            cur.execute(f"INSERT OR IGNORE INTO trades ({TRADE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, NULL)", t[:7])
+            if cur.rowcount:
+                moved.add(t[0])
+                rows.append((t[0], t[1]))
+        # a ticket re-imported since the delete keeps its source_ref; the restored copy gives it up
+        cur.executemany(
+            f"""
+            INSERT INTO trade_entries ({ENTRY_COLUMNS})
+            VALUES (?, ?, ?, ?, CASE WHEN EXISTS (SELECT 1 FROM trade_entries WHERE source_ref = ?) THEN NULL ELSE ? END)
+            """,
+            [e[:4] + (e[4], e[4]) for e in entries if e[1] in moved],
+        )
+        days = sorted({r[1] for r in rows})
+        if days:
+            refresh_rollups(cur, days)
+
+    if moved:
+        with closing(_connect_archive(journal.path)) as arc:
+            with arc:
+                arc.execute(f"DELETE FROM trade_entries WHERE trade_id {IN_IDS}", (json.dumps(sorted(moved)),))
+                arc.execute(f"DELETE FROM trades WHERE id {IN_IDS}", (json.dumps(sorted(moved)),))
+    journal.invalidate(days, [r[0] for r in rows])
+    return {"trades": len(rows), "from_archive": len(moved), "days": days}
@@ -0,0 +1,234 @@
+"""
+SK backup: online snapshots of a trades database, rotation, verification and restore.
+
+Snapshots are made with SQLite's backup API, BACKUP_PAGES_PER_STEP pages at a time, from a
+dedicated connection that holds one read transaction for the whole copy. In WAL mode the
+dashboard keeps reading and writing meanwhile, and the snapshot is the database exactly as of
+the moment the copy started: never torn, and never restarted by a concurrent write.
+
+A snapshot of trades.db is backups/trades-YYYYmmdd-HHMMSS-mmm.db next to it (accounts/ftmo.db
+-> accounts/backups/ftmo-...db). Only the BACKUP_KEEP newest are kept. The archive file
+(sk.archive) is not part of a snapshot.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sk import instrument
+from sk.db import BUSY_TIMEOUT_MS, schema_version
+from sk.journal import Journal
+
+BACKUP_KEEP = 10
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_RETRY_S = 300  # a scheduled backup that failed is retried after this long
+
+
+def backup_dir(db_path: str) -> str:
+    return os.path.join(os.path.dirname(db_path) or ".", "backups")
+
+
+def _stem(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+
+def _snapshot_re(db_path: str) -> "re.Pattern[str]":
+    return re.compile(re.escape(_stem(db_path)) + r"-\d{8}-\d{6}-\d{3}\.db")
+
+
+def list_snapshots(db_path: str) -> List[dict]:
+    # newest first
+    folder = backup_dir(db_path)
+    if not os.path.isdir(folder):
+        return []
+    pattern = _snapshot_re(db_path)
+    out = []
+    for name in sorted((f for f in os.listdir(folder) if pattern.fullmatch(f)), reverse=True):
+        path = os.path.join(folder, name)
+        out.append(
+            {
+                "name": name,
+                "path": path,
+                "bytes": os.path.getsize(path),
+                "created": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds"),
+            }
+        )
+    return out
+
+
+def _open_read_only(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _copy(src: sqlite3.Connection, dest_path: str) -> Dict[str, float]:
+    # pages into <dest>.part, renamed into place only once complete and checked; times both parts
+    part = f"{dest_path}.part"
+    if os.path.exists(part):
+        os.remove(part)
+    steps = 0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal steps
+        steps += 1
+
+    try:
+        with closing(sqlite3.connect(part)) as dst:
+            started = time.perf_counter()
+            src.backup(dst, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+            # a standalone file: no -wal / -shm next to the snapshot
+            dst.execute("PRAGMA journal_mode = DELETE")
+            copied = time.perf_counter()
+            pages = dst.execute("PRAGMA page_count").fetchone()[0]
+            integrity = dst.execute("PRAGMA integrity_check").fetchone()[0]
+            verified = time.perf_counter()
+        if integrity != "ok":
+            raise sqlite3.DatabaseError(f"the copy failed its integrity check: {integrity}")
+    except BaseException:
+        os.remove(part)
+        raise
+    os.replace(part, dest_path)
+    return {"pages": pages, "steps": steps, "copy_s": copied - started, "verify_s": verified - copied}
+
+
+def _timings(nbytes: int, copied: Dict[str, float], started: float) -> Dict[str, float]:
+    # throughput is of the copy alone; the integrity check is timed separately
+    copy_s = copied["copy_s"]
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "copy_seconds": round(copy_s, 3),
+        "verify_seconds": round(copied["verify_s"], 3),
+        "mb_per_s": round(nbytes / 1048576 / copy_s, 2) if copy_s > 0 else 0.0,
+    }
+
+
+# =========================
+# Snapshots
+# =========================
+@instrument.timed
+def backup(journal: Journal, keep: int = BACKUP_KEEP) -> dict:
+    # -> where it went, size, pages, duration and throughput, and the old snapshots rotated out
+    started = time.perf_counter()
+    folder = backup_dir(journal.path)
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+    path = os.path.join(folder, f"{_stem(journal.path)}-{stamp}.db")
+
+    with closing(sqlite3.connect(journal.path, timeout=BUSY_TIMEOUT_MS / 1000)) as src:
+        # one read transaction for every step: the copy sees one fixed version of the database
+        src.execute("BEGIN")
+        version = schema_version(src)
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        copied = _copy(src, path)
+        src.rollback()
+
+    removed = [s["path"] for s in list_snapshots(journal.path)[max(keep, 1) :]]
+    for old in removed:
+        os.remove(old)
+
+    nbytes = os.path.getsize(path)
+    return {
+        "path": path,
+        "bytes": nbytes,
+        "pages": int(copied["pages"]),
+        "steps": int(copied["steps"]),
+        "schema_version": version,
+        "integrity": "ok",
+        **_timings(nbytes, copied, started),
+        "removed": removed,
+    }
+
+
+def verify_snapshot(snapshot_path: str) -> str:
+    # "ok", or SQLite's first integrity_check complaint
+    try:
+        with closing(_open_read_only(snapshot_path)) as conn:
+            return conn.execute("PRAGMA integrity_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        return str(e)
+
+
+@instrument.timed
+def restore_snapshot(snapshot_path: str, dest_path: str) -> dict:
+    # into a fresh database file only: an existing one is never overwritten
+    if not os.path.exists(snapshot_path):
+        raise ValueError(f"no snapshot at {snapshot_path}")
+    if os.path.exists(dest_path):
+        raise ValueError(f"{dest_path} already exists; restore into a new file")
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    # the copy is integrity-checked before it gets its name, so a damaged snapshot restores nothing
+    with closing(_open_read_only(snapshot_path)) as src:
+        version = schema_version(src)
+        copied = _copy(src, dest_path)
+
+    nbytes = os.path.getsize(dest_path)
+    return {
+        "path": dest_path,
+        "snapshot": snapshot_path,
+        "bytes": nbytes,
+        "pages": int(copied["pages"]),
+        "schema_version": version,
+        "integrity": "ok",
+        **_timings(nbytes, copied, started),
+    }
+
+
+# =========================
+# Schedule
+# =========================
+# A daemon thread per database taking a snapshot every interval, counted from the newest
+# snapshot on disk (so restarting the app does not reset the clock).
+class BackupSchedule:
+    def __init__(self, journal: Journal, interval_s: float, keep: int = BACKUP_KEEP) -> None:
+        self.journal = journal
+        self.interval_s = interval_s
+        self.keep = keep
+        self.last: Optional[dict] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sk-backup", daemon=True)
+        self._thread.start()
+
+    def _due_in(self) -> float:
+        newest = list_snapshots(self.journal.path)[:1]
+        if not newest:
+            return 0.0
+        age = time.time() - os.path.getmtime(newest[0]["path"])
+        return max(0.0, self.interval_s - age)
+
+    def _run(self) -> None:
+        wait = self._due_in()
+        while not self._stop.wait(wait):
+            try:
+                self.last = backup(self.journal, self.keep)
+                self.last_error = None
+                wait = self.interval_s
+            except Exception as e:
+                self.last_error = str(e)
+                wait = min(BACKUP_RETRY_S, self.interval_s)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+_schedules: Dict[str, BackupSchedule] = {}
+_schedules_lock = threading.Lock()
+
+
+def schedule_backups(journal: Journal, interval_s: float, keep: int = BACKUP_KEEP) -> BackupSchedule:
+    # one schedule per database file per process
+    key = os.path.abspath(journal.path)
+    with _schedules_lock:
+        schedule = _schedules.get(key)
+        if schedule is None:
+            schedule = _schedules[key] = BackupSchedule(journal, interval_s, keep)
+        return schedule
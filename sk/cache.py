@@ -0,0 +1,133 @@
+"""
+SK read cache: per-month / per-trade data versions and a small versioned LRU memo.
+
+Cached readers look their result up under the version of the data they read instead of
+being cleared: a write bumps only the counters of the trades and months it touched, so
+every other cached entry stays warm. Cached values are shared between callers -- treat
+them as read-only.
+
+The counters only see writes made through this process's Journal. Writes by another process
+(the CLI, a second dashboard) are caught by ChangeWatch, which drops the whole cache.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from sk import instrument
+from sk.rollups import months_between
+
+# Months kept per windowed cache; revisiting a recent month is a cache hit.
+MONTH_CACHE_ENTRIES = 48
+TRADE_CACHE_ENTRIES = 2048
+
+T = TypeVar("T")
+
+
+class DataVersions:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.epoch = 0  # bumped by full invalidations (rollup rebuilds)
+        self.data = 0  # bumped by every write
+        self.months: Dict[str, int] = {}
+        self.trades: Dict[int, int] = {}
+
+    def month(self, month: str) -> Tuple[int, int]:
+        return self.epoch, self.months.get(month, 0)
+
+    def between(self, start: str, end: str) -> Tuple[int, ...]:
+        months = months_between(start, end)
+        if months is None:
+            return self.epoch, -1, self.data
+        return (self.epoch,) + tuple(self.months.get(m, 0) for m in months)
+
+    def trade(self, trade_id: int) -> Tuple[int, int]:
+        return self.epoch, self.trades.get(trade_id, 0)
+
+    def trade_set(self, trade_ids: Iterable[int]) -> Tuple[int, ...]:
+        return (self.epoch,) + tuple(self.trades.get(tid, 0) for tid in trade_ids)
+
+    def everything(self) -> Tuple[int, int]:
+        return self.epoch, self.data
+
+    def bump(self, months: Iterable[str] = (), trade_ids: Iterable[int] = (), everything: bool = False) -> None:
+        with self._lock:
+            self.data += 1
+            if everything:
+                self.epoch += 1
+            for m in set(months):
+                self.months[m] = self.months.get(m, 0) + 1
+            for tid in set(trade_ids):
+                self.trades[tid] = self.trades.get(tid, 0) + 1
+
+
+# Polls a PRAGMA data_version reader (ConnectionPool.data_version) and reports whether another
+# process has committed since the last poll. A None reading (writer busy) changes nothing.
+class ChangeWatch:
+    def __init__(self, read_version: Callable[[], Optional[int]]) -> None:
+        self._read_version = read_version
+        self._lock = threading.Lock()
+        self._seen = read_version()
+
+    def changed(self) -> bool:
+        current = self._read_version()
+        if current is None:
+            return False
+        with self._lock:
+            moved = self._seen is not None and current != self._seen
+            self._seen = current
+        return moved
+
+
+# name -> LRU of args -> (version, value); a lookup under a newer version recomputes and replaces.
+class VersionedCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[tuple, Tuple[tuple, object]]"] = {}
+        self.calls: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get(self, name: str, args: tuple, version: tuple, compute: Callable[[], T], max_entries: int = MONTH_CACHE_ENTRIES) -> T:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            entries = self._entries.setdefault(name, OrderedDict())
+            cached = entries.get(args)
+            if cached is not None and cached[0] == version:
+                entries.move_to_end(args)
+                instrument.cache_event(name, True)
+                return cached[1]  # type: ignore[return-value]
+            self.misses[name] = self.misses.get(name, 0) + 1
+
+        # computed outside the lock: two callers may race to fill the same key, both get a correct value
+        instrument.cache_event(name, False)
+        with instrument.span(name):
+            value = compute()
+        with self._lock:
+            entries[args] = (version, value)
+            entries.move_to_end(args)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            rows = []
+            for name in sorted(self.calls):
+                calls = self.calls[name]
+                misses = min(self.misses.get(name, 0), calls)
+                rows.append(
+                    {
+                        "cache": name,
+                        "calls": calls,
+                        "hits": calls - misses,
+                        "misses": misses,
+                        "hit_rate": f"{(calls - misses) / calls:.0%}",
+                    }
+                )
+            return rows
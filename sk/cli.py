@@ -0,0 +1,334 @@
+"""
+SK command line.
+
+    python -m sk stats --month 2026-10          # month KPIs (+ --days for the daily breakdown)
+    python -m sk breakdown --from 2026-01-01    # P/L by symbol x direction (--sort win_rate --desc)
+    python -m sk import history.csv [--dry-run] # CSV / MT4 / MT5 statement
+    python -m sk export trades.csv --from 2026-01-01 --format parquet
+    python -m sk --account ftmo-100k stats      # any command, against one account
+    python -m sk accounts [--create NAME]       # list (or add) accounts
+    python -m sk compact --retention-days 30    # archive old deleted trades, vacuum, analyze
+    python -m sk restore 41 42 | --list         # bring deleted / archived trades back
+    python -m sk rebuild-rollups                # recompute daily / monthly P/L from the entries
+    python -m sk backup [--list | --verify]     # online snapshot (keeps the newest --keep)
+    python -m sk restore-backup SNAP NEW.db     # a snapshot into a fresh database file
+    python -m sk serve [--port 8765]            # local read-only JSON API (see sk.api)
+
+The database is --account NAME, else --db, else $SK_DB_PATH, else ./trades.db. With $SK_PERF_LOG set, each command
+appends its timings (queries, rows, stages) to that JSONL file. Only the standard library is
+imported on the way to a command (pyarrow only for Parquet export).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, datetime
+from typing import List, Optional
+
+from sk import instrument
+from sk.accounts import DEFAULT_ACCOUNT, account_path, create_account, existing_account_path, list_accounts
+from sk.api import API_HOST, API_PORT, make_server
+from sk.archive import ARCHIVE_RETENTION_DAYS, compact, deleted_trades, restore_trades
+from sk.backup import BACKUP_KEEP, backup, list_snapshots, restore_snapshot, verify_snapshot
+from sk.db import DEFAULT_DB_PATH, SchemaUpgradeError
+from sk.fmt import format_cents, ratio_text
+from sk.journal import BREAKDOWN_SORTS, Journal
+from sk.transfer import EXPORT_FORMATS, export_trades, import_trades
+
+
+def _month_arg(text: str) -> str:
+    try:
+        return datetime.strptime(text, "%Y-%m").strftime("%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {text!r}") from None
+
+
+def cmd_stats(journal: Journal, args: argparse.Namespace) -> int:
+    trades, profit, loss, net = journal.month_stats(args.month)
+    daily = journal.build_daily_map(args.month) if args.days else {}
+    if args.json:
+        # money as integer cents, as stored
+        out = {"month": args.month, "trades": trades, "profit_cents": profit, "loss_cents": loss, "net_cents": net}
+        if args.days:
+            out["days"] = {d: {"trades": v["trades"], "pnl_cents": v["pnl"]} for d, v in daily.items()}
+        print(json.dumps(out, indent=2))
+        return 0
+
+    print(f"{args.month}  trades {trades}  profit {format_cents(profit)}  loss {format_cents(loss)}  net {format_cents(net)}")
+    for day in sorted(daily):
+        v = daily[day]
+        print(f"  {day}  {v['trades']:>4} trades  {format_cents(v['pnl']):>14}")
+    return 0
+
+
+def cmd_breakdown(journal: Journal, args: argparse.Namespace) -> int:
+    rows = journal.symbol_breakdown(args.start, args.end, sort=args.sort, descending=args.desc)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    for r in rows:
+        per_lot = format_cents(r["net_per_lot"]) if r["net_per_lot"] is not None else "—"
+        print(
+            f"{r['symbol']:<10} {r['direction']:<5} {r['trades']:>5} trades  net {format_cents(r['net']):>12}  "
+            f"win {ratio_text(r['win_rate'], pct=True):>6}  entries/trade {r['avg_entries']:.2f}  per lot {per_lot:>12}"
+        )
+    return 0
+
+
+def cmd_import(journal: Journal, args: argparse.Namespace) -> int:
+    source = sys.stdin.buffer if args.file == "-" else args.file
+    summary = import_trades(journal, source, dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        verb = "would import" if summary["dry_run"] else "imported"
+        print(
+            f"{verb} {summary['entries']} entries into {summary['trades']} new trades "
+            f"({summary['first_date'] or '-'} -> {summary['last_date'] or '-'}, net {format_cents(summary['net_pnl'])}) "
+            f"in {summary.get('seconds', 0)}s; duplicates {summary['duplicates']}, "
+            f"non-trade rows {summary['skipped']}, invalid {summary['invalid']}"
+        )
+        for err in summary["errors"]:
+            print(f"  {err}", file=sys.stderr)
+    return 1 if summary["errors"] and not summary["entries"] else 0
+
+
+def cmd_export(journal: Journal, args: argparse.Namespace) -> int:
+    dest = sys.stdout.buffer if args.dest == "-" else args.dest
+    try:
+        result = export_trades(
+            journal,
+            dest,
+            args.format,
+            start=args.start,
+            end=args.end,
+            symbol=args.symbol,
+            include_deleted=args.include_deleted,
+        )
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"exported {result['rows']} rows ({result['format']}) in {result['seconds']}s", file=sys.stderr)
+    return 0
+
+
+def cmd_compact(journal: Journal, args: argparse.Namespace) -> int:
+    report = compact(journal, retention_days=args.retention_days, dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    archive, purge = ("would archive", "purge") if report["dry_run"] else ("archived", "purged")
+    print(
+        f"{archive} {report['archived_trades']} trades ({report['archived_entries']} entries) deleted before {report['cutoff']}, "
+        f"{purge} {report['orphan_entries']} orphan entries -> {report['archive']}"
+    )
+    if report["vacuum"]:
+        print(f"{report['vacuum']}: {report['bytes_before']:,} -> {report['bytes_after']:,} bytes ({report['reclaimed_bytes']:,} reclaimed) in {report['seconds']}s")
+    return 0
+
+
+def cmd_restore(journal: Journal, args: argparse.Namespace) -> int:
+    if args.list or not args.ids:
+        rows = deleted_trades(journal)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return 0
+        for r in rows:
+            print(f"{r['id']:>7}  {r['trade_date']}  {r['symbol']:<10} {r['direction']:<4} {format_cents(r['total']):>12}  deleted {r['deleted_at']}  ({r['where']})")
+        return 0
+    result = restore_trades(journal, args.ids)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"restored {result['trades']} of {len(set(args.ids))} trades ({result['from_archive']} from the archive)")
+    return 0 if result["trades"] else 1
+
+
+def cmd_rebuild_rollups(journal: Journal, args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    result = journal.rebuild_rollups()
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"rebuilt rollups: {result['days']} days, {result['months']} months in {result['seconds']}s")
+    return 0
+
+
+def cmd_backup(journal: Journal, args: argparse.Namespace) -> int:
+    if args.list or args.verify:
+        rows = list_snapshots(journal.path)
+        if args.verify:
+            for r in rows:
+                r["integrity"] = verify_snapshot(r["path"])
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            for r in rows:
+                check = f"  {r['integrity']}" if args.verify else ""
+                print(f"{r['created']}  {r['bytes']:>12,} bytes  {r['path']}{check}")
+        return 1 if any(r.get("integrity", "ok") != "ok" for r in rows) else 0
+
+    report = backup(journal, keep=args.keep)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"snapshot {report['path']}: {report['bytes']:,} bytes ({report['pages']} pages, {report['steps']} steps) "
+            f"copied in {report['copy_seconds']}s ({report['mb_per_s']} MiB/s), integrity {report['integrity']} in {report['verify_seconds']}s; "
+            f"rotated out {len(report['removed'])}"
+        )
+    return 0
+
+
+def cmd_restore_backup(args: argparse.Namespace) -> int:
+    try:
+        report = restore_snapshot(args.snapshot, args.dest)
+    except (ValueError, sqlite3.DatabaseError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"restored {report['snapshot']} -> {report['path']}: {report['bytes']:,} bytes in {report['seconds']}s, integrity {report['integrity']}")
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    try:
+        default_db = existing_account_path(args.account) if args.account else args.db
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    server = make_server(args.host, args.port, default_db=default_db)
+    print(f"serving {default_db} on http://{args.host}:{server.server_address[1]}/api/ (Ctrl+C stops)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def cmd_accounts(args: argparse.Namespace) -> int:
+    if args.create:
+        try:
+            create_account(args.create)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+    rows = [{"account": name, "path": account_path(name), "default": name == DEFAULT_ACCOUNT} for name in list_accounts()]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for r in rows:
+            print(f"{r['account']:<24} {r['path']}{'  (default)' if r['default'] else ''}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sk", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--db", default=DEFAULT_DB_PATH, help="trades database (default: %(default)s)")
+    target.add_argument("--account", help="account name (see `accounts`); overrides --db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats = sub.add_parser("stats", help="month KPIs")
+    stats.add_argument("--month", type=_month_arg, default=date.today().strftime("%Y-%m"), help="YYYY-MM (default: this month)")
+    stats.add_argument("--days", action="store_true", help="also list every trading day")
+    stats.add_argument("--json", action="store_true")
+    stats.set_defaults(run=cmd_stats)
+
+    brk = sub.add_parser("breakdown", help="net P/L, win rate, entries and P/L per lot by symbol x direction")
+    brk.add_argument("--from", dest="start", default="0000-01-01", help="first trade date, YYYY-MM-DD")
+    brk.add_argument("--to", dest="end", default="9999-12-31", help="last trade date, YYYY-MM-DD")
+    brk.add_argument("--sort", choices=BREAKDOWN_SORTS, default="net", help="default: %(default)s, worst first")
+    brk.add_argument("--desc", action="store_true", help="largest first")
+    brk.add_argument("--json", action="store_true")
+    brk.set_defaults(run=cmd_breakdown)
+
+    imp = sub.add_parser("import", help="import a CSV / MT4 / MT5 history file ('-' = stdin)")
+    imp.add_argument("file")
+    imp.add_argument("--dry-run", action="store_true", help="parse and dedup only, write nothing")
+    imp.add_argument("--json", action="store_true")
+    imp.set_defaults(run=cmd_import)
+
+    exp = sub.add_parser("export", help="export trades + entries ('-' = stdout)")
+    exp.add_argument("dest")
+    exp.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    exp.add_argument("--from", dest="start", help="first trade date, YYYY-MM-DD")
+    exp.add_argument("--to", dest="end", help="last trade date, YYYY-MM-DD")
+    exp.add_argument("--symbol")
+    exp.add_argument("--include-deleted", action="store_true")
+    exp.set_defaults(run=cmd_export)
+
+    cmp = sub.add_parser("compact", help="archive trades deleted before the retention, purge orphans, vacuum + analyze")
+    cmp.add_argument("--retention-days", type=int, default=ARCHIVE_RETENTION_DAYS, help="default: %(default)s")
+    cmp.add_argument("--dry-run", action="store_true", help="count only, change nothing")
+    cmp.add_argument("--json", action="store_true")
+    cmp.set_defaults(run=cmd_compact)
+
+    rst = sub.add_parser("restore", help="undelete trades by id (also from the archive); --list shows deleted trades")
+    rst.add_argument("ids", nargs="*", type=int)
+    rst.add_argument("--list", action="store_true")
+    rst.add_argument("--json", action="store_true")
+    rst.set_defaults(run=cmd_restore)
+
+    rb = sub.add_parser("rebuild-rollups", help="recompute the daily / monthly P/L tables from the entries (after a crash or bulk load)")
+    rb.add_argument("--json", action="store_true")
+    rb.set_defaults(run=cmd_rebuild_rollups)
+
+    bk = sub.add_parser("backup", help="online snapshot into backups/ next to the database, with rotation")
+    bk.add_argument("--keep", type=int, default=BACKUP_KEEP, help="snapshots to keep (default: %(default)s)")
+    bk.add_argument("--list", action="store_true", help="list snapshots, newest first, instead")
+    bk.add_argument("--verify", action="store_true", help="list and integrity-check every snapshot instead")
+    bk.add_argument("--json", action="store_true")
+    bk.set_defaults(run=cmd_backup)
+
+    rbk = sub.add_parser("restore-backup", help="copy a snapshot into a new database file (never overwrites)")
+    rbk.add_argument("snapshot")
+    rbk.add_argument("dest")
+    rbk.add_argument("--json", action="store_true")
+    rbk.set_defaults(run=cmd_restore_backup, needs_journal=False)
+
+    srv = sub.add_parser("serve", help="local read-only JSON API: month / day aggregates and trades, with ETags")
+    srv.add_argument("--host", default=API_HOST, help="default: %(default)s (this machine only)")
+    srv.add_argument("--port", type=int, default=API_PORT, help="default: %(default)s")
+    srv.set_defaults(run=cmd_serve, needs_journal=False)
+
+    acc = sub.add_parser("accounts", help="list accounts (one database file each)")
+    acc.add_argument("--create", metavar="NAME", help="add an empty account first")
+    acc.add_argument("--json", action="store_true")
+    acc.set_defaults(run=cmd_accounts, needs_journal=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "needs_journal", True):
+        return args.run(args)
+    if args.account:
+        try:
+            args.db = existing_account_path(args.account)
+        except ValueError as e:
+            parser.error(str(e))
+    perf_log = os.environ.get("SK_PERF_LOG")
+    rec = instrument.start_run(source="cli", command=args.command) if perf_log else None
+    try:
+        journal = Journal(args.db, readers=1)
+    except SchemaUpgradeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    try:
+        return args.run(journal, args)
+    finally:
+        journal.close()
+        if rec is not None:
+            instrument.stop_run(rec, log_path=perf_log)
@@ -0,0 +1,407 @@
+"""
+SK storage: the SQLite connection pool, schema migrations and query-plan checks.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from sk import instrument
+from sk.fmt import MONEY_SCALE
+from sk.rollups import TRADE_TOTALS_SQL, month_bounds
+
+DEFAULT_DB_PATH = os.environ.get("SK_DB_PATH", "trades.db")
+
+READ_POOL_SIZE = 4
+BUSY_TIMEOUT_MS = 5000
+PAGE_CACHE_KIB = 32768
+
+# A write that finds the database locked by another process (a second dashboard, the CLI) waits
+# WRITE_BUSY_TIMEOUT_MS inside SQLite, then backs off and retries up to WRITE_RETRIES more times.
+WRITE_BUSY_TIMEOUT_MS = 1000
+WRITE_RETRIES = 4
+RETRY_BACKOFF_S = 0.05
+
+T = TypeVar("T")
+
+
+class DatabaseBusy(sqlite3.OperationalError):
+    # still locked after every retry; the transaction was rolled back, nothing was written
+    pass
+
+
+def now_iso() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def is_locked_error(e: sqlite3.OperationalError) -> bool:
+    return "database is locked" in str(e) or "database is busy" in str(e)
+
+
+def with_retry(op: Callable[[], T], what: str) -> T:
+    attempt = 0
+    while True:
+        try:
+            return op()
+        except sqlite3.OperationalError as e:
+            if not is_locked_error(e):
+                raise
+            if attempt == WRITE_RETRIES:
+                raise DatabaseBusy(f"{what}: database still locked after {attempt + 1} attempts") from e
+        # jittered exponential backoff so competing writers don't retry in lockstep
+        time.sleep(RETRY_BACKOFF_S * 2**attempt * random.uniform(0.5, 1.5))
+        attempt += 1
+
+
+# =========================
+# Connection pool
+# =========================
+# One long-lived writer plus a fixed pool of readers, shared by every session (WAL lets readers run alongside the writer).
+class ConnectionPool:
+    def __init__(self, path: str, readers: int = READ_POOL_SIZE) -> None:
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._writer = self._connect(WRITE_BUSY_TIMEOUT_MS)
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._size = readers
+        for _ in range(readers):
+            self._readers.put(self._connect())
+
+    def _connect(self, busy_timeout_ms: int = BUSY_TIMEOUT_MS) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=busy_timeout_ms / 1000)
+        with_retry(lambda: conn.execute("PRAGMA journal_mode = WAL"), "open")
+        conn.execute(f"PRAGMA busy_timeout = {busy_timeout_ms}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{PAGE_CACHE_KIB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        conn = self._readers.get()
+        rec = instrument.attach(conn)
+        try:
+            yield conn
+        finally:
+            instrument.detach(conn, rec)
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front so a read->write upgrade never fails with SQLITE_BUSY;
+        # BEGIN and COMMIT retry with backoff while another process holds the lock (DatabaseBusy if it never frees).
+        with self._write_lock:
+            conn = self._writer
+            rec = instrument.attach(conn)
+            try:
+                with_retry(lambda: conn.execute("BEGIN IMMEDIATE"), "begin write")
+                try:
+                    yield conn
+                    with_retry(conn.commit, "commit")
+                except BaseException:
+                    conn.rollback()
+                    raise
+            finally:
+                instrument.detach(conn, rec)
+
+    def data_version(self) -> Optional[int]:
+        # PRAGMA data_version on the writer: unchanged by this pool's own commits, it moves only when another
+        # connection -- another process -- commits. None while this process is writing (checked next time).
+        if not self._write_lock.acquire(blocking=False):
+            return None
+        try:
+            return self._writer.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self._write_lock.release()
+
+    @contextmanager
+    def maintenance(self) -> Iterator[sqlite3.Connection]:
+        # the writer outside any transaction, for statements that cannot run inside one (VACUUM, checkpoints)
+        with self._write_lock:
+            conn = self._writer
+            rec = instrument.attach(conn)
+            try:
+                yield conn
+            finally:
+                instrument.detach(conn, rec)
+
+    def close(self) -> None:
+        # waits for readers still checked out
+        with self._write_lock:
+            self._writer.close()
+        for _ in range(self._size):
+            self._readers.get().close()
+
+
+# =========================
+# Schema migrations
+# =========================
+# Applied once each, in order, at startup; PRAGMA user_version records the last one applied.
+# Never edit a shipped migration -- append a new one. A migration's SQL is frozen inside it: it
+# must not call the live helpers, whose SQL follows the current schema, not its own.
+def _m001_base_tables(cur: sqlite3.Cursor) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trade_date TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            base_lot REAL,
+            created_at TEXT NOT NULL,
+            locked_at TEXT,
+            deleted_at TEXT
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS trade_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trade_id INTEGER NOT NULL,
+            entry_no INTEGER NOT NULL,
+            entry_pnl REAL NOT NULL,
+            FOREIGN KEY(trade_id) REFERENCES trades(id)
+        )
+        """
+    )
+
+
+def _m002_pnl_rollups(cur: sqlite3.Cursor) -> None:
+    # P/L rollups, kept current by every write (see sk.rollups.refresh_rollups)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_pnl (
+            trade_date TEXT PRIMARY KEY,
+            trades INTEGER NOT NULL,
+            profit REAL NOT NULL,
+            loss REAL NOT NULL,
+            net REAL NOT NULL
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_pnl (
+            month TEXT PRIMARY KEY,
+            trades INTEGER NOT NULL,
+            profit REAL NOT NULL,
+            loss REAL NOT NULL,
+            net REAL NOT NULL
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        INSERT INTO daily_pnl (trade_date, trades, profit, loss, net)
+        SELECT
+            trade_date,
+            COUNT(*),
+            SUM(CASE WHEN total > 0 THEN total ELSE 0 END),
+            SUM(CASE WHEN total < 0 THEN total ELSE 0 END),
+            SUM(total)
+        FROM (
+            SELECT t.id, t.trade_date AS trade_date, COALESCE(SUM(e.entry_pnl), 0) AS total
+            FROM trades t
+            LEFT JOIN trade_entries e ON e.trade_id = t.id
+            WHERE t.deleted_at IS NULL
+            GROUP BY t.id
+        )
+        GROUP BY trade_date
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO monthly_pnl (month, trades, profit, loss, net)
+        SELECT substr(trade_date, 1, 7), SUM(trades), SUM(profit), SUM(loss), SUM(net)
+        FROM daily_pnl
+        GROUP BY substr(trade_date, 1, 7)
+        """
+    )
+
+
+def _m003_indexes(cur: sqlite3.Cursor) -> None:
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_entries_trade ON trade_entries (trade_id, entry_no)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_date ON trades (trade_date, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_live_date ON trades (trade_date, id) WHERE deleted_at IS NULL")
+    cur.execute("ANALYZE")
+
+
+def _m004_entry_source_ref(cur: sqlite3.Cursor) -> None:
+    # broker ticket (or row fingerprint) of imported entries, used to skip rows already imported
+    cur.execute("ALTER TABLE trade_entries ADD COLUMN source_ref TEXT")
+    cur.execute("CREATE UNIQUE INDEX idx_entries_source_ref ON trade_entries (source_ref) WHERE source_ref IS NOT NULL")
+
+
+def _m005_integer_cents(cur: sqlite3.Cursor) -> None:
+    # P/L as integer cents: sums in SQL are exact and reads need no float parsing (sk.fmt renders them).
+    # A value with at most 2 decimals round-trips exactly through value * 100; any other (an import
+    # with sub-cent P/L) is kept as it was in entry_pnl_pre_cents before the REAL column is dropped.
+    cur.execute("ALTER TABLE trade_entries ADD COLUMN pnl_cents INTEGER NOT NULL DEFAULT 0")
+    cur.execute(f"UPDATE trade_entries SET pnl_cents = CAST(ROUND(entry_pnl * {MONEY_SCALE}) AS INTEGER)")
+    cur.execute(
+        f"""
+        CREATE TABLE entry_pnl_pre_cents AS
+        SELECT id AS entry_id, trade_id, entry_no, entry_pnl, pnl_cents
+        FROM trade_entries
+        WHERE pnl_cents * 1.0 / {MONEY_SCALE} != entry_pnl
+        """
+    )
+    if cur.execute("SELECT COUNT(*) FROM entry_pnl_pre_cents").fetchone()[0] == 0:
+        cur.execute("DROP TABLE entry_pnl_pre_cents")
+    cur.execute("ALTER TABLE trade_entries DROP COLUMN entry_pnl")  # SQLite >= 3.35, see MIGRATION_MIN_SQLITE
+
+    # the rollups are derived data: recreate them with integer columns and rebuild
+    cur.execute("DROP TABLE IF EXISTS daily_pnl")
+    cur.execute("DROP TABLE IF EXISTS monthly_pnl")
+    cur.execute(
+        """
+        CREATE TABLE daily_pnl (
+            trade_date TEXT PRIMARY KEY,
+            trades INTEGER NOT NULL,
+            profit_cents INTEGER NOT NULL,
+            loss_cents INTEGER NOT NULL,
+            net_cents INTEGER NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE monthly_pnl (
+            month TEXT PRIMARY KEY,
+            trades INTEGER NOT NULL,
+            profit_cents INTEGER NOT NULL,
+            loss_cents INTEGER NOT NULL,
+            net_cents INTEGER NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO daily_pnl (trade_date, trades, profit_cents, loss_cents, net_cents)
+        SELECT
+            trade_date,
+            COUNT(*),
+            SUM(CASE WHEN total > 0 THEN total ELSE 0 END),
+            SUM(CASE WHEN total < 0 THEN total ELSE 0 END),
+            SUM(total)
+        FROM (
+            SELECT t.id, t.trade_date AS trade_date, COALESCE(SUM(e.pnl_cents), 0) AS total
+            FROM trades t
+            LEFT JOIN trade_entries e ON e.trade_id = t.id
+            WHERE t.deleted_at IS NULL
+            GROUP BY t.id
+        )
+        GROUP BY trade_date
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO monthly_pnl (month, trades, profit_cents, loss_cents, net_cents)
+        SELECT substr(trade_date, 1, 7), SUM(trades), SUM(profit_cents), SUM(loss_cents), SUM(net_cents)
+        FROM daily_pnl
+        GROUP BY substr(trade_date, 1, 7)
+        """
+    )
+
+
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Cursor], None]]] = [
+    (1, _m001_base_tables),
+    (2, _m002_pnl_rollups),
+    (3, _m003_indexes),
+    (4, _m004_entry_source_ref),
+    (5, _m005_integer_cents),
+]
+
+# Oldest SQLite library a migration runs on (ALTER TABLE ... DROP COLUMN is 3.35).
+MIGRATION_MIN_SQLITE = {5: (3, 35, 0)}
+
+
+class SchemaUpgradeError(RuntimeError):
+    pass
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def _check_sqlite_version(current: int) -> None:
+    # before any step runs, so an old SQLite leaves the database untouched rather than half upgraded
+    for version, needed in sorted(MIGRATION_MIN_SQLITE.items()):
+        if version > current and sqlite3.sqlite_version_info < needed:
+            raise SchemaUpgradeError(
+                f"Upgrading this database to schema {version} needs SQLite {'.'.join(map(str, needed))} or newer; "
+                f"this Python has SQLite {sqlite3.sqlite_version}. Use a newer Python (or pysqlite3); nothing was changed."
+            )
+
+
+def init_db(pool: ConnectionPool) -> List[int]:
+    applied: List[int] = []
+    with pool.read() as conn:
+        current = schema_version(conn)
+        if current >= MIGRATIONS[-1][0]:
+            return applied
+    _check_sqlite_version(current)
+    for version, migration in MIGRATIONS:
+        with pool.write() as conn:
+            # re-read inside the write lock so concurrent processes never apply a step twice
+            if schema_version(conn) >= version:
+                continue
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version}")
+        applied.append(version)
+    return applied
+
+
+# =========================
+# Query plans
+# =========================
+# Hot queries checked by explain_hot_queries(); params are filled from the newest live trade.
+HOT_QUERIES: List[Tuple[str, str]] = [
+    ("entries of a trade", "SELECT id, entry_no, pnl_cents FROM trade_entries WHERE trade_id = :trade_id ORDER BY entry_no"),
+    ("live trades, newest first", "SELECT * FROM trades WHERE deleted_at IS NULL ORDER BY trade_date DESC, id DESC"),
+    ("live trades on a day", "SELECT * FROM trades WHERE deleted_at IS NULL AND trade_date = :day ORDER BY id"),
+    ("trade totals on a day", "{totals}"),
+    ("daily rollup of a month", "SELECT * FROM daily_pnl WHERE trade_date BETWEEN :month_first AND :month_last"),
+]
+
+
+def explain_hot_queries(pool: ConnectionPool, runs: int = 5) -> List[dict]:
+    with pool.read() as conn:
+        row = conn.execute("SELECT id, trade_date FROM trades WHERE deleted_at IS NULL ORDER BY id DESC LIMIT 1").fetchone()
+        trade_id, day = row if row else (0, date.today().strftime("%Y-%m-%d"))
+        first, last = month_bounds(day[:7])
+        params = {"trade_id": trade_id, "day": day, "month_first": first, "month_last": last}
+        totals = TRADE_TOTALS_SQL.format(where="AND t.trade_date = :day")
+
+        report = []
+        for name, sql in HOT_QUERIES:
+            sql = sql.format(totals=totals)
+            plan = [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            started = time.perf_counter()
+            for _ in range(runs):
+                rows = conn.execute(sql, params).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+            # a bare "SCAN <table>" without an index is a full table scan; scans of subqueries are fine
+            full_scan = any(p.startswith("SCAN ") and "INDEX" not in p and "(subquery" not in p for p in plan)
+            report.append(
+                {
+                    "query": name,
+                    "plan": " | ".join(plan),
+                    "uses_index": not full_scan,
+                    "rows": len(rows),
+                    "avg_ms": round(elapsed_ms, 3),
+                }
+            )
+    return report
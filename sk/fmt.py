@@ -0,0 +1,63 @@
+"""
+SK formatting: money, ratios and input parsing shared by the dashboard and the CLI.
+
+P/L is stored, summed and cached as integer cents; to_cents() converts at input (forms,
+imports) and format_cents() / from_cents() at render, so no float ever reaches a total.
+"""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional, Union
+
+# Minor units per account-currency unit (P/L is always account currency, whatever the symbol).
+MONEY_SCALE = 100
+
+
+def to_cents(x: Union[float, str, Decimal]) -> int:
+    # via the decimal text, so 1.005 is 101 cents, not 100 (1.005 * 100 == 100.49999...)
+    return int((Decimal(str(x).strip()) * MONEY_SCALE).to_integral_value(ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> float:
+    return cents / MONEY_SCALE
+
+
+def format_cents(cents: Union[int, float]) -> str:
+    # exact: integer division, no float formatting (averages in cents are rounded to the cent first)
+    cents = int(round(cents))
+    whole, frac = divmod(abs(cents), MONEY_SCALE)
+    sign = "+" if cents > 0 else ""
+    minus = "-" if cents < 0 else ""
+    return f"{sign}${minus}{whole:,}.{frac:02d}"
+
+
+def format_money(x: float) -> str:
+    sign = "+" if x > 0 else ""
+    return f"{sign}${x:,.2f}"
+
+
+def safe_float(text: str) -> Optional[float]:
+    t = (text or "").strip()
+    if not t:
+        return None
+    try:
+        return float(t)
+    except ValueError:
+        return None
+
+
+def pnl_class(x: float) -> str:
+    if x > 0:
+        return "green"
+    if x < 0:
+        return "red"
+    return ""
+
+
+def ratio_text(x: Optional[float], pct: bool = False) -> str:
+    if x is None:
+        return "—"
+    if x == float("inf"):
+        return "∞"
+    return f"{x:.1%}" if pct else f"{x:.2f}"
@@ -0,0 +1,158 @@
+"""
+SK instrumentation: per-run SQL, cache and timing counters.
+
+A run (one dashboard rerun, one CLI command) is recorded only while a RunRecorder is
+active in the current context. With none active every hook below is a single ContextVar
+lookup, and no SQLite trace callback is installed.
+
+    rec = start_run(source="cli")
+    with span("render:kpis"):
+        ...
+    summary = stop_run(rec, log_path="perf.jsonl")   # one JSON line per run
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+_current: ContextVar[Optional["RunRecorder"]] = ContextVar("sk_run", default=None)
+_log_lock = threading.Lock()
+
+
+class RunRecorder:
+    def __init__(self, **meta) -> None:
+        self.meta = meta
+        self.ts = datetime.now().isoformat(timespec="milliseconds")
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.rows = 0
+        self.connections = 0
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self.spans: List[dict] = []
+        self._depth = 0
+
+    def query(self, _sql: str) -> None:
+        self.queries += 1
+
+    def cache_event(self, name: str, hit: bool) -> None:
+        counts = self.cache.setdefault(name, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start, queries, rows = time.perf_counter(), self.queries, self.rows
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth = depth
+            self.spans.append(
+                {
+                    "name": name,
+                    "depth": depth,
+                    "start_ms": round((start - self.started) * 1000, 3),
+                    "ms": round((time.perf_counter() - start) * 1000, 3),
+                    "queries": self.queries - queries,
+                    "rows": self.rows - rows,
+                }
+            )
+
+    def summary(self, interrupted: bool = False) -> dict:
+        hits = sum(c["hits"] for c in self.cache.values())
+        misses = sum(c["misses"] for c in self.cache.values())
+        return {
+            "ts": self.ts,
+            **self.meta,
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "interrupted": interrupted,
+            "queries": self.queries,
+            "rows": self.rows,
+            "connections": self.connections,
+            "cache_hits": hits,
+            "cache_misses": misses,
+            "cache": self.cache,
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+
+def start_run(**meta) -> RunRecorder:
+    rec = RunRecorder(**meta)
+    _current.set(rec)
+    return rec
+
+
+def stop_run(rec: RunRecorder, interrupted: bool = False, log_path: Optional[str] = None) -> dict:
+    if _current.get() is rec:
+        _current.set(None)
+    summary = rec.summary(interrupted)
+    if log_path:
+        line = json.dumps(summary, separators=(",", ":"))
+        with _log_lock, open(log_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    return summary
+
+
+def current() -> Optional[RunRecorder]:
+    return _current.get()
+
+
+# =========================
+# Hooks (no-ops unless a run is active)
+# =========================
+_NO_SPAN = nullcontext()
+
+
+def span(name: str):
+    rec = _current.get()
+    return _NO_SPAN if rec is None else rec.span(name)
+
+
+def timed(fn: F) -> F:
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        rec = _current.get()
+        if rec is None:
+            return fn(*args, **kwargs)
+        with rec.span(name):
+            return fn(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def add_rows(n: int) -> None:
+    rec = _current.get()
+    if rec is not None:
+        rec.rows += n
+
+
+def cache_event(name: str, hit: bool) -> None:
+    rec = _current.get()
+    if rec is not None:
+        rec.cache_event(name, hit)
+
+
+def attach(conn: sqlite3.Connection) -> Optional[RunRecorder]:
+    # counts every statement the connection runs until detach(); the pool calls this on checkout
+    rec = _current.get()
+    if rec is not None:
+        rec.connections += 1
+        conn.set_trace_callback(rec.query)
+    return rec
+
+
+def detach(conn: sqlite3.Connection, rec: Optional[RunRecorder]) -> None:
+    if rec is not None:
+        conn.set_trace_callback(None)
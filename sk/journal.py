@@ -0,0 +1,695 @@
+"""
+SK journal: every read, aggregate and write against one trades database.
+
+A Journal owns the connection pool, the data versions and the read cache of its file, so
+the dashboard, the CLI and scripts share one code path. open_journal() hands out one
+Journal per database path per process.
+
+Every money value going in or out -- entry P/L, totals, profit / loss / net buckets -- is
+integer cents (sk.fmt.to_cents / format_cents convert at the edges).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from functools import partial
+from typing import ContextManager, Dict, Iterable, List, Optional, Tuple, Union
+
+from sk import instrument
+from sk.cache import MONTH_CACHE_ENTRIES, TRADE_CACHE_ENTRIES, ChangeWatch, DataVersions, VersionedCache
+from sk.db import DEFAULT_DB_PATH, READ_POOL_SIZE, ConnectionPool, explain_hot_queries, init_db, now_iso
+from sk.rollups import month_bounds, month_key, rebuild_rollups, refresh_rollups, year_window
+from sk.writer import WriteOp, WriteQueue
+
+# One page of live trades, newest first, with each trade's total. Keyset-paginated over the
+# (trade_date, id) index: a page starts strictly after the last row of the previous one.
+TRADE_PAGE_SQL = """
+    SELECT * FROM (
+        SELECT t.*, (SELECT COALESCE(SUM(e.pnl_cents), 0) FROM trade_entries e WHERE e.trade_id = t.id) AS total
+        FROM trades t
+        WHERE t.deleted_at IS NULL {where}
+    )
+    {having}
+    ORDER BY trade_date DESC, id DESC
+    LIMIT :limit
+"""
+PAGE_SIGNS = {"win": "WHERE total > 0", "loss": "WHERE total < 0", "flat": "WHERE total = 0"}
+PAGE_SIZE = 50
+
+# Entries of a set of trades in one query, grouped in memory by _group_entries(); trades
+# without entries still come back as one row with NULL entry columns.
+ENTRIES_SQL = """
+    SELECT t.id, e.id, e.entry_no, e.pnl_cents
+    FROM trades t
+    LEFT JOIN trade_entries e ON e.trade_id = t.id
+    WHERE {where}
+    ORDER BY t.id, e.entry_no
+"""
+
+# One row per live trade (entries count + total) for the analytics engine.
+TRADE_FRAME_SQL = """
+    SELECT t.id AS trade_id, t.trade_date, t.symbol, t.direction, t.base_lot,
+           COUNT(e.id) AS entries, COALESCE(SUM(e.pnl_cents), 0) AS total
+    FROM trades t
+    LEFT JOIN trade_entries e ON e.trade_id = t.id
+    WHERE t.deleted_at IS NULL AND t.trade_date BETWEEN ? AND ?
+    GROUP BY t.id
+    ORDER BY t.trade_date, t.id
+"""
+
+# Live trades grouped by symbol x direction in one query: the inner query totals each trade,
+# the outer one aggregates. Lot-normalized P/L only counts trades that have a base lot.
+SYMBOL_BREAKDOWN_SQL = """
+    SELECT symbol, direction, COUNT(*) AS trades,
+           SUM(total > 0) AS wins, SUM(total < 0) AS losses, SUM(total) AS net, SUM(entries) AS entries,
+           SUM(CASE WHEN base_lot > 0 THEN base_lot END) AS lots,
+           SUM(CASE WHEN base_lot > 0 THEN total END) AS lot_net
+    FROM (
+        SELECT t.symbol, t.direction, t.base_lot, COUNT(e.id) AS entries, COALESCE(SUM(e.pnl_cents), 0) AS total
+        FROM trades t
+        LEFT JOIN trade_entries e ON e.trade_id = t.id
+        WHERE t.deleted_at IS NULL AND t.trade_date BETWEEN ? AND ?
+        GROUP BY t.id
+    )
+    GROUP BY symbol, direction
+"""
+BREAKDOWN_SORTS = ("net", "trades", "win_rate", "avg_entries", "net_per_lot", "symbol")
+
+
+def empty_bucket() -> Dict[str, int]:
+    return {"trades": 0, "profit": 0, "loss": 0, "net": 0}
+
+
+def _bucket_from_row(r: tuple) -> Dict[str, int]:
+    return {"trades": r[0], "profit": r[1], "loss": r[2], "net": r[3]}
+
+
+def _group_entries(rows: List[tuple], trade_ids: Iterable[int] = ()) -> Dict[str, Dict]:
+    # -> {"entries": {id: [entry]}, "totals": {id: total}}; every requested id is present, even if unknown
+    entries: Dict[int, List[dict]] = {tid: [] for tid in trade_ids}
+    totals: Dict[int, int] = {tid: 0 for tid in entries}
+    for tid, entry_id, entry_no, cents in rows:
+        trade_entries = entries.setdefault(tid, [])
+        totals.setdefault(tid, 0)
+        if entry_id is not None:
+            trade_entries.append({"id": entry_id, "entry_no": entry_no, "pnl_cents": cents})
+            totals[tid] += cents
+    return {"entries": entries, "totals": totals}
+
+
+def _breakdown_row(r: dict) -> dict:
+    # net_per_lot: cents per 1.0 lot traded (None when no trade in the group has a base lot)
+    return {
+        "symbol": r["symbol"],
+        "direction": r["direction"],
+        "trades": r["trades"],
+        "wins": r["wins"],
+        "losses": r["losses"],
+        "net": r["net"],
+        "win_rate": r["wins"] / r["trades"],
+        "avg_entries": r["entries"] / r["trades"],
+        "lots": round(r["lots"], 4) if r["lots"] else None,
+        "net_per_lot": int(round(r["lot_net"] / r["lots"])) if r["lots"] else None,
+    }
+
+
+def _fetch(conn: sqlite3.Connection, sql: str, params: Union[tuple, dict] = ()) -> List[tuple]:
+    rows = conn.execute(sql, params).fetchall()
+    instrument.add_rows(len(rows))
+    return rows
+
+
+def _fetch_dicts(conn: sqlite3.Connection, sql: str, params: Union[tuple, dict] = ()) -> List[dict]:
+    cur = conn.execute(sql, params)
+    rows = cur.fetchall()
+    instrument.add_rows(len(rows))
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, r)) for r in rows]
+
+
+# =========================
+# Write ops
+# =========================
+# Run inside Journal.apply_writes()'s transaction; each returns its result plus the days whose
+# rollups need a refresh and the days / trades whose cache entries went stale.
+def _insert_trade(cur: sqlite3.Cursor, trade_date: str, symbol: str, direction: str, base_lot: Optional[float], entry_cents: List[int]) -> dict:
+    cur.execute(
+        """
+        INSERT INTO trades (trade_date, symbol, direction, base_lot, created_at, locked_at, deleted_at)
+        VALUES (?, ?, ?, ?, ?, NULL, NULL)
+        """,
+        (trade_date, symbol, direction, base_lot, now_iso()),
+    )
+    tid = cur.lastrowid
+
+    cur.executemany(
+        """
+        INSERT INTO trade_entries (trade_id, entry_no, pnl_cents)
+        VALUES (?, ?, ?)
+        """,
+        [(tid, i + 1, int(c)) for i, c in enumerate(entry_cents)],
+    )
+    return {"result": tid, "refresh": [trade_date], "stale": [trade_date], "trade_ids": [tid]}
+
+
+def _update_trade(
+    cur: sqlite3.Cursor,
+    trade_id: int,
+    trade_date: str,
+    symbol: str,
+    direction: str,
+    base_lot: Optional[float],
+    entry_cents: List[int],
+) -> dict:
+    # Diffs against the stored trade and writes only what changed: the header row if any header
+    # field differs, and per entry an UPDATE / INSERT / DELETE. Entries keep their rowid (and
+    # import source_ref) when they survive. The result reports what was changed. A queued save
+    # can run after the trade was deleted or locked elsewhere: then nothing is written and the
+    # report says so (found False, or locked True).
+    report = {"found": False, "locked": False, "header": False, "updated": 0, "inserted": 0, "deleted": 0, "days": []}
+    change = {"result": report, "refresh": [], "stale": [], "trade_ids": []}
+    row = cur.execute(
+        "SELECT trade_date, symbol, direction, base_lot, locked_at FROM trades WHERE id = ? AND deleted_at IS NULL",
+        (trade_id,),
+    ).fetchone()
+    if row is None:
+        return change
+    report["found"] = True
+    if row[4] is not None:
+        report["locked"] = True
+        return change
+    old_date = row[0]
+
+    if tuple(row[:4]) != (trade_date, symbol, direction, base_lot):
+        cur.execute(
+            "UPDATE trades SET trade_date = ?, symbol = ?, direction = ?, base_lot = ? WHERE id = ?",
+            (trade_date, symbol, direction, base_lot, trade_id),
+        )
+        report["header"] = True
+
+    # old and new entries are matched by position in entry_no order
+    old = cur.execute(
+        "SELECT id, entry_no, pnl_cents FROM trade_entries WHERE trade_id = ? ORDER BY entry_no, id",
+        (trade_id,),
+    ).fetchall()
+    new = [int(c) for c in entry_cents]
+    changed = [
+        (pnl, i + 1, entry_id)
+        for i, ((entry_id, entry_no, old_pnl), pnl) in enumerate(zip(old, new))
+        if old_pnl != pnl or entry_no != i + 1
+    ]
+    added = [(trade_id, i + 1, pnl) for i, pnl in enumerate(new[len(old) :], start=len(old))]
+    removed = [(r[0],) for r in old[len(new) :]]
+
+    if changed:
+        cur.executemany("UPDATE trade_entries SET pnl_cents = ?, entry_no = ? WHERE id = ?", changed)
+    if added:
+        cur.executemany("INSERT INTO trade_entries (trade_id, entry_no, pnl_cents) VALUES (?, ?, ?)", added)
+    if removed:
+        cur.executemany("DELETE FROM trade_entries WHERE id = ?", removed)
+    report.update(updated=len(changed), inserted=len(added), deleted=len(removed))
+
+    # symbol / direction / lot edits leave the P/L rollups as they are
+    if changed or added or removed or old_date != trade_date:
+        report["days"] = change["refresh"] = sorted({old_date, trade_date})
+    if report["header"] or report["days"]:
+        # a date change moves the trade between months: both windows go stale
+        change["stale"] = sorted({old_date, trade_date})
+        change["trade_ids"] = [trade_id]
+    return change
+
+
+
+class Journal:
+    def __init__(self, path: str = DEFAULT_DB_PATH, readers: int = READ_POOL_SIZE) -> None:
+        self.path = path
+        self.pool = ConnectionPool(path, readers)
+        try:
+            self.migrations_applied = init_db(self.pool)
+        except BaseException:
+            self.pool.close()
+            raise
+        self.versions = DataVersions()
+        self.cache = VersionedCache()
+        self.watch = ChangeWatch(self.pool.data_version)
+        self.writer: Optional[WriteQueue] = None
+        self._writer_lock = threading.Lock()
+
+    def read(self) -> ContextManager[sqlite3.Connection]:
+        return self.pool.read()
+
+    def write(self) -> ContextManager[sqlite3.Connection]:
+        return self.pool.write()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.pool.close()
+
+    # =========================
+    # Cache invalidation
+    # =========================
+    def invalidate(self, days: Iterable[str] = (), trade_ids: Iterable[int] = ()) -> None:
+        self.versions.bump(months=[d[:7] for d in days if d], trade_ids=trade_ids)
+
+    def clear_cache(self) -> None:
+        self.versions.bump(everything=True)
+        self.cache.clear()
+
+    def sync(self) -> bool:
+        # once per rerun / request: another process wrote since the last check -> drop every cached read
+        if self.watch.changed():
+            self.clear_cache()
+            return True
+        return False
+
+    # =========================
+    # Cached readers
+    # =========================
+    def fetch_trades(self) -> List[dict]:
+        def load() -> List[dict]:
+            with self.read() as conn:
+                return _fetch_dicts(conn, "SELECT * FROM trades WHERE deleted_at IS NULL ORDER BY trade_date DESC, id DESC")
+
+        return self.cache.get("fetch_trades", (), self.versions.everything(), load, max_entries=1)
+
+    def fetch_trades_between(self, start: str, end: str) -> List[dict]:
+        def load() -> List[dict]:
+            with self.read() as conn:
+                return _fetch_dicts(
+                    conn,
+                    """
+                    SELECT * FROM trades
+                    WHERE deleted_at IS NULL AND trade_date BETWEEN ? AND ?
+                    ORDER BY trade_date DESC, id DESC
+                    """,
+                    (start, end),
+                )
+
+        return self.cache.get("fetch_trades_between", (start, end), self.versions.between(start, end), load)
+
+    def trade_page(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbols: Iterable[str] = (),
+        direction: Optional[str] = None,
+        locked: Optional[bool] = None,
+        sign: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
+        limit: int = PAGE_SIZE,
+    ) -> dict:
+        # -> {"rows": [trade + "total"], "next": (trade_date, id) to pass as `after`, or None on the last page}
+        symbols = tuple(sorted(symbols))
+        where = []
+        params: Dict[str, object] = {"limit": limit + 1}
+        if start:
+            where.append("t.trade_date >= :start")
+            params["start"] = start
+        if end:
+            where.append("t.trade_date <= :end")
+            params["end"] = end
+        if symbols:
+            where.append("t.symbol IN (SELECT value FROM json_each(:symbols))")
+            params["symbols"] = json.dumps(symbols)
+        if direction:
+            where.append("t.direction = :direction")
+            params["direction"] = direction
+        if locked is not None:
+            where.append("t.locked_at IS NOT NULL" if locked else "t.locked_at IS NULL")
+        if after:
+            where.append("(t.trade_date, t.id) < (:after_date, :after_id)")
+            params["after_date"], params["after_id"] = after
+        sql = TRADE_PAGE_SQL.format(where="".join(f" AND {w}" for w in where), having=PAGE_SIGNS.get(sign or "", ""))
+
+        def load() -> dict:
+            with self.read() as conn:
+                rows = _fetch_dicts(conn, sql, params)
+            more = len(rows) > limit
+            rows = rows[:limit]
+            return {"rows": rows, "next": (rows[-1]["trade_date"], rows[-1]["id"]) if more else None}
+
+        version = self.versions.between(start, end) if start and end else self.versions.everything()
+        key = (start, end, symbols, direction, locked, sign, after, limit)
+        return self.cache.get("trade_page", key, version, load)
+
+    def get_trade(self, trade_id: int) -> Optional[dict]:
+        def load() -> Optional[dict]:
+            with self.read() as conn:
+                rows = _fetch_dicts(conn, "SELECT * FROM trades WHERE id = ? AND deleted_at IS NULL", (trade_id,))
+            return rows[0] if rows else None
+
+        return self.cache.get("get_trade", (trade_id,), self.versions.trade(trade_id), load, TRADE_CACHE_ENTRIES)
+
+    def symbols(self) -> List[str]:
+        def load() -> List[str]:
+            with self.read() as conn:
+                return [r[0] for r in _fetch(conn, "SELECT DISTINCT symbol FROM trades WHERE deleted_at IS NULL ORDER BY symbol")]
+
+        return self.cache.get("symbols", (), self.versions.everything(), load, max_entries=1)
+
+    def fetch_month(self, year: int, month: int) -> List[dict]:
+        return self.fetch_trades_between(*month_bounds(month_key(year, month)))
+
+    def entries_for(self, trade_ids: Iterable[int]) -> Dict[str, Dict]:
+        # entries and totals of any number of trades in one query (see _group_entries for the shape)
+        ids = tuple(sorted({int(t) for t in trade_ids}))
+
+        def load() -> Dict[str, Dict]:
+            with self.read() as conn:
+                rows = _fetch(conn, ENTRIES_SQL.format(where="t.id IN (SELECT value FROM json_each(?))"), (json.dumps(ids),))
+            return _group_entries(rows, ids)
+
+        return self.cache.get("entries_for", ids, self.versions.trade_set(ids), load, TRADE_CACHE_ENTRIES)
+
+    def entries_between(self, start: str, end: str) -> Dict[str, Dict]:
+        # entries and totals of every live trade in a day / month / range, in one query
+        def load() -> Dict[str, Dict]:
+            with self.read() as conn:
+                rows = _fetch(conn, ENTRIES_SQL.format(where="t.deleted_at IS NULL AND t.trade_date BETWEEN ? AND ?"), (start, end))
+            return _group_entries(rows)
+
+        return self.cache.get("entries_between", (start, end), self.versions.between(start, end), load)
+
+    def fetch_entries(self, trade_id: int) -> List[dict]:
+        return self.entries_for([trade_id])["entries"][trade_id]
+
+    def trade_total(self, trade_id: int) -> int:
+        return self.entries_for([trade_id])["totals"][trade_id]
+
+    def fetch_daily_pnl(self, month: str) -> Dict[str, Dict[str, int]]:
+        def load() -> Dict[str, Dict[str, int]]:
+            with self.read() as conn:
+                rows = _fetch(
+                    conn,
+                    """
+                    SELECT trade_date, trades, profit_cents, loss_cents, net_cents
+                    FROM daily_pnl
+                    WHERE trade_date BETWEEN ? AND ?
+                    """,
+                    month_bounds(month),
+                )
+            return {r[0]: _bucket_from_row(r[1:]) for r in rows}
+
+        return self.cache.get("fetch_daily_pnl", (month,), self.versions.month(month), load)
+
+    def fetch_monthly_pnl(self, month: str) -> Dict[str, int]:
+        def load() -> Dict[str, int]:
+            with self.read() as conn:
+                rows = _fetch(conn, "SELECT trades, profit_cents, loss_cents, net_cents FROM monthly_pnl WHERE month = ?", (month,))
+            return _bucket_from_row(rows[0]) if rows else empty_bucket()
+
+        return self.cache.get("fetch_monthly_pnl", (month,), self.versions.month(month), load)
+
+    def analytics_report(self, start: str, end: str) -> dict:
+        def load() -> dict:
+            # pandas is only imported by the views that need it
+            import pandas as pd
+
+            from sk import analytics
+
+            with self.read() as conn:
+                frame = pd.read_sql_query(TRADE_FRAME_SQL, conn, params=(start, end))
+            instrument.add_rows(len(frame))
+            return {
+                "trades": frame,
+                "metrics": analytics.performance_metrics(frame),
+                "equity": analytics.equity_curve(frame),
+            }
+
+        return self.cache.get("analytics_report", (start, end), self.versions.between(start, end), load)
+
+    def symbol_breakdown(self, start: str, end: str, sort: str = "net", descending: bool = False) -> List[dict]:
+        # one row per symbol x direction; default order puts the biggest losers first
+        if sort not in BREAKDOWN_SORTS:
+            raise ValueError(f"sort must be one of {', '.join(BREAKDOWN_SORTS)}")
+
+        def load() -> List[dict]:
+            with self.read() as conn:
+                rows = _fetch_dicts(conn, SYMBOL_BREAKDOWN_SQL, (start, end))
+            return [_breakdown_row(r) for r in rows]
+
+        # cached once per range; every sort order is served from the same rows
+        rows = self.cache.get("symbol_breakdown", (start, end), self.versions.between(start, end), load)
+        ranked = sorted((r for r in rows if r[sort] is not None), key=lambda r: (r[sort], r["symbol"], r["direction"]), reverse=descending)
+        return ranked + [r for r in rows if r[sort] is None]
+
+    def memo(self, name: str, args: tuple, version: tuple, compute, max_entries: int = MONTH_CACHE_ENTRIES):
+        # lets a front end cache its own derived views (e.g. rendered HTML) under the journal's versions
+        return self.cache.get(name, args, version, compute, max_entries)
+
+    # =========================
+    # Month / day views
+    # =========================
+    def build_daily_map(self, month: str) -> Dict[str, Dict[str, int]]:
+        daily = self.fetch_daily_pnl(month)
+        return {d: {"pnl": v["net"], "trades": v["trades"]} for d, v in daily.items()}
+
+    def month_stats(self, month: str) -> Tuple[int, int, int, int]:
+        v = self.fetch_monthly_pnl(month)
+        return int(v["trades"]), v["profit"], v["loss"], v["net"]
+
+    def year_summary(self, year: int) -> dict:
+        # One daily_pnl range read for the whole year -> heatmap days, 12 month buckets with the
+        # month-over-month change in net, and year totals.
+        start, end = year_window(year)
+
+        def load() -> dict:
+            with self.read() as conn:
+                rows = _fetch(
+                    conn,
+                    """
+                    SELECT trade_date, trades, profit_cents, loss_cents, net_cents
+                    FROM daily_pnl
+                    WHERE trade_date BETWEEN ? AND ?
+                    ORDER BY trade_date
+                    """,
+                    (start, end),
+                )
+
+            prev_dec = month_key(year - 1, 12)
+            buckets = {prev_dec: empty_bucket(), **{month_key(year, m): empty_bucket() for m in range(1, 13)}}
+            days: Dict[str, Dict[str, int]] = {}
+            for r in rows:
+                day = _bucket_from_row(r[1:])
+                month = buckets[r[0][:7]]
+                for k in month:
+                    month[k] += day[k]
+                if r[0][:7] != prev_dec:
+                    days[r[0]] = day
+
+            prev_net = buckets.pop(prev_dec)["net"]
+            months = []
+            for month, b in buckets.items():
+                months.append({"month": month, **b, "mom": b["net"] - prev_net})
+                prev_net = b["net"]
+            totals = empty_bucket()
+            for b in buckets.values():
+                for k in totals:
+                    totals[k] += b[k]
+            return {"year": year, "days": days, "months": months, "totals": totals}
+
+        return self.cache.get("year_summary", (year,), self.versions.between(start, end), load)
+
+    def day_details(self, day_str: str) -> dict:
+        # the month window is cached, so opening several days of one month costs one query;
+        # every entry of the day (and the per-trade totals) comes from one more
+        day_obj = datetime.strptime(day_str, "%Y-%m-%d").date()
+        day_trades = [t for t in self.fetch_month(day_obj.year, day_obj.month) if t["trade_date"] == day_str]
+        batch = self.entries_between(day_str, day_str)
+        return {
+            "trades": day_trades,
+            "totals": batch["totals"],
+            "day": self.fetch_daily_pnl(day_str[:7]).get(day_str) or empty_bucket(),
+            "entries": {t["id"]: batch["entries"].get(t["id"], []) for t in day_trades},
+        }
+
+    # =========================
+    # Writes
+    # =========================
+    # Each write invalidates only the trade it touched and the month(s) that trade was in. Trade
+    # saves are ops (see _insert_trade / _update_trade) run through apply_writes(), directly or
+    # batched by the background writer (sk.writer) when start_writer() was called.
+    def apply_writes(self, ops: List[WriteOp]) -> List[Tuple[object, Optional[Exception]]]:
+        # one transaction for the batch, one SAVEPOINT per op: a failing op rolls back alone and
+        # the rest commit; rollups are refreshed and caches invalidated once for the whole batch
+        results: List[Tuple[object, Optional[Exception]]] = []
+        refresh: set = set()
+        stale: set = set()
+        trade_ids: set = set()
+        with self.write() as conn:
+            cur = conn.cursor()
+            for op in ops:
+                cur.execute("SAVEPOINT op")
+                try:
+                    change = op(cur)
+                except Exception as e:
+                    cur.execute("ROLLBACK TO op")
+                    cur.execute("RELEASE op")
+                    results.append((None, e))
+                    continue
+                cur.execute("RELEASE op")
+                results.append((change["result"], None))
+                refresh.update(change["refresh"])
+                stale.update(change["stale"])
+                trade_ids.update(change["trade_ids"])
+            if refresh:
+                refresh_rollups(cur, sorted(refresh))
+        if stale or trade_ids:
+            self.invalidate(stale, trade_ids)
+        return results
+
+    def _write(self, op: WriteOp):
+        result, error = self.apply_writes([op])[0]
+        if error is not None:
+            raise error
+        return result
+
+    def submit(self, op: WriteOp) -> Future:
+        # queued on the background writer if it runs, else applied now; either way a Future
+        if self.writer is not None:
+            return self.writer.submit(op)
+        future: Future = Future()
+        try:
+            future.set_result(self._write(op))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def start_writer(self) -> WriteQueue:
+        with self._writer_lock:
+            if self.writer is None:
+                self.writer = WriteQueue(self.apply_writes)
+            return self.writer
+
+    @instrument.timed
+    def add_trade(self, trade_date: str, symbol: str, direction: str, base_lot: Optional[float], entry_cents: List[int]) -> int:
+        # waits for the commit (behind saves already queued, if the writer runs)
+        return self.queue_add_trade(trade_date, symbol, direction, base_lot, entry_cents).result()
+
+    def queue_add_trade(self, trade_date: str, symbol: str, direction: str, base_lot: Optional[float], entry_cents: List[int]) -> Future:
+        # -> Future of the new trade id
+        op = partial(_insert_trade, trade_date=trade_date, symbol=symbol, direction=direction, base_lot=base_lot, entry_cents=entry_cents)
+        return self.submit(op)
+
+    @instrument.timed
+    def update_trade(
+        self,
+        trade_id: int,
+        trade_date: str,
+        symbol: str,
+        direction: str,
+        base_lot: Optional[float],
+        entry_cents: List[int],
+    ) -> dict:
+        return self.queue_update_trade(trade_id, trade_date, symbol, direction, base_lot, entry_cents).result()
+
+    def queue_update_trade(
+        self,
+        trade_id: int,
+        trade_date: str,
+        symbol: str,
+        direction: str,
+        base_lot: Optional[float],
+        entry_cents: List[int],
+    ) -> Future:
+        # -> Future of update_trade()'s report
+        op = partial(
+            _update_trade,
+            trade_id=trade_id,
+            trade_date=trade_date,
+            symbol=symbol,
+            direction=direction,
+            base_lot=base_lot,
+            entry_cents=entry_cents,
+        )
+        return self.submit(op)
+
+    # Bulk actions: one UPDATE over the whole id set (passed as a JSON array, so there is no
+    # bound-parameter limit) in one transaction, then one invalidation for the batch.
+    def _bulk_update(self, set_sql: str, where_sql: str, params: dict, trade_ids: Iterable[int], refresh: bool) -> dict:
+        ids = sorted({int(t) for t in trade_ids})
+        if not ids:
+            return {"trades": 0, "days": []}
+        with self.write() as conn:
+            cur = conn.cursor()
+            rows = cur.execute(
+                f"""
+                UPDATE trades SET {set_sql}
+                WHERE id IN (SELECT value FROM json_each(:ids)) AND deleted_at IS NULL {where_sql}
+                RETURNING id, trade_date
+                """,
+                {**params, "ids": json.dumps(ids)},
+            ).fetchall()
+            days = sorted({r[1] for r in rows})
+            if refresh and days:
+                refresh_rollups(cur, days)
+        if rows:
+            self.invalidate(days, [r[0] for r in rows])
+        return {"trades": len(rows), "days": days}
+
+    @instrument.timed
+    def delete_trades(self, trade_ids: Iterable[int]) -> dict:
+        return self._bulk_update("deleted_at = :now", "", {"now": now_iso()}, trade_ids, refresh=True)
+
+    @instrument.timed
+    def lock_trades(self, trade_ids: Iterable[int]) -> dict:
+        return self._bulk_update("locked_at = :now", "AND locked_at IS NULL", {"now": now_iso()}, trade_ids, refresh=False)
+
+    @instrument.timed
+    def unlock_trades(self, trade_ids: Iterable[int]) -> dict:
+        return self._bulk_update("locked_at = NULL", "AND locked_at IS NOT NULL", {}, trade_ids, refresh=False)
+
+    @instrument.timed
+    def set_symbol(self, trade_ids: Iterable[int], symbol: str) -> dict:
+        # locked trades are read-only, as in the single-trade editor
+        symbol = symbol.strip().upper()
+        if not symbol:
+            raise ValueError("symbol must not be blank")
+        return self._bulk_update("symbol = :symbol", "AND locked_at IS NULL AND symbol != :symbol", {"symbol": symbol}, trade_ids, refresh=False)
+
+    def soft_delete_trade(self, trade_id: int) -> dict:
+        return self.delete_trades([trade_id])
+
+    def lock_trade(self, trade_id: int) -> dict:
+        return self.lock_trades([trade_id])
+
+    def unlock_trade(self, trade_id: int) -> dict:
+        return self.unlock_trades([trade_id])
+
+    # =========================
+    # Maintenance
+    # =========================
+    @instrument.timed
+    def rebuild_rollups(self) -> Dict[str, int]:
+        # -> how many day and month rows the rebuilt tables hold
+        with self.write() as conn:
+            cur = conn.cursor()
+            rebuild_rollups(cur)
+            days = cur.execute("SELECT COUNT(*) FROM daily_pnl").fetchone()[0]
+            months = cur.execute("SELECT COUNT(*) FROM monthly_pnl").fetchone()[0]
+        self.clear_cache()
+        return {"days": days, "months": months}
+
+    @instrument.timed
+    def explain_hot_queries(self, runs: int = 5) -> List[dict]:
+        return explain_hot_queries(self.pool, runs)
+
+
+_journals: Dict[str, Journal] = {}
+_journals_lock = threading.Lock()
+
+
+def open_journal(path: str = DEFAULT_DB_PATH) -> Journal:
+    # one Journal (pool + caches) per database file, shared by every caller in the process
+    key = os.path.abspath(path)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = _journals[key] = Journal(path)
+        return journal
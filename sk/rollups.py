@@ -0,0 +1,91 @@
+"""
+SK P/L rollups: daily_pnl / monthly_pnl tables (integer cents) kept current by every write,
+plus the month key helpers shared by the readers and the cache versions.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import List, Optional, Tuple
+
+# Ranges wider than this many months are versioned by the global data counter instead.
+MAX_RANGE_MONTHS = 36
+
+# Per-trade totals for live trades; callers append extra WHERE conditions.
+TRADE_TOTALS_SQL = """
+    SELECT t.id AS trade_id, t.trade_date AS trade_date, COALESCE(SUM(e.pnl_cents), 0) AS total
+    FROM trades t
+    LEFT JOIN trade_entries e ON e.trade_id = t.id
+    WHERE t.deleted_at IS NULL {where}
+    GROUP BY t.id
+"""
+
+DAILY_ROLLUP_SQL = """
+    INSERT INTO daily_pnl (trade_date, trades, profit_cents, loss_cents, net_cents)
+    SELECT
+        trade_date,
+        COUNT(*),
+        SUM(CASE WHEN total > 0 THEN total ELSE 0 END),
+        SUM(CASE WHEN total < 0 THEN total ELSE 0 END),
+        SUM(total)
+    FROM ({totals})
+    GROUP BY trade_date
+"""
+
+MONTHLY_ROLLUP_SQL = """
+    INSERT INTO monthly_pnl (month, trades, profit_cents, loss_cents, net_cents)
+    SELECT substr(trade_date, 1, 7), SUM(trades), SUM(profit_cents), SUM(loss_cents), SUM(net_cents)
+    FROM daily_pnl
+    {where}
+    GROUP BY substr(trade_date, 1, 7)
+"""
+
+
+def month_key(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+def month_bounds(month: str) -> Tuple[str, str]:
+    return f"{month}-01", f"{month}-31"
+
+
+def year_window(year: int) -> Tuple[str, str]:
+    # a year plus the December before it (January's month-over-month change needs it)
+    return f"{year - 1}-12-01", f"{year}-12-31"
+
+
+def months_between(start: str, end: str) -> Optional[List[str]]:
+    y, m = int(start[:4]), int(start[5:7])
+    end_y, end_m = int(end[:4]), int(end[5:7])
+    if (end_y - y) * 12 + (end_m - m) >= MAX_RANGE_MONTHS:
+        return None
+    months = []
+    while (y, m) <= (end_y, end_m):
+        months.append(month_key(y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+def refresh_rollups(cur: sqlite3.Cursor, days: List[str]) -> None:
+    # recompute the given days and their months inside the caller's write transaction
+    days = sorted(set(days))
+    months = sorted({d[:7] for d in days})
+
+    cur.executemany("DELETE FROM daily_pnl WHERE trade_date = ?", [(d,) for d in days])
+    cur.executemany(
+        DAILY_ROLLUP_SQL.format(totals=TRADE_TOTALS_SQL.format(where="AND t.trade_date = ?")),
+        [(d,) for d in days],
+    )
+
+    cur.executemany("DELETE FROM monthly_pnl WHERE month = ?", [(m,) for m in months])
+    cur.executemany(
+        MONTHLY_ROLLUP_SQL.format(where="WHERE trade_date BETWEEN ? AND ?"),
+        [month_bounds(m) for m in months],
+    )
+
+
+def rebuild_rollups(cur: sqlite3.Cursor) -> None:
+    cur.execute("DELETE FROM daily_pnl")
+    cur.execute("DELETE FROM monthly_pnl")
+    cur.execute(DAILY_ROLLUP_SQL.format(totals=TRADE_TOTALS_SQL.format(where="")))
+    cur.execute(MONTHLY_ROLLUP_SQL.format(where=""))
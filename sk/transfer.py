@@ -0,0 +1,480 @@
+"""
+SK transfer: bulk import of CSV / MT4 / MT5 history and streaming CSV / Parquet export.
+"""
+
+from __future__ import annotations
+
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import sqlite3
+import time
+from datetime import datetime
+from decimal import InvalidOperation
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sk import instrument
+from sk.db import now_iso
+from sk.fmt import MONEY_SCALE, from_cents, to_cents
+from sk.journal import Journal
+from sk.rollups import refresh_rollups
+
+
+# =========================
+# Bulk import (CSV / MT4 / MT5 history)
+# =========================
+# Rows are streamed in chunks; each chunk is deduplicated against trade_entries.source_ref and
+# written in the same write transaction. Rows sharing (date, symbol, direction) become the
+# entries of one trade.
+IMPORT_CHUNK_ROWS = 5000
+IMPORT_MAX_ERRORS = 20
+
+# Field -> accepted header names, normalised to lower-case letters/digits ("Close Time" -> "closetime").
+# Every column matching a "direction" name is kept: MT5 deal reports have both Type (buy / sell)
+# and Direction (in / out), and each row is read by value (see _deal_side).
+IMPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "ticket": ("ticket", "deal", "position", "order", "traderef"),
+    "trade_date": ("closetime", "tradedate", "date", "time"),
+    "symbol": ("symbol", "item", "instrument"),
+    "direction": ("direction", "type", "side"),
+    "base_lot": ("baselot", "volume", "size", "lots", "lot"),
+    "pnl": ("entrypnl", "profit", "pnl"),
+    "commission": ("commission",),
+    "fee": ("fee", "fees"),
+    "swap": ("swap",),
+    "taxes": ("taxes",),
+}
+IMPORT_REQUIRED = ("trade_date", "symbol", "direction", "pnl")
+IMPORT_COST_FIELDS = ("pnl", "commission", "fee", "swap", "taxes")
+
+# Trade side values, matched exactly: MT4 pending orders ("buy limit", "sell stop") are not trades.
+DEAL_SIDES = ("buy", "sell")
+# MT5 deal entry values: an "in" deal opens a position, the others close (part of) one.
+DEAL_OPEN = "in"
+DEAL_CLOSE = ("out", "inout", "outby")
+
+
+def _norm_header(name: str) -> str:
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def _map_import_header(header: List[str]) -> Optional[Dict[str, Tuple[int, ...]]]:
+    # field -> its column; several for "direction"
+    names = [_norm_header(h) for h in header]
+    cols: Dict[str, Tuple[int, ...]] = {}
+    for field, aliases in IMPORT_COLUMNS.items():
+        if field == "direction":
+            idx = tuple(i for alias in aliases for i, n in enumerate(names) if n == alias)
+            if idx:
+                cols[field] = idx
+            continue
+        for alias in aliases:
+            # MT exports repeat "Time"/"Price" for open and close; the last one is the close
+            idx = [i for i, n in enumerate(names) if n == alias]
+            if idx:
+                cols[field] = (idx[-1],)
+                break
+    if any(f not in cols for f in IMPORT_REQUIRED):
+        return None
+    return cols
+
+
+def _number_text(text: str) -> str:
+    # "1 234,50" / "1,234.50" / "1234.5" -> "1234.50"-style text; "" for an empty cell
+    t = (text or "").strip().replace(" ", "").replace("\u00a0", "")
+    if "," in t and "." in t:
+        t = t.replace(",", "")
+    elif "," in t:
+        t = t.replace(",", ".")
+    return t
+
+
+def _parse_number(text: str) -> float:
+    t = _number_text(text)
+    return float(t) if t else 0.0
+
+
+def _parse_cents(text: str) -> int:
+    t = _number_text(text)
+    if not t:
+        return 0
+    try:
+        return to_cents(t)
+    except InvalidOperation:
+        raise ValueError(f"could not convert string to money: {text!r}") from None
+
+
+@functools.lru_cache(maxsize=8192)
+def _normalise_day(day: str) -> str:
+    # statements repeat the same few hundred days; strptime is the slowest step per row
+    return datetime.strptime(day.replace(".", "-").replace("/", "-"), "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+def _parse_trade_date(text: str) -> str:
+    return _normalise_day((text or "").strip()[:10])
+
+
+def _deal_side(row: List[str], idx: Tuple[int, ...]) -> Optional[str]:
+    # "Buy" / "Sell" of the position a row belongs to; None for non-trade rows and opening deals
+    side = entry = ""
+    for i in idx:
+        value = _norm_header(row[i]) if i < len(row) else ""
+        if not side and value in DEAL_SIDES:
+            side = value
+        elif not entry and value in (DEAL_OPEN,) + DEAL_CLOSE:
+            entry = value
+    if not side or entry == DEAL_OPEN:
+        return None  # balance / credit / deposit lines; MT5 "in" deals (their P/L comes with the "out")
+    direction = "Buy" if side == "buy" else "Sell"
+    if entry:
+        # a closing deal trades against its position: a sell "out" closes a Buy
+        direction = "Sell" if direction == "Buy" else "Buy"
+    return direction
+
+
+def _parse_import_row(row: List[str], cols: Dict[str, Tuple[int, ...]]) -> Optional[tuple]:
+    def cell(field: str) -> str:
+        i = cols[field][0] if field in cols else None
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    direction = _deal_side(row, cols["direction"])
+    if direction is None:
+        return None
+
+    trade_date = _parse_trade_date(cell("trade_date"))
+    symbol = cell("symbol").upper()
+    if not symbol:
+        raise ValueError("missing symbol")
+    lot_txt = cell("base_lot")
+    base_lot = _parse_number(lot_txt) if lot_txt else None
+    pnl_cents = sum(_parse_cents(cell(f)) for f in IMPORT_COST_FIELDS)
+
+    ticket = cell("ticket")
+    ref = f"ticket:{ticket}" if ticket else None
+    return ref, trade_date, symbol, direction, base_lot, pnl_cents
+
+
+def _iter_csv(source) -> Iterator[List[str]]:
+    # source: a path or a binary file object (an upload, sys.stdin.buffer); read lazily, never all at
+    # once, and never seeked, so a pipe works too: the BOM is peeked and the sniffed sample re-chained
+    raw = open(source, "rb") if isinstance(source, str) else source
+    buffered = raw if isinstance(raw, io.BufferedReader) else io.BufferedReader(raw)
+    head = buffered.peek(2)[:2]
+    encoding = "utf-16" if head in (b"\xff\xfe", b"\xfe\xff") else "utf-8-sig"
+    text = io.TextIOWrapper(buffered, encoding=encoding, newline="")
+    try:
+        sample = text.read(8192)
+        if sample and not sample.endswith("\n"):
+            sample += text.readline()  # end the sample on a line break, so no row is split in two
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(itertools.chain(io.StringIO(sample, newline=""), text), dialect)
+    finally:
+        text.detach()
+        if buffered is not raw:
+            buffered.detach()  # leave the caller's file object open
+        if isinstance(source, str):
+            raw.close()
+
+
+def _existing_refs(conn: sqlite3.Connection, refs: List[str]) -> set:
+    found: set = set()
+    for i in range(0, len(refs), 500):
+        part = refs[i : i + 500]
+        marks = ",".join("?" * len(part))
+        found.update(r[0] for r in conn.execute(f"SELECT source_ref FROM trade_entries WHERE source_ref IN ({marks})", part))
+    return found
+
+
+def _fresh_rows(conn: sqlite3.Connection, chunk: List[tuple]) -> List[tuple]:
+    existing = _existing_refs(conn, [r[0] for r in chunk])
+    return [r for r in chunk if r[0] not in existing]
+
+
+def _new_keys(fresh: List[tuple], groups: Dict[Tuple[str, str, str], List]) -> List[Tuple[str, str, str]]:
+    # (date, symbol, direction) groups not seen in an earlier chunk, in file order
+    keys: List[Tuple[str, str, str]] = []
+    for r in fresh:
+        key = (r[1], r[2], r[3])
+        if key not in groups and key not in keys:
+            keys.append(key)
+    return keys
+
+
+@instrument.timed
+def import_trades(journal: Journal, source, dry_run: bool = False, chunk_rows: int = IMPORT_CHUNK_ROWS) -> dict:
+    started = time.perf_counter()
+    summary = {
+        "rows": 0,
+        "trades": 0,
+        "entries": 0,
+        "duplicates": 0,
+        "skipped": 0,
+        "invalid": 0,
+        "errors": [],
+        "first_date": None,
+        "last_date": None,
+        "net_pnl": 0,  # cents
+        "dry_run": dry_run,
+    }
+    rows = _iter_csv(source)
+    cols = None
+    for header in rows:
+        summary["rows"] += 1
+        cols = _map_import_header(header)
+        if cols is not None:
+            break
+    if cols is None:
+        summary["errors"].append("No header with date, symbol, type/direction and profit/entry_pnl columns found.")
+        return summary
+
+    seen: set = set()
+    occurrences: Dict[str, int] = {}
+    groups: Dict[Tuple[str, str, str], List] = {}  # key -> [trade_id, last entry_no]
+    days: set = set()
+    trade_ids: set = set()
+    line_no = summary["rows"]
+
+    while True:
+        chunk = []
+        for row in rows:
+            line_no += 1
+            summary["rows"] += 1
+            if not any(c.strip() for c in row):
+                continue
+            try:
+                parsed = _parse_import_row(row, cols)
+            except ValueError as e:
+                summary["invalid"] += 1
+                if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+                    summary["errors"].append(f"line {line_no}: {e}")
+                continue
+            if parsed is None:
+                summary["skipped"] += 1
+                continue
+            ref = parsed[0]
+            if ref is None:
+                # no ticket column: identical rows are told apart by their occurrence number in the file;
+                # the P/L is hashed as dollars, as it was before cents, so old fingerprints still match
+                digest = hashlib.sha1("|".join(map(str, parsed[1:5] + (from_cents(parsed[5]),))).encode()).hexdigest()[:20]
+                n = occurrences[digest] = occurrences.get(digest, 0) + 1
+                ref = f"row:{digest}:{n}"
+                parsed = (ref,) + parsed[1:]
+            if ref in seen:
+                summary["duplicates"] += 1
+                continue
+            seen.add(ref)
+            chunk.append(parsed)
+            if len(chunk) >= chunk_rows:
+                break
+        if not chunk:
+            break
+
+        if dry_run:
+            with journal.read() as conn:
+                fresh = _fresh_rows(conn, chunk)
+            summary["duplicates"] += len(chunk) - len(fresh)
+            for key in _new_keys(fresh, groups):
+                groups[key] = [None, 0]
+                summary["trades"] += 1
+            summary["entries"] += len(fresh)
+        else:
+            with journal.write() as conn:
+                # deduplicated under the write lock: an import running in another process cannot
+                # add the same refs between the check and the insert
+                fresh = _fresh_rows(conn, chunk)
+                summary["duplicates"] += len(chunk) - len(fresh)
+                if not fresh:
+                    continue
+                cur = conn.cursor()
+                new_keys = _new_keys(fresh, groups)
+                last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0]
+                if new_keys:
+                    # we hold the write lock, so the new AUTOINCREMENT ids are exactly those above last_id, in order
+                    lots = {}
+                    for r in fresh:
+                        lots.setdefault((r[1], r[2], r[3]), r[4])
+                    created = now_iso()
+                    cur.executemany(
+                        """
+                        INSERT INTO trades (trade_date, symbol, direction, base_lot, created_at, locked_at, deleted_at)
+                        VALUES (?, ?, ?, ?, ?, NULL, NULL)
+                        """,
+                        [(k[0], k[1], k[2], lots[k], created) for k in new_keys],
+                    )
+                    ids = [r[0] for r in cur.execute("SELECT id FROM trades WHERE id > ? ORDER BY id", (last_id,))]
+                    for key, tid in zip(new_keys, ids):
+                        groups[key] = [tid, 0]
+
+                entries = []
+                for r in fresh:
+                    g = groups[(r[1], r[2], r[3])]
+                    g[1] += 1
+                    entries.append((g[0], g[1], r[5], r[0]))
+                last_entry = cur.execute("SELECT COALESCE(MAX(id), 0) FROM trade_entries").fetchone()[0]
+                cur.executemany(
+                    """
+                    INSERT OR IGNORE INTO trade_entries (trade_id, entry_no, pnl_cents, source_ref)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    entries,
+                )
+                inserted = cur.rowcount
+                if inserted < len(entries):
+                    # some refs were ignored after all: count only the entries that landed, and
+                    # drop the trades created here that got none
+                    landed = {r[0] for r in cur.execute("SELECT source_ref FROM trade_entries WHERE id > ?", (last_entry,))}
+                    summary["duplicates"] += len(entries) - inserted
+                    fresh = [r for r in fresh if r[0] in landed]
+                    cur.execute(
+                        "DELETE FROM trades WHERE id > ? AND NOT EXISTS (SELECT 1 FROM trade_entries e WHERE e.trade_id = trades.id)",
+                        (last_id,),
+                    )
+                    kept = {r[0] for r in cur.execute("SELECT id FROM trades WHERE id > ?", (last_id,))}
+                    for key in [k for k in new_keys if groups[k][0] not in kept]:
+                        del groups[key]
+                        new_keys.remove(key)
+                refresh_rollups(cur, list({r[1] for r in fresh}))
+            trade_ids.update(e[0] for e in entries)
+            summary["trades"] += len(new_keys)
+            summary["entries"] += inserted
+
+        summary["net_pnl"] += sum(r[5] for r in fresh)
+        for r in fresh:
+            days.add(r[1])
+
+    if summary["skipped"] and not summary["entries"] and not summary["duplicates"]:
+        summary["errors"].append(
+            f"None of the {summary['skipped']} data rows is a closed buy / sell trade; check the type / direction column."
+        )
+    if days:
+        summary["first_date"], summary["last_date"] = min(days), max(days)
+    if not dry_run and days:
+        journal.invalidate(days, trade_ids)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+# =========================
+# Export (CSV / Parquet)
+# =========================
+# Trades joined with their entries, one row per entry, streamed with fetchmany so memory stays
+# at one chunk however large the journal is. entry_pnl is exported in dollars: cents / 100 is the
+# double nearest the exact 2-decimal value, so CSV shows exactly that value.
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_COLUMNS = [
+    "trade_id",
+    "trade_date",
+    "symbol",
+    "direction",
+    "base_lot",
+    "created_at",
+    "locked_at",
+    "deleted_at",
+    "entry_no",
+    "entry_pnl",
+]
+
+
+def iter_export_chunks(
+    journal: Journal,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    symbol: Optional[str] = None,
+    include_deleted: bool = False,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[List[tuple]]:
+    where = ["1 = 1"]
+    params: List = []
+    if not include_deleted:
+        where.append("t.deleted_at IS NULL")
+    if start:
+        where.append("t.trade_date >= ?")
+        params.append(start)
+    if end:
+        where.append("t.trade_date <= ?")
+        params.append(end)
+    if symbol:
+        where.append("t.symbol = ?")
+        params.append(symbol.strip().upper())
+
+    sql = f"""
+        SELECT t.id, t.trade_date, t.symbol, t.direction, t.base_lot,
+               t.created_at, t.locked_at, t.deleted_at, e.entry_no, e.pnl_cents * 1.0 / {MONEY_SCALE}
+        FROM trades t
+        LEFT JOIN trade_entries e ON e.trade_id = t.id
+        WHERE {" AND ".join(where)}
+        ORDER BY t.trade_date, t.id, e.entry_no
+    """
+    with journal.read() as conn:
+        cur = conn.execute(sql, params)
+        try:
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+
+
+def _export_parquet_schema():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).") from e
+    return pa.schema(
+        [
+            ("trade_id", pa.int64()),
+            ("trade_date", pa.string()),
+            ("symbol", pa.string()),
+            ("direction", pa.string()),
+            ("base_lot", pa.float64()),
+            ("created_at", pa.string()),
+            ("locked_at", pa.string()),
+            ("deleted_at", pa.string()),
+            ("entry_no", pa.int64()),
+            ("entry_pnl", pa.float64()),
+        ]
+    )
+
+
+@instrument.timed
+def export_trades(journal: Journal, dest, fmt: str = "csv", **filters) -> dict:
+    # dest: a path or a binary file object; filters go to iter_export_chunks
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}.")
+    started = time.perf_counter()
+    rows = 0
+
+    if fmt == "parquet":
+        schema = _export_parquet_schema()
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(dest, schema) as writer:
+            for chunk in iter_export_chunks(journal, **filters):
+                columns = list(zip(*chunk))
+                writer.write_batch(pa.RecordBatch.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+                rows += len(chunk)
+    else:
+        raw = open(dest, "wb") if isinstance(dest, str) else dest
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        try:
+            w = csv.writer(text)
+            w.writerow(EXPORT_COLUMNS)
+            for chunk in iter_export_chunks(journal, **filters):
+                w.writerows(chunk)
+                rows += len(chunk)
+            text.flush()
+        finally:
+            text.detach()
+            if isinstance(dest, str):
+                raw.close()
+
+    return {"rows": rows, "format": fmt, "seconds": round(time.perf_counter() - started, 3)}
@@ -0,0 +1,93 @@
+"""
+SK write queue: one background thread per Journal that applies queued writes in batched transactions.
+
+Off unless Journal.start_writer() is called (the dashboard does when $SK_WRITE_QUEUE is set).
+Writes from every session go into one queue; the thread takes the first one plus whatever
+arrives within WRITE_BATCH_WINDOW_S (up to WRITE_BATCH_MAX) and hands the batch to the
+journal, which applies it in a single transaction. submit() returns a Future that resolves
+after the commit -- with the write's result, or with the exception that kept it out.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+WRITE_BATCH_MAX = 64
+WRITE_BATCH_WINDOW_S = 0.005
+
+# an op runs inside the batch transaction; apply(ops) returns one (result, error) per op, in order
+WriteOp = Callable[..., Any]
+ApplyBatch = Callable[[List[WriteOp]], List[Tuple[Any, Optional[Exception]]]]
+
+
+class WriteQueue:
+    def __init__(self, apply: ApplyBatch, batch_max: int = WRITE_BATCH_MAX) -> None:
+        self._apply = apply
+        self._batch_max = batch_max
+        self._queue: "queue.Queue[Optional[Tuple[WriteOp, Future]]]" = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name="sk-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: WriteOp) -> Future:
+        if self._closed:
+            raise RuntimeError("write queue is closed")
+        future: Future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        # writes already queued are still applied before the thread exits
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            stop = False
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW_S
+            while len(batch) < self._batch_max:
+                try:
+                    job = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[Tuple[WriteOp, Future]]) -> None:
+        live = [(op, future) for op, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        try:
+            results = self._apply([op for op, _ in live])
+        except Exception as e:
+            # the whole transaction rolled back (e.g. DatabaseBusy): nothing in the batch was written
+            for _, future in live:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.writes += len(live)
+        for (_, future), (result, error) in zip(live, results):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
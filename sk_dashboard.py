@@ -14,20 +14,58 @@ Add Trade:
 Manage Trades:
 - Edit / Lock / Delete
 
+Analytics:
+- Equity curve, drawdown, win rate, profit factor, expectancy, streaks over any date range
+
 Data stored in trades.db (rewriting code will NOT remove your trades).
+Storage, stats and import/export live in the `sk` package (also `python -m sk`); this file is the UI.
 """
 
 from __future__ import annotations
 
+import os
+import secrets
 import sqlite3
+import tempfile
+import weakref
 import calendar as pycal
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple
+from functools import partial
+from typing import Dict, Iterator, List, Optional
 
-import pandas as pd
 import streamlit as st
 
-DB_PATH = "trades.db"
+from sk import (
+    DEFAULT_ACCOUNT,
+    DatabaseBusy,
+    Journal,
+    create_account,
+    MONEY_SCALE,
+    SchemaUpgradeError,
+    format_cents,
+    from_cents,
+    instrument,
+    list_accounts,
+    month_key,
+    open_account,
+    pnl_class,
+    ratio_text,
+    safe_float,
+    to_cents,
+)
+from sk.accounts import account_path
+from sk.api import API_HOST, make_server, start_in_thread
+from sk.archive import ARCHIVE_RETENTION_DAYS, compact, deleted_trades, restore_trades
+from sk.backup import backup, list_snapshots, restore_snapshot, schedule_backups
+from sk.rollups import year_window
+from sk.transfer import EXPORT_FORMATS, export_trades, import_trades
+
+PERF_LOG = os.environ.get("SK_PERF_LOG")  # JSONL file, one line per rerun
+WRITE_QUEUE = os.environ.get("SK_WRITE_QUEUE") == "1"  # saves go through the background writer (sk.writer)
+BACKUP_HOURS = float(os.environ.get("SK_BACKUP_HOURS") or 0)  # > 0: a snapshot of each open account this often (sk.backup)
+API_PORT = int(os.environ.get("SK_API_PORT") or 0)  # > 0: serve the read-only JSON API from this process (sk.api)
 APP_SHORT_NAME = "SK"
 APP_TITLE = "SK Capitalz Trading"
 APP_TAGLINE = "No Emotions, Just Charts"
@@ -120,17 +158,57 @@ header {visibility: hidden;}
   font-weight: 900;
 }
 
-.cal-btn > button{
-  width: 100%;
-  border-radius: 16px !important;
-  padding: 0px !important;
-  min-height: 112px !important;
-  background: transparent !important;
-  border: none !important;
+.cal-link{
+  display: block;
+  color: inherit !important;
+  text-decoration: none !important;
+  cursor: pointer;
 }
 
-.cal-btn > button:hover{filter: brightness(1.06);}
-.cal-btn > button:active{transform: scale(0.995);}
+.cal-link:hover .cal-card{filter: brightness(1.06);}
+.cal-link:active .cal-card{transform: scale(0.995);}
+
+.ym-strip{
+  display: grid;
+  grid-template-columns: repeat(auto-fill, minmax(108px, 1fr));
+  gap: 10px;
+  margin-bottom: 18px;
+}
+.ym-card{
+  border-radius: 14px;
+  border: 1px solid rgba(255,255,255,0.10);
+  background: rgba(255,255,255,0.02);
+  padding: 10px;
+}
+.ym-month{font-size: 12px; opacity: 0.72; font-weight: 900; letter-spacing: 0.4px;}
+.ym-net{font-size: 15px; font-weight: 980; margin-top: 4px; white-space: nowrap;}
+.ym-sub{font-size: 11px; opacity: 0.62; font-weight: 850; margin-top: 2px;}
+.ym-mom{font-size: 11px; font-weight: 900; margin-top: 4px; white-space: nowrap;}
+
+.hm-wrap{overflow-x: auto; padding-bottom: 6px;}
+.hm-months{position: relative; height: 16px; font-size: 11px; opacity: 0.7; font-weight: 850;}
+.hm-months span{position: absolute; top: 0;}
+.hm-grid{
+  display: grid;
+  grid-template-rows: repeat(7, 13px);
+  grid-auto-flow: column;
+  grid-auto-columns: 13px;
+  gap: 3px;
+}
+.hm-cell{display: block; width: 13px; height: 13px; border-radius: 3px; background: rgba(255,255,255,0.05);}
+.hm-pad{background: transparent;}
+.hm-n{background: rgba(255,255,255,0.22);}
+.hm-g1{background: rgba(0,255,140,0.22);}
+.hm-g2{background: rgba(0,255,140,0.42);}
+.hm-g3{background: rgba(0,255,140,0.64);}
+.hm-g4{background: rgba(0,255,140,0.88);}
+.hm-r1{background: rgba(255,80,80,0.24);}
+.hm-r2{background: rgba(255,80,80,0.44);}
+.hm-r3{background: rgba(255,80,80,0.66);}
+.hm-r4{background: rgba(255,80,80,0.90);}
+.hm-today{outline: 1px solid rgba(212,175,55,0.85); outline-offset: 1px;}
+a.hm-cell:hover{filter: brightness(1.25);}
+.hm-legend{display: flex; gap: 3px; align-items: center; font-size: 11px; opacity: 0.7; font-weight: 850; margin-top: 8px;}
 
 .modal-wrap{
   padding: 6px 2px 2px 2px;
@@ -211,235 +289,195 @@ st.markdown(
 
 
 # =========================
-# Database
+# Account + Journal (storage + cached stats, see the sk package)
 # =========================
-def get_conn() -> sqlite3.Connection:
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
-
-
-def now_iso() -> str:
-    return datetime.now().isoformat(timespec="seconds")
-
-
-def init_db() -> None:
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS trades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trade_date TEXT NOT NULL,
-            symbol TEXT NOT NULL,
-            direction TEXT NOT NULL,
-            base_lot REAL,
-            created_at TEXT NOT NULL,
-            locked_at TEXT,
-            deleted_at TEXT
-        )
-        """
-    )
-
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS trade_entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trade_id INTEGER NOT NULL,
-            entry_no INTEGER NOT NULL,
-            entry_pnl REAL NOT NULL,
-            FOREIGN KEY(trade_id) REFERENCES trades(id)
-        )
-        """
-    )
-
-    conn.commit()
-    conn.close()
-
-
-def clear_cache() -> None:
-    fetch_trades.clear()
-    fetch_entries.clear()
-    trade_total.clear()
-
-
-@st.cache_data(show_spinner=False)
-def fetch_trades() -> List[dict]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM trades WHERE deleted_at IS NULL ORDER BY trade_date DESC, id DESC")
-    rows = cur.fetchall()
-    cols = [d[0] for d in cur.description]
-    conn.close()
-    return [dict(zip(cols, r)) for r in rows]
-
-
-@st.cache_data(show_spinner=False)
-def fetch_entries(trade_id: int) -> List[dict]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, entry_no, entry_pnl
-        FROM trade_entries
-        WHERE trade_id = ?
-        ORDER BY entry_no ASC
-        """,
-        (trade_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return [{"id": r[0], "entry_no": r[1], "entry_pnl": float(r[2])} for r in rows]
-
-
-@st.cache_data(show_spinner=False)
-def trade_total(trade_id: int) -> float:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT COALESCE(SUM(entry_pnl), 0) FROM trade_entries WHERE trade_id = ?", (trade_id,))
-    total = cur.fetchone()[0]
-    conn.close()
-    return float(total)
-
-
-def add_trade(trade_date: str, symbol: str, direction: str, base_lot: Optional[float], entry_pnls: List[float]) -> None:
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO trades (trade_date, symbol, direction, base_lot, created_at, locked_at, deleted_at)
-        VALUES (?, ?, ?, ?, ?, NULL, NULL)
-        """,
-        (trade_date, symbol, direction, base_lot, now_iso()),
-    )
-    tid = cur.lastrowid
-
-    cur.executemany(
-        """
-        INSERT INTO trade_entries (trade_id, entry_no, entry_pnl)
-        VALUES (?, ?, ?)
-        """,
-        [(tid, i + 1, float(p)) for i, p in enumerate(entry_pnls)],
-    )
-
-    conn.commit()
-    conn.close()
-    clear_cache()
-
-
-def update_trade(
-    trade_id: int,
-    trade_date: str,
-    symbol: str,
-    direction: str,
-    base_lot: Optional[float],
-    entry_pnls: List[float],
-) -> None:
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        UPDATE trades
-        SET trade_date = ?, symbol = ?, direction = ?, base_lot = ?
-        WHERE id = ? AND deleted_at IS NULL
-        """,
-        (trade_date, symbol, direction, base_lot, trade_id),
-    )
-
-    cur.execute("DELETE FROM trade_entries WHERE trade_id = ?", (trade_id,))
-    cur.executemany(
-        """
-        INSERT INTO trade_entries (trade_id, entry_no, entry_pnl)
-        VALUES (?, ?, ?)
-        """,
-        [(trade_id, i + 1, float(p)) for i, p in enumerate(entry_pnls)],
-    )
-
-    conn.commit()
-    conn.close()
-    clear_cache()
-
-
-def soft_delete_trade(trade_id: int) -> None:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE trades SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL", (now_iso(), trade_id))
-    conn.commit()
-    conn.close()
-    clear_cache()
-
+# Every account is its own database file with its own Journal (pool + caches); the choice is per
+# session and kept in the URL (?account=name) so a reload or a day link stays on it.
+ACCOUNT_SCOPED_KEYS = [
+    "flt_symbols",
+    "page_filters",
+    "page_cursors",
+    "open_trade_id",
+    "bulk_result",
+    "import_summary",
+    "compact_report",
+    "restore_result",
+    "backup_report",
+    "export_file",
+]
+
+
+@st.cache_resource(show_spinner=False)
+def get_journal(account: str) -> Journal:
+    journal = open_account(account)
+    if WRITE_QUEUE:
+        journal.start_writer()
+    if BACKUP_HOURS > 0:
+        schedule_backups(journal, BACKUP_HOURS * 3600)
+    return journal
+
+
+@st.cache_resource(show_spinner=False)
+def start_api(port: int) -> str:
+    # once per server process; it opens the same Journals as get_journal(), so caches and ETags follow every save
+    server = make_server(API_HOST, port, quiet=True)
+    start_in_thread(server)
+    return f"http://{API_HOST}:{server.server_address[1]}/api/"
+
+
+if API_PORT > 0:
+    try:
+        start_api(API_PORT)
+    except OSError as e:  # port taken, e.g. by a second dashboard process
+        st.sidebar.warning(f"JSON API not started on port {API_PORT}: {e}")
 
-def lock_trade(trade_id: int) -> None:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE trades SET locked_at = ? WHERE id = ? AND locked_at IS NULL AND deleted_at IS NULL",
-        (now_iso(), trade_id),
-    )
-    conn.commit()
-    conn.close()
-    clear_cache()
 
+@contextmanager
+def write_guard() -> Iterator[None]:
+    # another writer kept the database locked through every retry: report it instead of crashing the run
+    try:
+        yield
+    except DatabaseBusy:
+        st.error("The database is busy with another save, so nothing was written. Try again in a moment.")
+
+
+# Trade saves are optimistic: the click queues the write and reruns at once, the next run
+# announces it, and a failure that shows up once the writer has committed is reported then.
+def track_save(future: Future, label: str) -> None:
+    st.session_state.setdefault("pending_saves", []).append({"label": label, "future": future, "announced": False})
+
+
+def report_saves() -> None:
+    pending = []
+    for save in st.session_state.get("pending_saves", []):
+        future, label = save["future"], save["label"]
+        if future.done() and future.exception() is not None:
+            e = future.exception()
+            reason = "the database stayed busy with another save" if isinstance(e, DatabaseBusy) else str(e)
+            st.error(f"{label} was not saved: {reason}. Please enter it again.")
+            continue
+        if future.done() and isinstance(future.result(), dict) and not future.result()["found"]:
+            st.warning(f"{label} was not saved: it was deleted in the meantime.")
+            continue
+        if future.done() and isinstance(future.result(), dict) and future.result()["locked"]:
+            st.warning(f"{label} was not saved: it was locked in the meantime.")
+            continue
+        if not save["announced"]:
+            st.toast(f"✅ {label} saved")
+            save["announced"] = True
+        if not future.done():
+            pending.append(save)
+    st.session_state.pending_saves = pending
+    if pending:
+        saves_in_flight()
+
+
+@st.fragment(run_every=0.5)
+def saves_in_flight() -> None:
+    # polls until the writer has committed, then reruns the whole page so every view shows the save
+    if all(save["future"].done() for save in st.session_state.get("pending_saves", [])):
+        st.rerun()
+    st.caption("⏳ Saving…")
+
+
+accounts = list_accounts()
+if "pending_account" in st.session_state:
+    st.session_state.account = st.session_state.pop("pending_account")
+if st.session_state.get("account") not in accounts:
+    wanted = st.query_params.get("account", DEFAULT_ACCOUNT)
+    st.session_state.account = wanted if wanted in accounts else DEFAULT_ACCOUNT
+
+with st.sidebar:
+    st.markdown("### Account")
+    account: str = st.selectbox("Account", accounts, key="account", label_visibility="collapsed")
+    with st.expander("➕ New account"):
+        new_account = st.text_input("Name", key="new_account", placeholder="e.g. ftmo-100k")
+        if st.button("Create account", disabled=not new_account.strip(), use_container_width=True):
+            try:
+                create_account(new_account.strip())
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.session_state.pending_account = new_account.strip()
+                st.rerun()
 
-def unlock_trade(trade_id: int) -> None:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE trades SET locked_at = NULL WHERE id = ? AND deleted_at IS NULL", (trade_id,))
-    conn.commit()
-    conn.close()
-    clear_cache()
+if st.session_state.get("account_shown") != account:
+    # filters, cursors and pending results of the previous account mean nothing here
+    for k in ACCOUNT_SCOPED_KEYS:
+        st.session_state.pop(k, None)
+    st.session_state.account_shown = account
+if account == DEFAULT_ACCOUNT:
+    st.query_params.pop("account", None)
+else:
+    st.query_params["account"] = account
+ACCOUNT_QS = "" if account == DEFAULT_ACCOUNT else f"&account={account}"
+
+try:
+    journal = get_journal(account)
+except SchemaUpgradeError as e:
+    st.error(str(e))
+    st.stop()
+# writes by another process (the CLI, a second dashboard) are not in the cache versions
+journal.sync()
+report_saves()
 
 
 # =========================
-# Helpers
+# Instrumentation (sidebar debug panel: ?debug=1 or SK_DEBUG=1)
 # =========================
-def format_money(x: float) -> str:
-    sign = "+" if x > 0 else ""
-    return f"{sign}${x:,.2f}"
+debug_panel = os.environ.get("SK_DEBUG") == "1" or st.query_params.get("debug") == "1"
 
 
-def safe_float(text: str) -> Optional[float]:
-    t = (text or "").strip()
-    if not t:
+def start_perf_run() -> Optional[instrument.RunRecorder]:
+    # a run still open here was cut short by st.rerun() (e.g. a save): log it now
+    prev = st.session_state.pop("perf_run", None)
+    if prev is not None:
+        st.session_state.perf_interrupted = instrument.stop_run(prev, interrupted=True, log_path=PERF_LOG)
+    if not (debug_panel or PERF_LOG):
         return None
-    try:
-        return float(t)
-    except ValueError:
-        return None
-
+    session = st.session_state.setdefault("perf_session", secrets.token_hex(4))
+    st.session_state.perf_runs = st.session_state.get("perf_runs", 0) + 1
+    rec = instrument.start_run(source="dashboard", session=session, run=st.session_state.perf_runs, account=account)
+    st.session_state.perf_run = rec
+    return rec
 
-def build_daily_map(trades: List[dict]) -> Dict[str, Dict[str, float]]:
-    m: Dict[str, Dict[str, float]] = {}
-    for t in trades:
-        d = t["trade_date"]
-        pnl = float(trade_total(t["id"]))
-        if d not in m:
-            m[d] = {"pnl": 0.0, "trades": 0}
-        m[d]["pnl"] += pnl
-        m[d]["trades"] += 1
-    return m
 
+def finish_perf_run(rec: Optional[instrument.RunRecorder]) -> None:
+    if rec is None:
+        return
+    st.session_state.pop("perf_run", None)
+    perf = instrument.stop_run(rec, log_path=PERF_LOG)
+    if not debug_panel:
+        return
 
-def month_stats(trades: List[dict], month_start: date) -> Tuple[int, float, float, float]:
-    prefix = month_start.strftime("%Y-%m-")
-    month_trades = [t for t in trades if t["trade_date"].startswith(prefix)]
-
-    total_trades = len(month_trades)
-    total_profit = 0.0
-    total_loss = 0.0
+    with st.sidebar:
+        st.markdown("### ⏱ Debug")
+        d1, d2 = st.columns(2)
+        d1.metric("Rerun", f"{perf['wall_ms']:.0f} ms")
+        d2.metric("Queries", perf["queries"])
+        d1.metric("Rows", perf["rows"])
+        d2.metric("Cache hit / miss", f"{perf['cache_hits']} / {perf['cache_misses']}")
+        st.caption("Stages (nested stages are indented)")
+        st.table(
+            [
+                {"stage": "\u00a0\u00a0" * sp["depth"] + sp["name"], "ms": sp["ms"], "queries": sp["queries"], "rows": sp["rows"]}
+                for sp in perf["spans"]
+            ]
+        )
+        prev = st.session_state.get("perf_interrupted")
+        if prev:
+            stages = ", ".join(f"{sp['name']} {sp['ms']:.0f} ms" for sp in prev["spans"] if sp["depth"] == 0)
+            st.caption(f"Previous run (ended by rerun): {prev['wall_ms']:.0f} ms, {prev['queries']} queries — {stages}")
+        if PERF_LOG:
+            st.caption(f"Logging every rerun to {PERF_LOG}")
 
-    for t in month_trades:
-        tt = float(trade_total(t["id"]))
-        if tt > 0:
-            total_profit += tt
-        elif tt < 0:
-            total_loss += tt
 
-    month_pnl = total_profit + total_loss
-    return total_trades, total_profit, total_loss, month_pnl
+perf_run = start_perf_run()
 
 
+# =========================
+# Helpers
+# =========================
 def kpi_card(label: str, value: str, chip_text: str, chip_kind: str) -> None:
     chip_class = "chip-neutral"
     if chip_kind == "green":
@@ -459,20 +497,197 @@ def kpi_card(label: str, value: str, chip_text: str, chip_kind: str) -> None:
     )
 
 
-def pnl_class(x: float) -> str:
-    if x > 0:
-        return "green"
-    if x < 0:
-        return "red"
-    return ""
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# A prepared export in a temp file. It is deleted when replaced, when the session (whose state
+# holds the only reference) ends, or when the server exits.
+class PreparedExport:
+    def __init__(self, path: str, result: dict) -> None:
+        self.path = path
+        self.result = result
+        self.discard = weakref.finalize(self, _remove_file, path)
+
+
+# =========================
+# Calendar grid (one HTML block per month)
+# =========================
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Clicks on a day cell come back to Python as the "day" trigger value (st.components.v2).
+# On Streamlit builds without v2 the same links fall back to ?day=YYYY-MM-DD navigation.
+CALENDAR_JS = """
+export default function(component) {
+    const { data, setTriggerValue, parentElement } = component;
+    let root = parentElement.querySelector(".sk-calendar");
+    if (!root) {
+        root = document.createElement("div");
+        root.className = "sk-calendar";
+        parentElement.appendChild(root);
+    }
+    root.innerHTML = data;
+    root.querySelectorAll("a[data-day]").forEach((link) => {
+        link.onclick = (e) => {
+            e.preventDefault();
+            setTriggerValue("day", link.dataset.day);
+        };
+    });
+}
+"""
+
+_components_v2 = getattr(st.components, "v2", None)
+calendar_component = (
+    _components_v2.component("sk_calendar", js=CALENDAR_JS, isolate_styles=False) if _components_v2 else None
+)
+
+
+def _calendar_cell(d_str: str, day_num: int, v: Optional[Dict[str, float]], today_str: str) -> str:
+    trades_count = int(v["trades"]) if v else 0
+    pnl_val = v["pnl"] if v else 0
+    has_trades = trades_count > 0
+
+    cls = "cal-neutral"
+    if has_trades:
+        cls = "cal-profit" if pnl_val > 0 else ("cal-loss" if pnl_val < 0 else "cal-neutral")
+    today_extra = " cal-today" if d_str == today_str else ""
+
+    pnl_line = ""
+    trades_line = ""
+    if has_trades:
+        trades_txt = f"{trades_count} trade" + ("s" if trades_count != 1 else "")
+        pnl_line = f'<div class="cal-pnl {pnl_class(pnl_val)}">{format_cents(pnl_val)}</div>'
+        trades_line = f'<div class="cal-trades">{trades_txt}</div>'
+
+    # one line: st.markdown would treat indented HTML as a code block
+    return (
+        f'<a class="cal-link" href="?day={d_str}{ACCOUNT_QS}" target="_self" data-day="{d_str}" title="{d_str}">'
+        f'<div class="cal-card {cls}{today_extra}"><div class="cal-daynum">{day_num}</div>{pnl_line}{trades_line}</div>'
+        "</a>"
+    )
+
+
+def _calendar_html(month: str, today_str: str) -> str:
+    y, m = int(month[:4]), int(month[5:7])
+    daily_map = journal.build_daily_map(month)
+
+    cells = [f'<div class="cal-head">{d}</div>' for d in WEEKDAYS]
+    for week in pycal.Calendar(firstweekday=pycal.MONDAY).monthdayscalendar(y, m):
+        for day_num in week:
+            if day_num == 0:
+                cells.append('<div class="cal-empty"></div>')
+                continue
+            d_str = f"{month}-{day_num:02d}"
+            cells.append(_calendar_cell(d_str, day_num, daily_map.get(d_str), today_str))
+    return '<div class="cal-grid">' + "".join(cells) + "</div>"
+
+
+def calendar_html(month_start: date) -> str:
+    # memoized under the month's data version, like the journal's own readers
+    month = month_key(month_start.year, month_start.month)
+    today_str = date.today().strftime("%Y-%m-%d")
+    return journal.memo("calendar_html", (month, today_str), journal.versions.month(month), lambda: _calendar_html(month, today_str))
+
+
+def render_day_links(html: str, key: str) -> Optional[str]:
+    # Draws HTML whose a[data-day] links open a day; returns the day clicked on this rerun, if any.
+    if calendar_component is not None:
+        result = calendar_component(data=html, key=key, on_day_change=lambda: None)
+        return result.get("day")
+    st.markdown(html, unsafe_allow_html=True)
+    return None
+
+
+def render_calendar(month_start: date) -> Optional[str]:
+    return render_day_links(calendar_html(month_start), "calendar")
+
+
+# =========================
+# Year view (12-month strip + daily P/L heatmap)
+# =========================
+HEATMAP_STEP_PX = 16  # cell + gap, one column per week
+
+
+def _heat_level(net: float, scale: float) -> int:
+    return max(1, min(4, int(abs(net) / scale * 4 + 0.999))) if scale else 1
+
+
+def _month_strip_html(months: List[dict]) -> str:
+    cards = []
+    for m in months:
+        label = date(int(m["month"][:4]), int(m["month"][5:7]), 1).strftime("%b")
+        mom = m["mom"]
+        arrow = "▲" if mom > 0 else ("▼" if mom < 0 else "•")
+        cards.append(
+            f'<div class="ym-card"><div class="ym-month">{label}</div>'
+            f'<div class="ym-net {pnl_class(m["net"])}">{format_cents(m["net"])}</div>'
+            f'<div class="ym-sub">{int(m["trades"])} trades</div>'
+            f'<div class="ym-mom {pnl_class(mom)}">{arrow} {format_cents(mom)} MoM</div></div>'
+        )
+    return '<div class="ym-strip">' + "".join(cards) + "</div>"
+
+
+def _heatmap_html(year: int, days: Dict[str, Dict[str, float]], today_str: str) -> str:
+    scale = max((abs(v["net"]) for v in days.values()), default=0.0)
+    first = date(year, 1, 1)
+    cells = ['<div class="hm-cell hm-pad"></div>'] * first.weekday()  # weeks start on Monday
+    labels = []
+    d = first
+    while d.year == year:
+        col = len(cells) // 7
+        if d.day == 1:
+            labels.append(f'<span style="left:{col * HEATMAP_STEP_PX}px">{d.strftime("%b")}</span>')
+        d_str = d.strftime("%Y-%m-%d")
+        today_extra = " hm-today" if d_str == today_str else ""
+        v = days.get(d_str)
+        if v and v["trades"]:
+            net = v["net"]
+            cls = f"hm-g{_heat_level(net, scale)}" if net > 0 else (f"hm-r{_heat_level(net, scale)}" if net < 0 else "hm-n")
+            trades_txt = f"{int(v['trades'])} trade" + ("s" if v["trades"] != 1 else "")
+            cells.append(
+                f'<a class="hm-cell {cls}{today_extra}" href="?day={d_str}{ACCOUNT_QS}" target="_self" data-day="{d_str}" '
+                f'title="{d_str}: {format_cents(net)} ({trades_txt})"></a>'
+            )
+        else:
+            cells.append(f'<div class="hm-cell{today_extra}" title="{d_str}"></div>')
+        d += timedelta(days=1)
+
+    legend = "".join(f'<span class="hm-cell hm-r{i}"></span>' for i in (4, 3, 2, 1))
+    legend += '<span class="hm-cell"></span>'
+    legend += "".join(f'<span class="hm-cell hm-g{i}"></span>' for i in (1, 2, 3, 4))
+    return (
+        '<div class="hm-wrap">'
+        f'<div class="hm-months">{"".join(labels)}</div>'
+        f'<div class="hm-grid">{"".join(cells)}</div>'
+        f'<div class="hm-legend">Loss&nbsp;{legend}&nbsp;Profit</div>'
+        "</div>"
+    )
+
+
+def year_html(year: int) -> str:
+    # strip + heatmap as one block, memoized under the data versions of the year's months
+    today_str = date.today().strftime("%Y-%m-%d")
+
+    def build() -> str:
+        summary = journal.year_summary(year)
+        return _month_strip_html(summary["months"]) + _heatmap_html(year, summary["days"], today_str)
+
+    return journal.memo("year_html", (year, today_str), journal.versions.between(*year_window(year)), build)
 
 
 # =========================
 # Premium Day Popup (scrollable + full details)
 # =========================
 @st.dialog("Day Details", width="large")
-def day_popup(day_str: str, trades: List[dict]) -> None:
-    day_trades = [t for t in trades if t["trade_date"] == day_str]
+def day_popup(day_str: str) -> None:
+    details = journal.day_details(day_str)
+    day_trades = details["trades"]
     st.markdown(f"### {day_str}")
 
     if not day_trades:
@@ -480,16 +695,9 @@ def day_popup(day_str: str, trades: List[dict]) -> None:
         return
 
     # Totals
-    profit = 0.0
-    loss = 0.0
-    net = 0.0
-    for t in day_trades:
-        tt = float(trade_total(t["id"]))
-        net += tt
-        if tt > 0:
-            profit += tt
-        elif tt < 0:
-            loss += tt
+    totals = details["totals"]
+    day = details["day"]
+    profit, loss, net = day["profit"], day["loss"], day["net"]
 
     # KPIs in compact HTML so it won't truncate
     st.markdown(
@@ -497,9 +705,9 @@ def day_popup(day_str: str, trades: List[dict]) -> None:
 <div class="modal-wrap">
   <div class="modal-kpis">
     <div class="modal-card"><div class="modal-k">Total Trades</div><div class="modal-v">{len(day_trades)}</div></div>
-    <div class="modal-card"><div class="modal-k">Total Profit</div><div class="modal-v green">{format_money(profit)}</div></div>
-    <div class="modal-card"><div class="modal-k">Total Loss</div><div class="modal-v red">{format_money(loss)}</div></div>
-    <div class="modal-card"><div class="modal-k">Net P/L</div><div class="modal-v {pnl_class(net)}">{format_money(net)}</div></div>
+    <div class="modal-card"><div class="modal-k">Total Profit</div><div class="modal-v green">{format_cents(profit)}</div></div>
+    <div class="modal-card"><div class="modal-k">Total Loss</div><div class="modal-v red">{format_cents(loss)}</div></div>
+    <div class="modal-card"><div class="modal-k">Net P/L</div><div class="modal-v {pnl_class(net)}">{format_cents(net)}</div></div>
   </div>
 </div>
 """,
@@ -510,8 +718,8 @@ def day_popup(day_str: str, trades: List[dict]) -> None:
 
     # Trade cards
     for t in day_trades:
-        tt = float(trade_total(t["id"]))
-        entries = fetch_entries(t["id"])
+        tt = totals.get(t["id"], 0)
+        entries = details["entries"][t["id"]]
         entries_count = len(entries)
         base_lot_txt = "" if t.get("base_lot") is None else f"Base Lot: {t['base_lot']}"
         created_txt = (t.get("created_at") or "").replace("T", " ")
@@ -526,7 +734,7 @@ def day_popup(day_str: str, trades: List[dict]) -> None:
       <div class="trade-sub">{base_lot_txt}</div>
       <div class="trade-sub">Created: {created_txt} • Locked: {locked_txt}</div>
     </div>
-    <div class="trade-total {pnl_class(tt)}">{format_money(tt)}</div>
+    <div class="trade-total {pnl_class(tt)}">{format_cents(tt)}</div>
   </div>
 </div>
 """,
@@ -538,12 +746,12 @@ def day_popup(day_str: str, trades: List[dict]) -> None:
             st.info("No entries for this trade.")
         else:
             for e in entries:
-                p = float(e["entry_pnl"])
+                p = e["pnl_cents"]
                 st.markdown(
                     f"""
 <div class="entry-row">
   <div class="entry-left">Entry {int(e["entry_no"])}</div>
-  <div class="entry-right {pnl_class(p)}">{format_money(p)}</div>
+  <div class="entry-right {pnl_class(p)}">{format_cents(p)}</div>
 </div>
 """,
                     unsafe_allow_html=True,
@@ -555,111 +763,98 @@ def day_popup(day_str: str, trades: List[dict]) -> None:
 # =========================
 # App start
 # =========================
-init_db()
-trades = fetch_trades()
-daily_map = build_daily_map(trades)
-
-tab_home, tab_add, tab_manage = st.tabs(["Home", "Add Trade", "Manage Trades"])
+tab_home, tab_add, tab_manage, tab_analytics = st.tabs(["Home", "Add Trade", "Manage Trades", "Analytics"])
 
 
 # =========================
 # HOME (Calendar + KPIs + click -> modal)
 # =========================
-with tab_home:
+with tab_home, instrument.span("render:home"):
     st.subheader("Calendar")
 
     if "cal_month" not in st.session_state:
         st.session_state.cal_month = date.today().replace(day=1)
 
-    month_start: date = st.session_state.cal_month
-
-    nav1, _, nav3 = st.columns([1, 2, 1])
-    with nav1:
-        if st.button("◀ Prev Month", use_container_width=True):
-            st.session_state.cal_month = (month_start.replace(day=1) - timedelta(days=1)).replace(day=1)
-            st.rerun()
-
-    with nav3:
-        if st.button("Next Month ▶", use_container_width=True):
-            st.session_state.cal_month = (month_start + timedelta(days=32)).replace(day=1)
-            st.rerun()
-
-    # Month KPIs
-    total_trades, total_profit, total_loss, month_pnl = month_stats(trades, month_start)
-    k1, k2, k3, k4 = st.columns(4)
-    with k1:
-        kpi_card("Total Trades (Month)", f"{total_trades}", "Trades", "neutral")
-    with k2:
-        kpi_card("Total Profit (Month)", format_money(total_profit), "Profit", "green")
-    with k3:
-        kpi_card("Total Loss (Month)", format_money(total_loss), "Loss", "red")
-    with k4:
-        kind = "green" if month_pnl > 0 else ("red" if month_pnl < 0 else "neutral")
-        kpi_card("P/L (Month)", format_money(month_pnl), "Net", kind)
-
-    st.markdown(f"### {month_start.strftime('%B %Y')}")
-
-    pycal.setfirstweekday(pycal.MONDAY)
-    weeks = pycal.monthcalendar(month_start.year, month_start.month)
-    weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-
-    header_html = '<div class="cal-grid">' + "".join([f'<div class="cal-head">{d}</div>' for d in weekdays]) + "</div>"
-    st.markdown(header_html, unsafe_allow_html=True)
-
-    today_str = date.today().strftime("%Y-%m-%d")
-
-    # calendar rows
-    for week in weeks:
-        cols = st.columns(7, gap="small")
-
-        for idx, day_num in enumerate(week):
-            with cols[idx]:
-                if day_num == 0:
-                    st.markdown('<div class="cal-empty"></div>', unsafe_allow_html=True)
-                    continue
-
-                d_obj = date(month_start.year, month_start.month, day_num)
-                d_str = d_obj.strftime("%Y-%m-%d")
-
-                v = daily_map.get(d_str)
-                trades_count = int(v["trades"]) if v else 0
-                pnl_val = float(v["pnl"]) if v else 0.0
-                has_trades = trades_count > 0
-
-                cls = "cal-neutral"
-                if has_trades:
-                    cls = "cal-profit" if pnl_val > 0 else ("cal-loss" if pnl_val < 0 else "cal-neutral")
-
-                today_extra = " cal-today" if d_str == today_str else ""
+    # ?day=YYYY-MM-DD: link fallback when st.components.v2 is unavailable (the page reloads)
+    pending_day = st.query_params.get("day")
+    if pending_day:
+        del st.query_params["day"]
+        try:
+            st.session_state.cal_month = datetime.strptime(pending_day, "%Y-%m-%d").date().replace(day=1)
+        except ValueError:
+            pending_day = None
+
+    view = st.radio("View", ["Month", "Year"], horizontal=True, key="home_view", label_visibility="collapsed")
+
+    if view == "Year":
+        if "cal_year" not in st.session_state:
+            st.session_state.cal_year = date.today().year
+        year: int = st.session_state.cal_year
+
+        ny1, _, ny3 = st.columns([1, 2, 1])
+        with ny1:
+            if st.button("◀ Prev Year", use_container_width=True):
+                st.session_state.cal_year = year - 1
+                st.rerun()
+        with ny3:
+            if st.button("Next Year ▶", use_container_width=True):
+                st.session_state.cal_year = year + 1
+                st.rerun()
 
-                # draw card content INSIDE the button (no floating overlay = no ghost)
-                pnl_txt = format_money(pnl_val)
-                pnl_color = "green" if pnl_val > 0 else ("red" if pnl_val < 0 else "")
-                trades_txt = f"{trades_count} trade" + ("s" if trades_count != 1 else "")
+        with instrument.span("render:kpis"):
+            totals = journal.year_summary(year)["totals"]
+            k1, k2, k3, k4 = st.columns(4)
+            with k1:
+                kpi_card("Total Trades (Year)", f"{int(totals['trades'])}", "Trades", "neutral")
+            with k2:
+                kpi_card("Total Profit (Year)", format_cents(totals["profit"]), "Profit", "green")
+            with k3:
+                kpi_card("Total Loss (Year)", format_cents(totals["loss"]), "Loss", "red")
+            with k4:
+                kind = "green" if totals["net"] > 0 else ("red" if totals["net"] < 0 else "neutral")
+                kpi_card("P/L (Year)", format_cents(totals["net"]), "Net", kind)
+
+        st.markdown(f"### {year}")
+
+        # one memoized block for the whole year; a click on a day opens the day popup
+        with instrument.span("render:year"):
+            clicked_day = render_day_links(year_html(year), "year_heatmap") or pending_day
+    else:
+        month_start: date = st.session_state.cal_month
 
-                if not has_trades:
-                    pnl_line = ""
-                    trades_line = ""
-                else:
-                    pnl_line = f'<div class="cal-pnl {pnl_color}">{pnl_txt}</div>'
-                    trades_line = f'<div class="cal-trades">{trades_txt}</div>'
-
-                card_html = f"""
-<div class="cal-card {cls}{today_extra}">
-  <div class="cal-daynum">{day_num}</div>
-  {pnl_line}
-  {trades_line}
-</div>
-"""
+        nav1, _, nav3 = st.columns([1, 2, 1])
+        with nav1:
+            if st.button("◀ Prev Month", use_container_width=True):
+                st.session_state.cal_month = (month_start.replace(day=1) - timedelta(days=1)).replace(day=1)
+                st.rerun()
 
-                # Button acts like clickable cell, but shows ONLY our HTML content
-                clicked = st.button("", key=f"open_{d_str}", use_container_width=True, help=d_str)
-                st.markdown(f'<div class="cal-btn">{card_html}</div>', unsafe_allow_html=True)
+        with nav3:
+            if st.button("Next Month ▶", use_container_width=True):
+                st.session_state.cal_month = (month_start + timedelta(days=32)).replace(day=1)
+                st.rerun()
 
-                # Trick: button is invisible overlay; HTML is what you see
-                # On click -> open popup
-                if clicked:
-                    day_popup(d_str, trades)
+        # Month KPIs
+        with instrument.span("render:kpis"):
+            total_trades, total_profit, total_loss, month_pnl = journal.month_stats(month_key(month_start.year, month_start.month))
+            k1, k2, k3, k4 = st.columns(4)
+            with k1:
+                kpi_card("Total Trades (Month)", f"{total_trades}", "Trades", "neutral")
+            with k2:
+                kpi_card("Total Profit (Month)", format_cents(total_profit), "Profit", "green")
+            with k3:
+                kpi_card("Total Loss (Month)", format_cents(total_loss), "Loss", "red")
+            with k4:
+                kind = "green" if month_pnl > 0 else ("red" if month_pnl < 0 else "neutral")
+                kpi_card("P/L (Month)", format_cents(month_pnl), "Net", kind)
+
+        st.markdown(f"### {month_start.strftime('%B %Y')}")
+
+        # whole month in one memoized HTML block; a click opens the day popup
+        with instrument.span("render:calendar"):
+            clicked_day = render_calendar(month_start) or pending_day
+    if clicked_day:
+        with instrument.span("render:popup"):
+            day_popup(clicked_day)
 
     st.divider()
     st.caption("skcapitalztrading @ 2026")
@@ -668,7 +863,7 @@ with tab_home:
 # =========================
 # ADD TRADE
 # =========================
-with tab_add:
+with tab_add, instrument.span("render:add"):
     st.subheader("Add Trade")
     st.caption("Enter P/L for each entry (negative = loss). Total is calculated automatically.")
 
@@ -684,8 +879,7 @@ with tab_add:
         entries_count = st.number_input("Number of entries", min_value=1, max_value=50, value=4, step=1)
 
     with right:
-        entry_pnls: List[float] = []
-        running_total = 0.0
+        entry_cents: List[int] = []
         st.markdown("### Entry P/L Lines")
         for i in range(int(entries_count)):
             val = st.number_input(
@@ -695,133 +889,519 @@ with tab_add:
                 format="%.2f",
                 key=f"add_entry_{i}",
             )
-            entry_pnls.append(float(val))
-            running_total += float(val)
+            entry_cents.append(to_cents(val))
 
         st.markdown("### Trade Total")
-        st.metric("Total", format_money(running_total))
+        st.metric("Total", format_cents(sum(entry_cents)))
 
     if st.button("✅ Save Trade", use_container_width=True):
-        add_trade(trade_date.strftime("%Y-%m-%d"), symbol, direction, base_lot_val, entry_pnls)
-        st.success("Saved!")
+        day = trade_date.strftime("%Y-%m-%d")
+        track_save(journal.queue_add_trade(day, symbol, direction, base_lot_val, entry_cents), f"{symbol} {direction} trade on {day}")
         st.rerun()
 
+    with st.expander("📥 Import CSV / MT4 / MT5 history"):
+        st.caption(
+            "Columns: date or close time, symbol, type/direction (buy/sell), profit or entry_pnl; "
+            "optional ticket, volume/lot, commission, fee, swap. Rows with the same date, symbol and direction "
+            "become one trade. Tickets already imported are skipped. From an MT5 deal report only the closing "
+            "(out) deals are imported, under the direction of the position they close."
+        )
+        upload = st.file_uploader("History file", type=["csv", "txt"], key="import_file")
+        if upload is not None:
+            dry_col, run_col = st.columns(2)
+            with dry_col:
+                if st.button("🔍 Dry run", use_container_width=True):
+                    upload.seek(0)
+                    st.session_state.import_summary = import_trades(journal, upload, dry_run=True)
+            with run_col:
+                if st.button("📥 Import", use_container_width=True):
+                    upload.seek(0)
+                    with write_guard():
+                        st.session_state.import_summary = import_trades(journal, upload)
+
+        summary = st.session_state.get("import_summary")
+        if summary:
+            verb = "Would import" if summary["dry_run"] else "Imported"
+            st.success(
+                f"{verb} {summary['entries']} entries into {summary['trades']} new trades "
+                f"({summary['first_date'] or '-'} → {summary['last_date'] or '-'}, net {format_cents(summary['net_pnl'])}) "
+                f"in {summary.get('seconds', 0)}s. Duplicates skipped: {summary['duplicates']}, "
+                f"non-trade rows: {summary['skipped']}, invalid: {summary['invalid']}."
+            )
+            for err in summary["errors"]:
+                st.warning(err)
+
 
 # =========================
 # MANAGE TRADES
 # =========================
-with tab_manage:
+with tab_manage, instrument.span("render:manage"):
     st.subheader("Manage Trades")
+    symbols = journal.symbols()
 
-    if not trades:
+    if not symbols:
         st.info("No trades to manage yet.")
     else:
-        trade_ids = [t["id"] for t in trades]
-        trade_id = st.selectbox("Select Trade ID", trade_ids)
-
-        selected_trade = next(t for t in trades if t["id"] == trade_id)
-        entries = fetch_entries(trade_id)
-        current_total = sum(float(e["entry_pnl"]) for e in entries)
-        can_edit = selected_trade["locked_at"] is None
-
-        st.markdown(
-            f"**Trade {trade_id}** | Date: {selected_trade['trade_date']} | "
-            f"{selected_trade['symbol']} | {selected_trade['direction']} | "
-            f"Total: {format_money(current_total)} | Locked: {'Yes' if selected_trade['locked_at'] else 'No'}"
+        # Trade browser: filters run in SQL and only one page is fetched, keyset-paginated over (trade_date, id).
+        # Tick rows to act on all of them at once (one transaction per action); tick one to edit it below.
+        f1, f2, f3, f4, f5, f6 = st.columns([2, 2, 1, 1, 1, 1])
+        with f1:
+            flt_range = st.date_input("Dates", value=(), key="flt_range")
+        with f2:
+            flt_symbols = st.multiselect("Symbol", symbols, key="flt_symbols")
+        with f3:
+            flt_dir = st.selectbox("Direction", ["All", "Buy", "Sell"], key="flt_dir")
+        with f4:
+            flt_locked = st.selectbox("Locked", ["All", "Locked", "Unlocked"], key="flt_locked")
+        with f5:
+            flt_sign = st.selectbox("P/L", ["All", "Winners", "Losers", "Flat"], key="flt_sign")
+        with f6:
+            page_size = st.selectbox("Per page", [25, 50, 100], index=1, key="page_size")
+
+        flt_from = flt_range[0].strftime("%Y-%m-%d") if len(flt_range) > 0 else None
+        flt_to = flt_range[1].strftime("%Y-%m-%d") if len(flt_range) > 1 else flt_from
+        filters = {
+            "start": flt_from,
+            "end": flt_to,
+            "symbols": tuple(flt_symbols),
+            "direction": None if flt_dir == "All" else flt_dir,
+            "locked": None if flt_locked == "All" else flt_locked == "Locked",
+            "sign": {"Winners": "win", "Losers": "loss", "Flat": "flat"}.get(flt_sign),
+            "limit": page_size,
+        }
+        # first-row cursor of every page visited so far; changing a filter starts over at page 1
+        if st.session_state.get("page_filters") != filters:
+            st.session_state.page_filters = filters
+            st.session_state.page_cursors = [None]
+        cursors = st.session_state.page_cursors
+        page = journal.trade_page(**filters, after=cursors[-1])
+
+        table = [
+            {
+                "ID": t["id"],
+                "Date": t["trade_date"],
+                "Symbol": t["symbol"],
+                "Direction": t["direction"],
+                "Base Lot": t["base_lot"],
+                "Total": from_cents(t["total"]),
+                "Locked": bool(t["locked_at"]),
+            }
+            for t in page["rows"]
+        ]
+        picked = st.dataframe(
+            table,
+            on_select="rerun",
+            selection_mode="multi-row",
+            hide_index=True,
+            use_container_width=True,
+            key=f"trade_table_{st.session_state.get('bulk_gen', 0)}_{len(cursors)}",
         )
+        selected_ids = [table[i]["ID"] for i in picked.selection.rows]
 
-        edit_col, action_col = st.columns([2, 1])
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if st.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True, key="page_prev"):
+                cursors.pop()
+                st.rerun()
+        with p2:
+            st.caption(f"Page {len(cursors)} · {len(table)} trades · {len(selected_ids)} selected")
+        with p3:
+            if st.button("Older ▶", disabled=page["next"] is None, use_container_width=True, key="page_next"):
+                cursors.append(page["next"])
+                st.rerun()
 
-        with edit_col:
-            st.markdown("### Edit Trade")
+        bulk = None
+        a1, a2, a3, a4, a5 = st.columns([1, 1, 1, 1, 1])
+        with a1:
+            if st.button("🔒 Lock", disabled=not selected_ids, use_container_width=True, key="bulk_lock"):
+                bulk = ("Locked", lambda: journal.lock_trades(selected_ids))
+        with a2:
+            if st.button("🔓 Unlock", disabled=not selected_ids, use_container_width=True, key="bulk_unlock"):
+                bulk = ("Unlocked", lambda: journal.unlock_trades(selected_ids))
+        with a3:
+            if st.button("🗑 Delete", disabled=not selected_ids, use_container_width=True, key="bulk_delete"):
+                bulk = ("Deleted", lambda: journal.delete_trades(selected_ids))
+        with a4:
+            bulk_symbol = st.text_input("New symbol", key="bulk_symbol", placeholder="New symbol", label_visibility="collapsed")
+        with a5:
+            if st.button("✏️ Change symbol", disabled=not (selected_ids and bulk_symbol.strip()), use_container_width=True):
+                bulk = ("Changed the symbol of", lambda: journal.set_symbol(selected_ids, bulk_symbol))
+
+        if bulk:
+            verb, action = bulk
+            with write_guard():
+                result = action()
+                st.session_state.bulk_result = f"{verb} {result['trades']} of {len(selected_ids)} selected trades."
+                st.session_state.bulk_gen = st.session_state.get("bulk_gen", 0) + 1  # fresh table, selection cleared
+                st.rerun()
+        bulk_result = st.session_state.pop("bulk_result", None)
+        if bulk_result:
+            st.success(bulk_result)
+
+        st.divider()
+
+        # opening a trade is a primary-key lookup: the ticked row, a typed ID, or the newest row on the page
+        typed_id = st.number_input("Open trade by ID", min_value=1, step=1, value=None, key="open_trade_id", placeholder="Trade ID")
+        if len(selected_ids) == 1:
+            trade_id = selected_ids[0]
+        elif typed_id:
+            trade_id = int(typed_id)
+        else:
+            trade_id = table[0]["ID"] if table else None
+        selected_trade = journal.get_trade(trade_id) if trade_id else None
 
-            new_date = st.date_input(
-                "Date",
-                value=datetime.strptime(selected_trade["trade_date"], "%Y-%m-%d").date(),
-                key="edit_date",
-                disabled=not can_edit,
-            )
-            new_symbol = st.text_input(
-                "Symbol",
-                value=selected_trade["symbol"],
-                key="edit_symbol",
-                disabled=not can_edit,
-            )
-            new_dir = st.selectbox(
-                "Direction",
-                ["Buy", "Sell"],
-                index=0 if selected_trade["direction"] == "Buy" else 1,
-                key="edit_dir",
-                disabled=not can_edit,
-            )
-            new_base_lot_str = st.text_input(
-                "Base Lot (optional)",
-                value="" if selected_trade["base_lot"] is None else str(selected_trade["base_lot"]),
-                key="edit_lot",
-                disabled=not can_edit,
-            )
-            new_base_lot = safe_float(new_base_lot_str)
-            if new_base_lot_str.strip() and new_base_lot is None and can_edit:
-                st.warning("Base Lot must be a number like 0.01 (or leave blank).")
-
-            new_count = st.number_input(
-                "Entries count",
-                min_value=1,
-                max_value=50,
-                value=len(entries),
-                step=1,
-                key="edit_count",
-                disabled=not can_edit,
+        if selected_trade is None:
+            st.info(f"Trade {trade_id} not found." if trade_id else "No trades match these filters.")
+        else:
+            batch = journal.entries_for([trade_id])
+            entries, current_total = batch["entries"][trade_id], batch["totals"][trade_id]
+            can_edit = selected_trade["locked_at"] is None
+
+            st.markdown(
+                f"**Trade {trade_id}** | Date: {selected_trade['trade_date']} | "
+                f"{selected_trade['symbol']} | {selected_trade['direction']} | "
+                f"Total: {format_cents(current_total)} | Locked: {'Yes' if selected_trade['locked_at'] else 'No'}"
             )
 
-            new_entry_pnls: List[float] = []
-            running = 0.0
-            for i in range(int(new_count)):
-                default_val = float(entries[i]["entry_pnl"]) if i < len(entries) else 0.0
-                v = st.number_input(
-                    f"Entry {i+1} P/L ($)",
-                    value=float(default_val),
-                    step=0.5,
-                    format="%.2f",
-                    key=f"edit_entry_{i}",
+            edit_col, action_col = st.columns([2, 1])
+
+            with edit_col:
+                st.markdown("### Edit Trade")
+
+                new_date = st.date_input(
+                    "Date",
+                    value=datetime.strptime(selected_trade["trade_date"], "%Y-%m-%d").date(),
+                    key=f"edit_date_{trade_id}",
+                    disabled=not can_edit,
+                )
+                new_symbol = st.text_input(
+                    "Symbol",
+                    value=selected_trade["symbol"],
+                    key=f"edit_symbol_{trade_id}",
+                    disabled=not can_edit,
+                )
+                new_dir = st.selectbox(
+                    "Direction",
+                    ["Buy", "Sell"],
+                    index=0 if selected_trade["direction"] == "Buy" else 1,
+                    key=f"edit_dir_{trade_id}",
+                    disabled=not can_edit,
+                )
+                new_base_lot_str = st.text_input(
+                    "Base Lot (optional)",
+                    value="" if selected_trade["base_lot"] is None else str(selected_trade["base_lot"]),
+                    key=f"edit_lot_{trade_id}",
                     disabled=not can_edit,
                 )
-                new_entry_pnls.append(float(v))
-                running += float(v)
-
-            st.metric("New Total", format_money(running))
-
-            if st.button("💾 Save Changes", disabled=not can_edit, use_container_width=True):
-                update_trade(
-                    trade_id,
-                    new_date.strftime("%Y-%m-%d"),
-                    (new_symbol.strip().upper() or "XAUUSD"),
-                    new_dir,
-                    new_base_lot,
-                    new_entry_pnls,
+                new_base_lot = safe_float(new_base_lot_str)
+                if new_base_lot_str.strip() and new_base_lot is None and can_edit:
+                    st.warning("Base Lot must be a number like 0.01 (or leave blank).")
+
+                new_count = st.number_input(
+                    "Entries count",
+                    min_value=1,
+                    max_value=50,
+                    value=len(entries),
+                    step=1,
+                    key=f"edit_count_{trade_id}",
+                    disabled=not can_edit,
                 )
-                st.success("Updated!")
+
+                new_entry_cents: List[int] = []
+                for i in range(int(new_count)):
+                    default_val = from_cents(entries[i]["pnl_cents"]) if i < len(entries) else 0.0
+                    v = st.number_input(
+                        f"Entry {i+1} P/L ($)",
+                        value=default_val,
+                        step=0.5,
+                        format="%.2f",
+                        key=f"edit_entry_{trade_id}_{i}",
+                        disabled=not can_edit,
+                    )
+                    new_entry_cents.append(to_cents(v))
+
+                st.metric("New Total", format_cents(sum(new_entry_cents)))
+
+                if st.button("💾 Save Changes", disabled=not can_edit, use_container_width=True):
+                    header = (new_date.strftime("%Y-%m-%d"), (new_symbol.strip().upper() or "XAUUSD"), new_dir, new_base_lot)
+                    stored = tuple(selected_trade[k] for k in ("trade_date", "symbol", "direction", "base_lot"))
+                    if header == stored and new_entry_cents == [e["pnl_cents"] for e in entries]:
+                        st.info("No changes to save.")
+                    else:
+                        track_save(journal.queue_update_trade(trade_id, *header, new_entry_cents), f"Trade {trade_id}")
+                        st.rerun()
+
+            with action_col:
+                st.markdown("### Actions")
+
+                if selected_trade["locked_at"] is None:
+                    if st.button("🔒 Lock Trade", use_container_width=True):
+                        with write_guard():
+                            journal.lock_trade(trade_id)
+                            st.success("Locked.")
+                            st.rerun()
+                else:
+                    if st.button("🔓 Unlock Trade", use_container_width=True):
+                        with write_guard():
+                            journal.unlock_trade(trade_id)
+                            st.success("Unlocked.")
+                            st.rerun()
+
+                st.divider()
+
+                if st.button("🗑 Delete Trade", use_container_width=True):
+                    with write_guard():
+                        journal.soft_delete_trade(trade_id)
+                        st.success("Deleted.")
+                        st.rerun()
+
+    with st.expander("📤 Export"):
+        ex1, ex2, ex3 = st.columns(3)
+        with ex1:
+            ex_start = st.date_input("From", value=None, key="export_start")
+            ex_end = st.date_input("To", value=None, key="export_end")
+        with ex2:
+            ex_symbol = st.text_input("Symbol (blank = all)", key="export_symbol")
+            ex_deleted = st.checkbox("Include deleted trades", key="export_deleted")
+        with ex3:
+            ex_fmt = st.selectbox("Format", EXPORT_FORMATS, key="export_fmt")
+
+        if st.button("Prepare export", use_container_width=True):
+            # written to a temp file chunk by chunk, so building the export never holds the journal in memory
+            fd, path = tempfile.mkstemp(prefix="sk_export_", suffix=f".{ex_fmt}")
+            os.close(fd)
+            try:
+                result = export_trades(
+                    journal,
+                    path,
+                    ex_fmt,
+                    start=ex_start.strftime("%Y-%m-%d") if ex_start else None,
+                    end=ex_end.strftime("%Y-%m-%d") if ex_end else None,
+                    symbol=ex_symbol or None,
+                    include_deleted=ex_deleted,
+                )
+            except RuntimeError as e:
+                os.remove(path)
+                st.error(str(e))
+            else:
+                if "export_file" in st.session_state:
+                    st.session_state.export_file.discard()
+                st.session_state.export_file = PreparedExport(path, result)
+
+        # only session state refers to the PreparedExport (no module-level name), so it goes with the session
+        if "export_file" in st.session_state and os.path.exists(st.session_state.export_file.path):
+            result = st.session_state.export_file.result
+            st.caption(f"{result['rows']} rows exported in {result['seconds']}s.")
+            # deferred: the file is read when the button is clicked, not on every rerun
+            st.download_button(
+                "⬇️ Download",
+                partial(_read_file, st.session_state.export_file.path),
+                file_name=f"sk_trades.{result['format']}",
+                use_container_width=True,
+            )
+
+    with st.expander("Maintenance"):
+        st.caption("Rebuild the daily/monthly P/L rollups from raw entries (after a crash or bulk load).")
+        if st.button("♻️ Rebuild rollups", use_container_width=True):
+            with write_guard():
+                journal.rebuild_rollups()
+                st.success("Rollups rebuilt.")
                 st.rerun()
 
-        with action_col:
-            st.markdown("### Actions")
+        st.caption(
+            "Compaction moves trades deleted more than the retention ago (with their entries) to the archive file, "
+            "purges orphan entries, then vacuums and re-analyzes the database."
+        )
+        c1, c2, c3 = st.columns([1, 1, 1], vertical_alignment="bottom")
+        with c1:
+            retention = st.number_input("Retention (days)", min_value=0, value=ARCHIVE_RETENTION_DAYS, step=1, key="compact_retention")
+        with c2:
+            if st.button("🔍 Preview compaction", use_container_width=True):
+                st.session_state.compact_report = compact(journal, int(retention), dry_run=True)
+        with c3:
+            if st.button("🗜 Compact", use_container_width=True):
+                with write_guard():
+                    st.session_state.compact_report = compact(journal, int(retention))
+        report = st.session_state.get("compact_report")
+        if report:
+            archive, purge = ("Would archive", "purge") if report["dry_run"] else ("Archived", "purged")
+            text = (
+                f"{archive} {report['archived_trades']} trades ({report['archived_entries']} entries) deleted before "
+                f"{report['cutoff'][:10]} and {purge} {report['orphan_entries']} orphan entries."
+            )
+            if report["vacuum"]:
+                text += (
+                    f" {report['vacuum']}: {report['bytes_before'] / 1024:,.0f} → {report['bytes_after'] / 1024:,.0f} KiB "
+                    f"({report['reclaimed_bytes'] / 1024:,.0f} KiB reclaimed) in {report['seconds']}s."
+                )
+            st.success(text)
 
-            if selected_trade["locked_at"] is None:
-                if st.button("🔒 Lock Trade", use_container_width=True):
-                    lock_trade(trade_id)
-                    st.success("Locked.")
-                    st.rerun()
+        # listing deleted trades scans the table, so only on request
+        if st.toggle("Show deleted trades", key="show_deleted"):
+            deleted = deleted_trades(journal)
+            if not deleted:
+                st.info("No deleted trades.")
             else:
-                if st.button("🔓 Unlock Trade", use_container_width=True):
-                    unlock_trade(trade_id)
-                    st.success("Unlocked.")
-                    st.rerun()
+                labels = {
+                    d["id"]: f"#{d['id']} · {d['trade_date']} · {d['symbol']} {d['direction']} · {format_cents(d['total'])} ({d['where']})"
+                    for d in deleted
+                }
+                to_restore = st.multiselect(
+                    "Restore trades",
+                    list(labels),
+                    format_func=labels.get,
+                    key=f"restore_ids_{st.session_state.get('restore_gen', 0)}",
+                )
+                if st.button("↩️ Restore", disabled=not to_restore, use_container_width=True):
+                    with write_guard():
+                        result = restore_trades(journal, to_restore)
+                        st.session_state.restore_result = f"Restored {result['trades']} trades ({result['from_archive']} from the archive)."
+                        st.session_state.restore_gen = st.session_state.get("restore_gen", 0) + 1
+                        st.rerun()
+        restore_result = st.session_state.pop("restore_result", None)
+        if restore_result:
+            st.success(restore_result)
+
+        st.caption(
+            "Backups are online snapshots (SQLite backup API) in a backups/ folder next to the database; "
+            "saving keeps working while one runs. Each is integrity-checked and the newest ones are kept."
+        )
+        if st.button("💾 Back up now", use_container_width=True):
+            try:
+                st.session_state.backup_report = backup(journal)
+            except (OSError, sqlite3.DatabaseError) as e:
+                st.error(f"Backup failed: {e}")
+        report = st.session_state.get("backup_report")
+        if report:
+            st.success(
+                f"Snapshot {os.path.basename(report['path'])}: {report['bytes'] / 1048576:,.2f} MiB copied in {report['copy_seconds']}s "
+                f"({report['mb_per_s']} MiB/s), integrity {report['integrity']} ({report['verify_seconds']}s). "
+                f"Rotated out {len(report['removed'])} old snapshots."
+            )
+        snapshots = list_snapshots(journal.path)
+        if snapshots:
+            st.dataframe(
+                [{"Snapshot": s["name"], "Taken": s["created"], "MiB": round(s["bytes"] / 1048576, 2)} for s in snapshots],
+                hide_index=True,
+                use_container_width=True,
+            )
+            r1, r2, r3 = st.columns([2, 1, 1], vertical_alignment="bottom")
+            with r1:
+                snap = st.selectbox("Snapshot to restore", snapshots, format_func=lambda s: s["name"], key="restore_snapshot")
+            with r2:
+                restore_name = st.text_input("As new account", key="restore_account", placeholder="e.g. main-restored")
+            with r3:
+                if st.button("↩️ Restore snapshot", disabled=not restore_name.strip(), use_container_width=True):
+                    # into a new account, never over a live database; switch to it once restored
+                    try:
+                        restore_snapshot(snap["path"], account_path(restore_name.strip()))
+                    except (ValueError, sqlite3.DatabaseError) as e:
+                        st.error(str(e))
+                    else:
+                        st.session_state.pending_account = restore_name.strip()
+                        st.rerun()
+        elif BACKUP_HOURS <= 0:
+            st.caption("No snapshots yet. Set SK_BACKUP_HOURS to take them on a schedule.")
+
+        st.caption("Show how SQLite plans and times the hot queries (every row should use an index).")
+        if st.button("🔎 Check query plans", use_container_width=True):
+            st.table(journal.explain_hot_queries())
+
+        st.caption("Cache hits/misses since the server started (writes only invalidate the trade and months they touch).")
+        cache_stats = journal.cache.stats()
+        if cache_stats:
+            st.table(cache_stats)
 
-            st.divider()
 
-            if st.button("🗑 Delete Trade", use_container_width=True):
-                soft_delete_trade(trade_id)
-                st.success("Deleted.")
-                st.rerun()
+# =========================
+# ANALYTICS
+# =========================
+with tab_analytics, instrument.span("render:analytics"):
+    st.subheader("Analytics")
+
+    today = date.today()
+    date_range = st.date_input("Range", value=(today.replace(month=1, day=1), today), key="analytics_range")
+    if not isinstance(date_range, (tuple, list)) or len(date_range) != 2:
+        st.info("Pick a start and an end date.")
+    else:
+        report = journal.analytics_report(date_range[0].strftime("%Y-%m-%d"), date_range[1].strftime("%Y-%m-%d"))
+        m = report["metrics"]
+
+        if not m["trades"]:
+            st.info("No trades in this range.")
+        else:
+            a1, a2, a3, a4 = st.columns(4)
+            with a1:
+                kind = "green" if m["net"] > 0 else ("red" if m["net"] < 0 else "neutral")
+                kpi_card("Net P/L", format_cents(m["net"]), f"{m['trades']} trades", kind)
+            with a2:
+                kpi_card("Win Rate", ratio_text(m["win_rate"], pct=True), f"PF {ratio_text(m['profit_factor'])}", "neutral")
+            with a3:
+                kpi_card("Expectancy / Trade", format_cents(m["expectancy"] or 0.0), "Expectancy", "neutral")
+            with a4:
+                kpi_card("Max Drawdown", format_cents(m["max_drawdown"]), "Drawdown", "red" if m["max_drawdown"] < 0 else "neutral")
+
+            b1, b2, b3, b4 = st.columns(4)
+            with b1:
+                kpi_card("Avg Win", format_cents(m["avg_win"] or 0.0), "Win", "green")
+            with b2:
+                kpi_card("Avg Loss", format_cents(m["avg_loss"] or 0.0), "Loss", "red")
+            with b3:
+                kpi_card("Longest Win Streak", f"{m['longest_win_streak']}", "Trades", "green")
+            with b4:
+                kpi_card("Longest Loss Streak", f"{m['longest_loss_streak']}", "Trades", "red")
+
+            equity = report["equity"]
+            st.markdown("### Equity Curve")
+            st.line_chart(equity[["equity"]] / MONEY_SCALE)
+            st.markdown("### Drawdown")
+            st.area_chart(equity[["drawdown"]] / MONEY_SCALE)
+            st.markdown("### Daily P/L")
+            st.bar_chart(equity[["net"]] / MONEY_SCALE)
+
+            st.markdown("### By Symbol & Direction")
+            sort_labels = {
+                "Net P/L": "net",
+                "Trades": "trades",
+                "Win rate": "win_rate",
+                "Entries / trade": "avg_entries",
+                "P/L per lot": "net_per_lot",
+                "Symbol": "symbol",
+            }
+            s1, s2 = st.columns([3, 1])
+            with s1:
+                sort_by = st.selectbox("Sort by", list(sort_labels), key="breakdown_sort")
+            with s2:
+                descending = st.toggle("Largest first", key="breakdown_desc")
+            breakdown = journal.symbol_breakdown(
+                date_range[0].strftime("%Y-%m-%d"),
+                date_range[1].strftime("%Y-%m-%d"),
+                sort=sort_labels[sort_by],
+                descending=descending,
+            )
+            st.dataframe(
+                [
+                    {
+                        "Symbol": r["symbol"],
+                        "Direction": r["direction"],
+                        "Trades": r["trades"],
+                        "Net P/L": from_cents(r["net"]),
+                        "Win rate": r["win_rate"] * 100,
+                        "Entries / trade": r["avg_entries"],
+                        "P/L per lot": from_cents(r["net_per_lot"]) if r["net_per_lot"] is not None else None,
+                    }
+                    for r in breakdown
+                ],
+                column_config={
+                    "Net P/L": st.column_config.NumberColumn(format="$%.2f"),
+                    "Win rate": st.column_config.NumberColumn(format="%.1f%%"),
+                    "Entries / trade": st.column_config.NumberColumn(format="%.2f"),
+                    "P/L per lot": st.column_config.NumberColumn(format="$%.2f"),
+                },
+                hide_index=True,
+                use_container_width=True,
+            )
 
 st.caption("ENGINEERED BY SAARVIN KUMAR")
+
+finish_perf_run(perf_run)
@@ -0,0 +1,39 @@
+"""
+Shared fixtures: scratch journals in tmp_path and a copy of the committed baseline database.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import sys
+from contextlib import closing
+from typing import Iterator
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from sk.journal import Journal  # noqa: E402
+
+BASELINE_DB = os.path.join(REPO_ROOT, "trades.db")
+
+
+@pytest.fixture
+def journal(tmp_path) -> Iterator[Journal]:
+    j = Journal(str(tmp_path / "trades.db"), readers=1)
+    yield j
+    j.close()
+
+
+@pytest.fixture
+def baseline_db(tmp_path) -> str:
+    # a copy of the committed trades.db, still at schema 0 (as shipped before the sk package)
+    with closing(sqlite3.connect(BASELINE_DB)) as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != 0:
+            pytest.skip("trades.db was upgraded in place; `git checkout trades.db` restores the baseline")
+    path = str(tmp_path / "baseline.db")
+    shutil.copyfile(BASELINE_DB, path)
+    return path
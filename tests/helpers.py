@@ -0,0 +1,47 @@
+"""
+Test helpers: the daily / monthly P/L recomputed straight from the raw entries, to check the
+rollup tables and the journal's readers against.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Tuple
+
+Buckets = Dict[str, Dict[str, int]]
+
+
+def raw_pnl(conn: sqlite3.Connection, pnl_sql: str = "e.pnl_cents") -> Tuple[Buckets, Buckets]:
+    # (day -> bucket, month -> bucket) in cents, summed from the entries of live trades
+    totals: Dict[int, list] = {}
+    for tid, day, cents in conn.execute(
+        f"""
+        SELECT t.id, t.trade_date, {pnl_sql}
+        FROM trades t LEFT JOIN trade_entries e ON e.trade_id = t.id
+        WHERE t.deleted_at IS NULL
+        """
+    ):
+        trade = totals.setdefault(tid, [day, 0])
+        trade[1] += cents or 0
+    days: Buckets = {}
+    months: Buckets = {}
+    for day, total in totals.values():
+        for bucket in (days.setdefault(day, _empty()), months.setdefault(day[:7], _empty())):
+            bucket["trades"] += 1
+            bucket["net"] += total
+            if total > 0:
+                bucket["profit"] += total
+            elif total < 0:
+                bucket["loss"] += total
+    return days, months
+
+
+def rollup_pnl(conn: sqlite3.Connection) -> Tuple[Buckets, Buckets]:
+    # the same two maps, read from daily_pnl / monthly_pnl
+    days = {r[0]: dict(zip(("trades", "profit", "loss", "net"), r[1:])) for r in conn.execute("SELECT * FROM daily_pnl")}
+    months = {r[0]: dict(zip(("trades", "profit", "loss", "net"), r[1:])) for r in conn.execute("SELECT * FROM monthly_pnl")}
+    return days, months
+
+
+def _empty() -> Dict[str, int]:
+    return {"trades": 0, "profit": 0, "loss": 0, "net": 0}
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from sk import accounts, db
+from sk.db import DatabaseBusy, with_retry
+
+
+@pytest.mark.parametrize("name", ["", "../main", "a b", "-lead", "x" * 41, "acct.db"])
+def test_account_names_are_checked(name):
+    with pytest.raises(ValueError, match="invalid account name"):
+        accounts.account_path(name)
+
+
+def test_accounts_live_in_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(accounts, "ACCOUNTS_DIR", str(tmp_path / "accounts"))
+    assert accounts.account_path("FTMO_100k-2") == str(tmp_path / "accounts" / "FTMO_100k-2.db")
+    with pytest.raises(ValueError, match="unknown account"):
+        accounts.open_account("ftmo")
+
+    journal = accounts.create_account("ftmo")
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+    assert accounts.list_accounts() == [accounts.DEFAULT_ACCOUNT, "ftmo"]
+    assert accounts.open_account("ftmo") is journal
+    with pytest.raises(ValueError, match="already exists"):
+        accounts.create_account("ftmo")
+    with pytest.raises(ValueError, match="already exists"):
+        accounts.create_account(accounts.DEFAULT_ACCOUNT)
+
+
+def test_retry_backs_off_until_the_lock_frees(monkeypatch):
+    monkeypatch.setattr(db, "RETRY_BACKOFF_S", 0.001)
+    calls = []
+
+    def op():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "done"
+
+    assert with_retry(op, "test") == "done" and len(calls) == 3
+
+    def broken():
+        calls.append(1)
+        raise sqlite3.OperationalError("no such table: trades")
+
+    calls.clear()
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        with_retry(broken, "test")
+    assert len(calls) == 1  # only lock errors are retried
+
+
+def test_write_gives_up_with_database_busy(journal, monkeypatch):
+    monkeypatch.setattr(db, "RETRY_BACKOFF_S", 0.001)
+    journal.pool._writer.execute("PRAGMA busy_timeout = 10")
+    with closing(sqlite3.connect(journal.path, isolation_level=None)) as other:
+        other.execute("BEGIN IMMEDIATE")  # another process holding the write lock
+        with pytest.raises(DatabaseBusy, match=f"after {db.WRITE_RETRIES + 1} attempts"):
+            journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+        other.execute("ROLLBACK")
+
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+    assert [t["id"] for t in journal.fetch_month(2026, 3)] == [tid]  # the failed write left nothing behind
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import math
+
+import pandas as pd
+
+from sk import analytics
+
+
+def _frame(*trades):
+    return pd.DataFrame(trades, columns=["trade_date", "total"])
+
+
+def test_metrics_of_a_small_run():
+    m = analytics.performance_metrics(
+        _frame(("2026-03-02", 100.0), ("2026-03-02", -40.0), ("2026-03-03", -80.0), ("2026-03-04", 50.0), ("2026-03-04", 30.0))
+    )
+    assert (m["trades"], m["net"], m["gross_profit"], m["gross_loss"]) == (5, 60.0, 180.0, -120.0)
+    assert m["win_rate"] == 0.6 and m["profit_factor"] == 1.5
+    assert (m["avg_win"], m["avg_loss"], m["expectancy"]) == (60.0, -60.0, 12.0)
+    assert m["max_drawdown"] == -120.0  # from the +100 peak down to -20
+    assert (m["longest_win_streak"], m["longest_loss_streak"]) == (2, 2)
+
+
+def test_metrics_without_losses_or_trades():
+    assert math.isinf(analytics.performance_metrics(_frame(("2026-03-02", 5.0)))["profit_factor"])
+    empty = analytics.performance_metrics(_frame())
+    assert (empty["trades"], empty["net"], empty["win_rate"], empty["profit_factor"], empty["max_drawdown"]) == (0, 0.0, None, None, 0.0)
+
+
+def test_equity_curve_is_daily_with_drawdown_from_the_peak():
+    curve = analytics.equity_curve(_frame(("2026-03-02", 100.0), ("2026-03-02", -40.0), ("2026-03-03", -80.0), ("2026-03-05", 50.0)))
+    assert [d.strftime("%Y-%m-%d") for d in curve.index] == ["2026-03-02", "2026-03-03", "2026-03-05"]
+    assert curve["equity"].tolist() == [60.0, -20.0, 30.0]
+    assert curve["drawdown"].tolist() == [0.0, -80.0, -30.0]
+
+
+def test_journal_report_uses_trade_totals(journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [10, -4])
+    journal.add_trade("2026-03-03", "EURUSD", "Sell", 1.0, [-1])
+    journal.add_trade("2026-04-01", "EURUSD", "Sell", 1.0, [100])
+    report = journal.analytics_report("2026-03-01", "2026-03-31")
+    assert report["trades"]["total"].tolist() == [6.0, -1.0]
+    assert (report["metrics"]["trades"], report["metrics"]["net"]) == (2, 5.0)
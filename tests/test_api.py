@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import http.client
+import json
+
+import pytest
+
+from sk.api import make_server, start_in_thread
+from sk.journal import open_journal
+
+
+@pytest.fixture
+def api(journal):
+    # the server opens its own Journal for the file (open_journal); the fixture's is another connection
+    server = make_server("127.0.0.1", 0, default_db=journal.path, quiet=True)
+    start_in_thread(server)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path, etag=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+        resp = conn.getresponse()
+        body = resp.read()
+        return resp.status, resp.getheader("ETag"), json.loads(body) if body else None
+    finally:
+        conn.close()
+
+
+def test_matching_etag_gets_304_without_reading(api, journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1250, -250])
+    status, etag, body = _get(api, "/api/months/2026-03")
+    assert status == 200 and etag
+    assert body == {"month": "2026-03", "trades": 1, "profit_cents": 1000, "loss_cents": 0, "net_cents": 1000}
+
+    served = open_journal(journal.path)
+    calls = dict(served.cache.calls)
+    status, again, body = _get(api, "/api/months/2026-03", etag)
+    assert (status, again, body) == (304, etag, None)
+    assert served.cache.calls == calls  # no cached reader was even consulted
+
+
+def test_etag_moves_only_with_the_month_written(api, journal):
+    served = open_journal(journal.path)
+    served.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    served.add_trade("2026-04-02", "EURUSD", "Buy", 1.0, [100])
+    _, march, _ = _get(api, "/api/months/2026-03/days")
+    _, april, _ = _get(api, "/api/months/2026-04/days")
+
+    served.add_trade("2026-03-03", "EURUSD", "Sell", 1.0, [-40])
+    status, _, body = _get(api, "/api/months/2026-03/days", march)
+    assert status == 200 and body["days"]["2026-03-03"] == {"trades": 1, "pnl_cents": -40}
+    assert _get(api, "/api/months/2026-04/days", april)[0] == 304
+
+
+def test_write_by_another_connection_changes_the_etag(api, journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    _, etag, body = _get(api, "/api/months/2026-03")
+    assert body["net_cents"] == 100
+
+    journal.add_trade("2026-03-04", "EURUSD", "Buy", 1.0, [600])  # not through the server's Journal
+    status, _, body = _get(api, "/api/months/2026-03", etag)
+    assert status == 200 and (body["trades"], body["net_cents"]) == (2, 700)
+
+
+def test_bad_requests(api):
+    assert _get(api, "/api/months/2026-13")[0] == 400
+    assert _get(api, "/api/trades?limit=0")[0] == 400
+    assert _get(api, "/api/nothing")[0] == 404
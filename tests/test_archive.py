@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import io
+
+from sk import archive
+from sk.transfer import import_trades
+
+from helpers import raw_pnl, rollup_pnl
+
+CSV = "ticket,date,symbol,direction,entry_pnl\n7,2026-03-02,EURUSD,Buy,4.5\n8,2026-03-02,EURUSD,Buy,-1\n"
+
+
+def _delete_long_ago(journal, trade_id):
+    journal.soft_delete_trade(trade_id)
+    with journal.write() as conn:
+        conn.execute("UPDATE trades SET deleted_at = '2026-01-01T00:00:00' WHERE id = ?", (trade_id,))
+
+
+def _refs(journal):
+    with journal.read() as conn:
+        return dict(conn.execute("SELECT source_ref, trade_id FROM trade_entries WHERE source_ref IS NOT NULL"))
+
+
+def test_compact_then_restore_round_trip(journal):
+    import_trades(journal, io.BytesIO(CSV.encode()))
+    [imported] = journal.fetch_month(2026, 3)
+    kept = journal.add_trade("2026-03-05", "XAUUSD", "Sell", 0.5, [-200])
+    recent = journal.add_trade("2026-03-06", "XAUUSD", "Sell", 0.5, [300])
+    entries = journal.fetch_entries(imported["id"])
+    _delete_long_ago(journal, imported["id"])
+    journal.soft_delete_trade(recent)  # inside the retention window: stays in the database
+
+    summary = archive.compact(journal)
+    assert (summary["archived_trades"], summary["archived_entries"], summary["orphan_entries"]) == (1, 2, 0)
+    assert {(t["id"], t["where"]) for t in archive.deleted_trades(journal)} == {(recent, "deleted"), (imported["id"], "archive")}
+    assert _refs(journal) == {}
+    assert archive.compact(journal)["archived_trades"] == 0
+
+    restored = archive.restore_trades(journal, [imported["id"], recent])
+    assert (restored["trades"], restored["from_archive"], restored["days"]) == (2, 1, ["2026-03-02", "2026-03-06"])
+    assert sorted(t["id"] for t in journal.fetch_month(2026, 3)) == sorted([imported["id"], kept, recent])
+    assert journal.fetch_entries(imported["id"]) == entries  # same ids, numbers and P/L
+    assert _refs(journal) == {"ticket:7": imported["id"], "ticket:8": imported["id"]}
+    assert archive.deleted_trades(journal) == []
+    assert journal.month_stats("2026-03") == (3, 650, -200, 450)
+    with journal.read() as conn:
+        assert rollup_pnl(conn) == raw_pnl(conn)
+
+
+def test_restore_after_a_reimport_leaves_the_tickets_with_the_new_copy(journal):
+    import_trades(journal, io.BytesIO(CSV.encode()))
+    [old] = journal.fetch_month(2026, 3)
+    _delete_long_ago(journal, old["id"])
+    archive.compact(journal)
+    import_trades(journal, io.BytesIO(CSV.encode()))
+    [new] = journal.fetch_month(2026, 3)
+
+    archive.restore_trades(journal, [old["id"]])
+    assert [e["pnl_cents"] for e in journal.fetch_entries(old["id"])] == [450, -100]
+    assert _refs(journal) == {"ticket:7": new["id"], "ticket:8": new["id"]}
+    assert journal.month_stats("2026-03")[0] == 2
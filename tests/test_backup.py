@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from sk.backup import backup, list_snapshots, restore_snapshot, verify_snapshot
+from sk.journal import Journal
+
+
+def test_backup_rotates_to_the_newest(journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    made = []
+    for _ in range(3):
+        made.append(backup(journal, keep=2))
+        time.sleep(0.01)  # snapshot names are stamped to the millisecond
+
+    assert made[0]["integrity"] == "ok" and made[0]["removed"] == []
+    assert made[2]["removed"] == [made[0]["path"]]
+    assert [s["path"] for s in list_snapshots(journal.path)] == [made[2]["path"], made[1]["path"]]
+    assert not os.path.exists(made[0]["path"])
+
+
+def test_restore_round_trip(journal, tmp_path):
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100, -30])
+    snap = backup(journal)["path"]
+    stats = journal.month_stats("2026-03")
+    journal.add_trade("2026-03-03", "EURUSD", "Sell", 1.0, [500])  # after the snapshot
+    assert verify_snapshot(snap) == "ok"
+
+    dest = str(tmp_path / "restored" / "trades.db")
+    report = restore_snapshot(snap, dest)
+    assert report["integrity"] == "ok"
+    restored = Journal(dest, readers=1)
+    try:
+        assert [t["id"] for t in restored.fetch_month(2026, 3)] == [tid]
+        assert restored.month_stats("2026-03") == stats
+    finally:
+        restored.close()
+
+    with pytest.raises(ValueError):
+        restore_snapshot(snap, dest)  # never over an existing file
+
+
+def test_damaged_snapshot_is_reported(journal):
+    snap = backup(journal)["path"]
+    with open(snap, "r+b") as f:
+        f.seek(0)
+        f.write(b"not a database at all")
+    assert verify_snapshot(snap) != "ok"
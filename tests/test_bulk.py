@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from helpers import raw_pnl, rollup_pnl
+
+
+def _symbols(journal):
+    return {t["id"]: t["symbol"] for t in journal.fetch_month(2026, 3)}
+
+
+def test_bulk_actions_skip_rows_they_would_not_change(journal):
+    a = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+    b = journal.add_trade("2026-03-03", "EURUSD", "Sell", 1.0, [2])
+    c = journal.add_trade("2026-03-04", "XAUUSD", "Sell", 1.0, [3])
+    journal.soft_delete_trade(c)
+
+    assert journal.lock_trades([a, c]) == {"trades": 1, "days": ["2026-03-02"]}  # c is deleted
+    assert journal.lock_trades([a, b])["trades"] == 1  # a is already locked
+    assert journal.unlock_trades([a])["trades"] == 1
+    assert journal.unlock_trades([a])["trades"] == 0
+
+    journal.lock_trades([b])
+    # b is locked, c deleted, a already says EURUSD: only the rows that change count
+    assert journal.set_symbol([a, b, c], " eurusd ") == {"trades": 0, "days": []}
+    assert journal.set_symbol([a, b, c], "gbpusd") == {"trades": 1, "days": ["2026-03-02"]}
+    assert _symbols(journal) == {a: "GBPUSD", b: "EURUSD"}
+
+    assert journal.delete_trades([]) == {"trades": 0, "days": []}
+
+
+def test_set_symbol_refuses_a_blank_symbol(journal):
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+    with pytest.raises(ValueError):
+        journal.set_symbol([tid], "  ")
+    assert _symbols(journal) == {tid: "EURUSD"}
+
+
+def test_bulk_delete_refreshes_the_rollups(journal):
+    a = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+    b = journal.add_trade("2026-03-02", "EURUSD", "Sell", 1.0, [-4])
+    c = journal.add_trade("2026-04-01", "EURUSD", "Sell", 1.0, [8])
+    assert journal.month_stats("2026-03") == (2, 1, -4, -3)
+
+    assert journal.delete_trades([a, c]) == {"trades": 2, "days": ["2026-03-02", "2026-04-01"]}
+    assert journal.month_stats("2026-03") == (1, 0, -4, -4)
+    assert journal.month_stats("2026-04") == (0, 0, 0, 0)
+    assert [t["id"] for t in journal.fetch_month(2026, 3)] == [b]
+    with journal.read() as conn:
+        assert rollup_pnl(conn) == raw_pnl(conn)
+
+    assert journal.delete_trades([a])["trades"] == 0  # already deleted
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from sk.journal import Journal
+
+
+def test_writes_invalidate_only_their_month(journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    journal.add_trade("2026-04-02", "EURUSD", "Buy", 1.0, [100])
+    journal.month_stats("2026-03")
+    journal.month_stats("2026-04")
+    misses = dict(journal.cache.misses)
+
+    journal.add_trade("2026-03-03", "EURUSD", "Buy", 1.0, [50])
+    assert journal.month_stats("2026-03") == (2, 150, 0, 150)
+    assert journal.month_stats("2026-04") == (1, 100, 0, 100)
+    assert journal.cache.misses["fetch_monthly_pnl"] == misses["fetch_monthly_pnl"] + 1
+    assert not journal.sync()  # our own commits are not "someone else wrote"
+
+
+def test_sync_picks_up_another_writer(journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    assert journal.month_stats("2026-03") == (1, 100, 0, 100)
+
+    other = Journal(journal.path, readers=1)  # its own connections, like the CLI or a second dashboard
+    other.add_trade("2026-03-04", "EURUSD", "Sell", 1.0, [600])
+    other.close()
+
+    assert journal.month_stats("2026-03") == (1, 100, 0, 100)  # cached until the next sync
+    assert journal.sync()
+    assert journal.month_stats("2026-03") == (2, 700, 0, 700)
+    assert journal.build_daily_map("2026-03") == {"2026-03-02": {"pnl": 100, "trades": 1}, "2026-03-04": {"pnl": 600, "trades": 1}}
+    assert not journal.sync()
+
+
+def test_date_move_invalidates_both_months(journal):
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [200])
+    assert [t["id"] for t in journal.fetch_month(2026, 3)] == [tid]
+    assert journal.fetch_month(2026, 4) == []
+
+    journal.update_trade(tid, "2026-04-02", "EURUSD", "Buy", 1.0, [200])
+    assert journal.fetch_month(2026, 3) == []
+    assert [t["id"] for t in journal.fetch_month(2026, 4)] == [tid]
+    assert journal.month_stats("2026-03") == (0, 0, 0, 0)
+    assert journal.trade_total(tid) == 200
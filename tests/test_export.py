@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import csv
+import io
+
+import pytest
+
+from sk.transfer import EXPORT_COLUMNS, export_trades
+
+
+def _fill(journal):
+    a = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1000, -250])
+    b = journal.add_trade("2026-03-05", "XAUUSD", "Sell", None, [700])
+    c = journal.add_trade("2026-04-01", "EURUSD", "Sell", 0.5, [100])
+    journal.soft_delete_trade(c)
+    return a, b, c
+
+
+def _csv_rows(journal, **filters):
+    out = io.BytesIO()
+    summary = export_trades(journal, out, "csv", **filters)
+    rows = list(csv.reader(io.StringIO(out.getvalue().decode("utf-8"))))
+    assert rows[0] == EXPORT_COLUMNS
+    assert summary["rows"] == len(rows) - 1
+    return rows[1:]
+
+
+def test_csv_has_one_row_per_entry_and_skips_deleted_trades(journal):
+    a, b, _ = _fill(journal)
+    rows = _csv_rows(journal)
+    assert [(int(r[0]), r[8], r[9]) for r in rows] == [(a, "1", "10.0"), (a, "2", "-2.5"), (b, "1", "7.0")]  # in dollars
+    assert rows[2][4] == ""  # no base lot
+
+
+def test_filters(journal):
+    a, b, c = _fill(journal)
+    assert {int(r[0]) for r in _csv_rows(journal, symbol="eurusd")} == {a}
+    assert {int(r[0]) for r in _csv_rows(journal, start="2026-03-03", end="2026-03-31")} == {b}
+    assert {int(r[0]) for r in _csv_rows(journal, include_deleted=True, start="2026-04-01")} == {c}
+
+
+def test_parquet_matches_csv(journal, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _fill(journal)
+    path = str(tmp_path / "trades.parquet")
+    assert export_trades(journal, path, "parquet")["rows"] == 3
+    table = pq.read_table(path)
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.column("entry_pnl").to_pylist() == [10.0, -2.5, 7.0]
+
+
+def test_unknown_format_is_refused(journal):
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export_trades(journal, io.BytesIO(), "xlsx")
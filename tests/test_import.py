@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+
+from sk import transfer
+from sk.journal import Journal
+from sk.transfer import import_trades
+
+MT4_HISTORY = (
+    "Ticket,Open Time,Type,Size,Item,Price,Close Time,Price,Commission,Taxes,Swap,Profit\n"
+    "11,2026.03.02 09:00,buy,1.00,eurusd,1.0800,2026.03.02 11:00,1.0820,-3.50,0.00,-1.10,200.00\n"
+    "12,2026.03.02 12:00,buy,1.00,eurusd,1.0810,2026.03.02 13:00,1.0800,-3.50,0.00,0.00,-100.00\n"
+    "13,2026.03.03 09:00,balance,,,,,,,,,500.00\n"
+    "14,2026.03.04 09:00,sell,0.50,xauusd,2300.0,2026.03.05 10:00,2290.0,0.00,0.00,0.00,500.00\n"
+)
+
+MT5_DEALS = (
+    "Time,Deal,Symbol,Type,Direction,Volume,Price,Order,Commission,Fee,Swap,Profit,Balance,Comment\n"
+    "2026.03.02 09:00:00,1,,balance,,,,,0.00,0.00,0.00,1000.00,1000.00,deposit\n"
+    "2026.03.02 10:00:00,101,EURUSD,buy,in,1.00,1.0800,201,-3.50,0.00,0.00,0.00,996.50,\n"
+    "2026.03.02 12:00:00,102,EURUSD,sell,out,1.00,1.0820,202,-3.50,-0.25,-1.10,200.00,1191.65,\n"
+)
+
+
+def _pipe(data: bytes):
+    # a real, non-seekable pipe, as `cat file | python -m sk import -` gives
+    r, w = os.pipe()
+
+    def feed() -> None:
+        with os.fdopen(w, "wb") as f:
+            f.write(data)
+
+    threading.Thread(target=feed, daemon=True).start()
+    return os.fdopen(r, "rb")
+
+
+def test_mt4_history_groups_entries_and_skips_balance_lines(journal):
+    summary = import_trades(journal, io.BytesIO(MT4_HISTORY.encode()))
+    assert (summary["entries"], summary["trades"], summary["skipped"], summary["errors"]) == (3, 2, 1, [])
+    assert (summary["first_date"], summary["last_date"]) == ("2026-03-02", "2026-03-05")
+
+    trades = {t["symbol"]: t for t in journal.fetch_month(2026, 3)}
+    assert trades["EURUSD"]["trade_date"] == "2026-03-02"  # the close time, not the open time
+    assert [e["pnl_cents"] for e in journal.fetch_entries(trades["EURUSD"]["id"])] == [19540, -10350]
+    assert (trades["XAUUSD"]["direction"], trades["XAUUSD"]["base_lot"]) == ("Sell", 0.5)
+
+
+def test_only_exact_buy_and_sell_rows_are_trades(journal):
+    # cancelled MT4 pending orders have no profit but share the "buy" / "sell" prefix
+    text = (
+        "Ticket,Close Time,Type,Size,Item,Profit\n"
+        "21,2026.03.02 11:00,buy limit,1.00,eurusd,0.00\n"
+        "22,2026.03.02 12:00,sell stop,1.00,eurusd,0.00\n"
+        "23,2026.03.02 13:00,Sell,1.00,eurusd,12.50\n"
+    )
+    summary = import_trades(journal, io.BytesIO(text.encode()))
+    assert (summary["entries"], summary["skipped"]) == (1, 2)
+    [trade] = journal.fetch_month(2026, 3)
+    assert trade["direction"] == "Sell"
+
+
+def test_reimport_skips_rows_already_imported(journal):
+    import_trades(journal, io.BytesIO(MT4_HISTORY.encode()))
+    again = import_trades(journal, io.BytesIO(MT4_HISTORY.encode()))
+    assert (again["entries"], again["trades"], again["duplicates"]) == (0, 0, 3)
+
+    # without a ticket column, identical rows are told apart by their position in the file
+    plain = "date,symbol,direction,entry_pnl\n2026-03-09,EURUSD,Buy,5\n2026-03-09,EURUSD,Buy,5\n"
+    assert import_trades(journal, io.BytesIO(plain.encode()))["entries"] == 2
+    assert import_trades(journal, io.BytesIO(plain.encode()))["duplicates"] == 2
+
+
+def test_concurrent_imports_of_one_file_add_it_once(journal):
+    # two Journals, as two processes would have; the refs are checked under the write lock
+    text = "".join(f"{i},2026-03-{i % 5 + 1:02d},EURUSD,Buy,1\n" for i in range(1, 301))
+    data = ("ticket,date,symbol,direction,entry_pnl\n" + text).encode()
+    others = [Journal(journal.path, readers=1) for _ in range(2)]
+    summaries = []
+
+    def run(j) -> None:
+        summaries.append(import_trades(j, io.BytesIO(data), chunk_rows=50))
+
+    threads = [threading.Thread(target=run, args=(j,)) for j in others]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for j in others:
+        j.close()
+
+    assert sum(s["entries"] for s in summaries) == 300
+    assert sum(s["duplicates"] for s in summaries) == 300
+    trades = journal.fetch_month(2026, 3)
+    assert sum(s["trades"] for s in summaries) == len(trades)
+    assert all(journal.trade_total(t["id"]) > 0 for t in trades)  # no empty trades
+
+
+def test_entries_ignored_at_insert_leave_no_empty_trade(journal, monkeypatch):
+    import_trades(journal, io.BytesIO(MT4_HISTORY.encode()))
+    before = [t["id"] for t in journal.fetch_month(2026, 3)]
+    # as if the refs had been missed by the check: the insert itself ignores them
+    monkeypatch.setattr(transfer, "_existing_refs", lambda conn, refs: set())
+    again = import_trades(journal, io.BytesIO(MT4_HISTORY.encode()))
+    assert (again["entries"], again["trades"], again["duplicates"], again["net_pnl"]) == (0, 0, 3, 0)
+    assert [t["id"] for t in journal.fetch_month(2026, 3)] == before
+
+
+def test_dry_run_writes_nothing(journal):
+    summary = import_trades(journal, io.BytesIO(MT4_HISTORY.encode()), dry_run=True)
+    assert (summary["entries"], summary["trades"]) == (3, 2)
+    assert journal.fetch_month(2026, 3) == []
+
+
+def test_bad_rows_are_reported_with_their_line(journal):
+    text = "date,symbol,direction,entry_pnl\n2026-03-02,EURUSD,Buy,abc\n2026-13-40,EURUSD,Buy,1\n2026-03-02,EURUSD,Buy,1\n"
+    summary = import_trades(journal, io.BytesIO(text.encode()))
+    assert (summary["entries"], summary["invalid"]) == (1, 2)
+    assert [e.split(":")[0] for e in summary["errors"]] == ["line 2", "line 3"]
+
+
+def test_mt5_deals_import_closing_deals_under_the_position_side(journal, tmp_path):
+    path = tmp_path / "deals.csv"
+    path.write_text(MT5_DEALS)
+    summary = import_trades(journal, str(path))
+    assert (summary["entries"], summary["skipped"], summary["errors"]) == (1, 2, [])
+    [trade] = journal.fetch_month(2026, 3)
+    assert (trade["symbol"], trade["direction"]) == ("EURUSD", "Buy")  # the sell "out" closed a Buy
+    assert journal.trade_total(trade["id"]) == 20000 - 350 - 25 - 110
+
+
+def test_nothing_recognised_is_an_error(journal, tmp_path):
+    path = tmp_path / "deals.csv"
+    path.write_text("\n".join(MT5_DEALS.splitlines()[:3]) + "\n")  # balance + an "in" deal only
+    summary = import_trades(journal, str(path))
+    assert summary["entries"] == 0 and summary["skipped"] == 2
+    assert summary["errors"] and "data rows" in summary["errors"][0]
+
+
+def test_import_from_a_pipe(journal):
+    rows = "".join(f"{i},2026-03-{i % 20 + 1:02d},EURUSD,Buy,{i}.25\n" for i in range(1, 2001))
+    with _pipe(("ticket,date,symbol,direction,entry_pnl\n" + rows).encode("utf-16")) as source:
+        summary = import_trades(journal, source)
+    assert (summary["entries"], summary["trades"], summary["errors"]) == (2000, 20, [])
+    assert summary["net_pnl"] == sum(i * 100 + 25 for i in range(1, 2001))
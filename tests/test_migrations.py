@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from sk import db
+from sk.db import MIGRATIONS, SchemaUpgradeError, schema_version
+from sk.journal import Journal
+
+from helpers import raw_pnl, rollup_pnl
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def _baseline_totals(path: str):
+    # before any migration: REAL dollars per entry, rounded to cents as _m005 does
+    with closing(sqlite3.connect(path)) as conn:
+        trades = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+        entries = conn.execute("SELECT COUNT(*) FROM trade_entries").fetchone()[0]
+        days, months = raw_pnl(conn, "CAST(ROUND(e.entry_pnl * 100) AS INTEGER)")
+    return trades, entries, days, months
+
+
+def test_baseline_db_migrates_with_the_same_totals(baseline_db):
+    trades, entries, days, months = _baseline_totals(baseline_db)
+    assert months, "the baseline database has trades"
+
+    j = Journal(baseline_db, readers=1)
+    try:
+        assert j.migrations_applied == [v for v, _ in MIGRATIONS]
+        for month, expected in months.items():
+            assert j.month_stats(month) == (expected["trades"], expected["profit"], expected["loss"], expected["net"])
+            assert j.build_daily_map(month) == {
+                d: {"pnl": v["net"], "trades": v["trades"]} for d, v in days.items() if d.startswith(month)
+            }
+        with j.read() as conn:
+            assert schema_version(conn) == LATEST
+            assert conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == trades
+            assert conn.execute("SELECT COUNT(*) FROM trade_entries").fetchone()[0] == entries
+            assert rollup_pnl(conn) == raw_pnl(conn) == (days, months)
+            # every baseline value has whole cents: nothing needed keeping aside
+            assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entry_pnl_pre_cents'").fetchone() is None
+    finally:
+        j.close()
+
+    reopened = Journal(baseline_db, readers=1)
+    assert reopened.migrations_applied == []
+    reopened.close()
+
+
+def test_sub_cent_values_are_kept_aside(baseline_db):
+    with closing(sqlite3.connect(baseline_db)) as conn:
+        entry_id = conn.execute("SELECT MIN(id) FROM trade_entries").fetchone()[0]
+        conn.execute("UPDATE trade_entries SET entry_pnl = 12.345 WHERE id = ?", (entry_id,))
+        conn.commit()
+
+    j = Journal(baseline_db, readers=1)
+    try:
+        with j.read() as conn:
+            kept = conn.execute("SELECT entry_id, entry_pnl, pnl_cents FROM entry_pnl_pre_cents").fetchall()
+    finally:
+        j.close()
+    assert len(kept) == 1
+    assert kept[0][0] == entry_id and kept[0][1] == 12.345 and kept[0][2] in (1234, 1235)
+
+
+def test_old_sqlite_is_refused_before_any_step(baseline_db, monkeypatch):
+    monkeypatch.setattr(db.sqlite3, "sqlite_version_info", (3, 31, 1))
+    with pytest.raises(SchemaUpgradeError, match="3.35"):
+        Journal(baseline_db, readers=1)
+    with closing(sqlite3.connect(baseline_db)) as conn:
+        assert schema_version(conn) == 0
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'daily_pnl'").fetchone() is None
+
+
+def test_old_sqlite_opens_an_upgraded_db(baseline_db, monkeypatch):
+    Journal(baseline_db, readers=1).close()
+    monkeypatch.setattr(db.sqlite3, "sqlite_version_info", (3, 31, 1))
+    j = Journal(baseline_db, readers=1)
+    assert j.migrations_applied == []
+    j.close()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+
+def _walk(journal, limit, **filters):
+    ids, after = [], None
+    while True:
+        page = journal.trade_page(after=after, limit=limit, **filters)
+        ids += [t["id"] for t in page["rows"]]
+        after = page["next"]
+        if after is None:
+            return ids
+
+
+def test_keyset_pages_are_stable_when_dates_are_equal(journal):
+    same_day = [journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [i - 3]) for i in range(7)]
+    later = journal.add_trade("2026-03-09", "XAUUSD", "Sell", 1.0, [5])
+    earlier = journal.add_trade("2026-03-01", "EURUSD", "Sell", 1.0, [0])
+    newest_first = [later] + same_day[::-1] + [earlier]
+
+    assert _walk(journal, 2) == newest_first
+    assert _walk(journal, 3) == newest_first
+
+    # a trade added on the same day while paging sorts before the cursor: the later pages
+    # neither repeat nor skip a row
+    first = journal.trade_page(limit=3)
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1])
+    rest, after = [], first["next"]
+    while after is not None:
+        page = journal.trade_page(after=after, limit=3)
+        rest += [t["id"] for t in page["rows"]]
+        after = page["next"]
+    assert [t["id"] for t in first["rows"]] + rest == newest_first
+
+
+def test_filters_apply_before_the_limit(journal):
+    ids = [journal.add_trade("2026-03-02", sym, "Buy", 1.0, [pnl]) for sym, pnl in [("EURUSD", 1), ("XAUUSD", -1), ("EURUSD", -2), ("EURUSD", 0)]]
+    journal.lock_trade(ids[0])
+    assert _walk(journal, 1, symbols=["EURUSD"], sign="loss") == [ids[2]]
+    assert _walk(journal, 1, symbols=["EURUSD"], locked=False) == [ids[3], ids[2]]
+    assert _walk(journal, 2, sign="win") == [ids[0]]
+    assert _walk(journal, 2, start="2026-03-03") == []
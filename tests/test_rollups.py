@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import io
+
+from sk.transfer import import_trades
+
+from helpers import raw_pnl, rollup_pnl
+
+
+def _assert_rollups_match(journal):
+    with journal.read() as conn:
+        days, months = raw_pnl(conn)
+        assert rollup_pnl(conn) == (days, months)
+    for month, m in months.items():
+        assert journal.month_stats(month) == (m["trades"], m["profit"], m["loss"], m["net"])
+        assert journal.build_daily_map(month) == {d: {"pnl": v["net"], "trades": v["trades"]} for d, v in days.items() if d.startswith(month)}
+    return months
+
+
+def test_rollups_follow_add_update_delete(journal):
+    a = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1069, -250])
+    b = journal.add_trade("2026-03-02", "XAUUSD", "Sell", 0.5, [-1580])
+    c = journal.add_trade("2026-04-01", "EURUSD", "Sell", None, [300, 300])
+    _assert_rollups_match(journal)
+
+    journal.update_trade(a, "2026-03-02", "EURUSD", "Buy", 1.0, [1069, -250, 75])  # entry added
+    journal.update_trade(b, "2026-04-03", "XAUUSD", "Sell", 0.5, [-1580])  # moved to another month
+    journal.update_trade(c, "2026-04-01", "EURUSD", "Sell", None, [300])  # entry removed
+    months = _assert_rollups_match(journal)
+    assert months["2026-03"]["trades"] == 1 and months["2026-04"]["trades"] == 2
+
+    journal.delete_trades([a])
+    months = _assert_rollups_match(journal)
+    assert "2026-03" not in months
+    assert journal.month_stats("2026-03") == (0, 0, 0, 0)
+
+    journal.lock_trades([b, c])
+    journal.set_symbol([c], "gbpusd")
+    _assert_rollups_match(journal)
+
+
+def test_rollups_follow_import(journal):
+    csv_text = (
+        "ticket,date,symbol,direction,entry_pnl\n"
+        "1,2026-03-02,EURUSD,Buy,12.50\n"
+        "2,2026-03-02,EURUSD,Buy,-2.25\n"
+        "3,2026-03-03,XAUUSD,Sell,-40\n"
+        "4,2026-04-10,XAUUSD,Sell,7.05\n"
+    )
+    journal.add_trade("2026-03-02", "EURUSD", "Sell", None, [500])
+    summary = import_trades(journal, io.BytesIO(csv_text.encode()))
+    assert (summary["entries"], summary["trades"], summary["net_pnl"], summary["errors"]) == (4, 3, -2270, [])
+    _assert_rollups_match(journal)
+
+
+def test_rebuild_matches_incremental(journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100, -300])
+    journal.add_trade("2026-03-09", "EURUSD", "Buy", 1.0, [0])
+    before = _assert_rollups_match(journal)
+    assert journal.rebuild_rollups() == {"days": 2, "months": 1}
+    assert _assert_rollups_match(journal) == before
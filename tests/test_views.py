@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from sk import instrument
+
+
+def test_year_summary_compares_january_with_the_previous_december(journal):
+    journal.add_trade("2025-12-30", "EURUSD", "Buy", 1.0, [40])
+    journal.add_trade("2026-01-05", "EURUSD", "Buy", 1.0, [25])
+    journal.add_trade("2026-01-06", "EURUSD", "Sell", 1.0, [-10])
+    journal.add_trade("2026-03-02", "EURUSD", "Sell", 1.0, [7])
+
+    summary = journal.year_summary(2026)
+    months = {m["month"]: m for m in summary["months"]}
+    assert list(months) == [f"2026-{m:02d}" for m in range(1, 13)]
+    assert (months["2026-01"]["net"], months["2026-01"]["mom"]) == (15, 15 - 40)
+    assert (months["2026-02"]["net"], months["2026-02"]["mom"]) == (0, -15)
+    assert months["2026-03"]["mom"] == 7
+    # December only feeds January's delta: it is not one of the year's days or totals
+    assert sorted(summary["days"]) == ["2026-01-05", "2026-01-06", "2026-03-02"]
+    assert (summary["totals"]["trades"], summary["totals"]["net"]) == (3, 22)
+
+    # a write to that December changes January's delta
+    journal.add_trade("2025-12-31", "EURUSD", "Buy", 1.0, [5])
+    assert journal.year_summary(2026)["months"][0]["mom"] == 15 - 45
+
+
+def test_day_details_loads_every_entry_of_the_day_in_one_query(journal):
+    ids = [journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [i, 1]) for i in range(10)]
+    other = journal.add_trade("2026-03-03", "EURUSD", "Buy", 1.0, [100])
+
+    rec = instrument.start_run()
+    details = journal.day_details("2026-03-02")
+    instrument.stop_run(rec)
+    assert rec.queries == 3  # month window, the day's entries, the daily rollup
+
+    assert sorted(t["id"] for t in details["trades"]) == ids
+    assert details["totals"] == {tid: i + 1 for i, tid in enumerate(ids)}
+    assert [e["entry_no"] for e in details["entries"][ids[0]]] == [1, 2]
+    assert (details["day"]["trades"], details["day"]["net"]) == (10, 55)
+    assert other not in details["entries"]
+
+
+def test_entries_for_follows_edits_of_its_trades(journal):
+    a = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [1, 2])
+    b = journal.add_trade("2026-04-02", "EURUSD", "Buy", 1.0, [])
+    assert journal.entries_for([a, b, 999])["totals"] == {a: 3, b: 0, 999: 0}
+
+    journal.update_trade(a, "2026-03-02", "EURUSD", "Buy", 1.0, [1, 5])
+    batch = journal.entries_for([b, a])
+    assert batch["totals"] == {a: 6, b: 0}
+    assert [e["pnl_cents"] for e in batch["entries"][a]] == [1, 5]
+    assert journal.trade_total(a) == 6
+
+
+def test_symbol_breakdown_groups_by_symbol_and_direction(journal):
+    journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [300, -100])
+    journal.add_trade("2026-03-03", "EURUSD", "Buy", 0.5, [-500])
+    journal.add_trade("2026-03-04", "EURUSD", "Sell", None, [250])
+    journal.add_trade("2026-03-05", "XAUUSD", "Sell", 2.0, [1000])
+    journal.add_trade("2026-04-01", "XAUUSD", "Sell", 2.0, [-9999])  # outside the range
+    deleted = journal.add_trade("2026-03-06", "XAUUSD", "Sell", 2.0, [-9999])
+    journal.soft_delete_trade(deleted)
+
+    rows = journal.symbol_breakdown("2026-03-01", "2026-03-31")
+    assert [(r["symbol"], r["direction"], r["net"]) for r in rows] == [
+        ("EURUSD", "Buy", -300),  # biggest loser first
+        ("EURUSD", "Sell", 250),
+        ("XAUUSD", "Sell", 1000),
+    ]
+    buy = rows[0]
+    assert (buy["trades"], buy["wins"], buy["losses"], buy["win_rate"], buy["avg_entries"]) == (2, 1, 1, 0.5, 1.5)
+    assert (buy["lots"], buy["net_per_lot"]) == (1.5, -200)  # -300 cents over 1.5 lots
+    assert rows[1]["lots"] is None and rows[1]["net_per_lot"] is None
+
+    by_lot = journal.symbol_breakdown("2026-03-01", "2026-03-31", sort="net_per_lot", descending=True)
+    assert [(r["symbol"], r["direction"]) for r in by_lot] == [("XAUUSD", "Sell"), ("EURUSD", "Buy"), ("EURUSD", "Sell")]
+    with pytest.raises(ValueError, match="sort must be one of"):
+        journal.symbol_breakdown("2026-03-01", "2026-03-31", sort="pnl")
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+
+
+def _entries(journal, trade_id):
+    return [e["pnl_cents"] for e in journal.fetch_entries(trade_id)]
+
+
+def _rowids(journal, trade_id):
+    return [e["id"] for e in journal.fetch_entries(trade_id)]
+
+
+def test_update_diff_writes_only_what_changed(journal):
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100, 200, 300])
+    ids = _rowids(journal, tid)
+
+    same = journal.update_trade(tid, "2026-03-02", "EURUSD", "Buy", 1.0, [100, 200, 300])
+    assert same == {"found": True, "header": False, "updated": 0, "inserted": 0, "deleted": 0, "days": [], "locked": False}
+
+    header = journal.update_trade(tid, "2026-03-02", "EURUSD", "Sell", 2.0, [100, 200, 300])
+    assert (header["header"], header["updated"], header["days"]) == (True, 0, [])  # no P/L change: no rollup refresh
+    assert journal.fetch_month(2026, 3)[0]["direction"] == "Sell"
+
+    one = journal.update_trade(tid, "2026-03-02", "EURUSD", "Sell", 2.0, [100, 250, 300])
+    assert (one["header"], one["updated"], one["inserted"], one["deleted"], one["days"]) == (False, 1, 0, 0, ["2026-03-02"])
+    assert _rowids(journal, tid) == ids  # surviving entries keep their rowid
+
+    grow = journal.update_trade(tid, "2026-03-02", "EURUSD", "Sell", 2.0, [100, 250, 300, -50])
+    assert (grow["updated"], grow["inserted"], grow["deleted"]) == (0, 1, 0)
+    shrink = journal.update_trade(tid, "2026-03-02", "EURUSD", "Sell", 2.0, [100])
+    assert (shrink["updated"], shrink["inserted"], shrink["deleted"]) == (0, 0, 3)
+    assert _entries(journal, tid) == [100]
+    assert _rowids(journal, tid) == ids[:1]
+
+
+def test_update_moving_days_refreshes_both(journal):
+    tid = journal.add_trade("2026-03-31", "EURUSD", "Buy", 1.0, [100])
+    report = journal.update_trade(tid, "2026-04-01", "EURUSD", "Buy", 1.0, [100])
+    assert report["header"] and report["days"] == ["2026-03-31", "2026-04-01"]
+    assert journal.month_stats("2026-03") == (0, 0, 0, 0)
+    assert journal.month_stats("2026-04") == (1, 100, 0, 100)
+
+
+def test_update_of_a_deleted_trade_is_not_found(journal):
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    journal.soft_delete_trade(tid)
+    report = journal.update_trade(tid, "2026-03-02", "EURUSD", "Buy", 1.0, [500])
+    assert not report["found"] and not report["locked"]
+    assert _entries(journal, tid) == [100]
+
+
+def test_queued_update_of_a_trade_locked_meanwhile_is_skipped(journal, monkeypatch):
+    tid = journal.add_trade("2026-03-02", "EURUSD", "Buy", 1.0, [100])
+    # hold the writer until the lock has gone in, so the order is fixed
+    go = threading.Event()
+    apply_writes = journal.apply_writes
+
+    def gated(ops):
+        go.wait(5)
+        return apply_writes(ops)
+
+    monkeypatch.setattr(journal, "apply_writes", gated)
+    journal.start_writer()
+
+    future = journal.queue_update_trade(tid, "2026-03-02", "EURUSD", "Sell", 1.0, [500])
+    assert journal.lock_trade(tid)["trades"] == 1
+    go.set()
+
+    report = future.result(timeout=5)
+    assert report["found"] and report["locked"]
+    assert (report["header"], report["updated"], report["days"]) == (False, 0, [])
+    assert journal.fetch_month(2026, 3)[0]["direction"] == "Buy"
+    assert _entries(journal, tid) == [100]